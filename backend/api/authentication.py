@@ -0,0 +1,149 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import router
+
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+from foodgram_backend.metrics import record_cache_lookup
+
+User = get_user_model()
+
+# Never written to a cache; the restored user loads them on access.
+SECRET_FIELDS = ('password',)
+
+
+class LocalTokenCache:
+    """Thread-safe in-process LRU of token snapshots with a TTL."""
+
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, snapshot = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+        return snapshot
+
+    def set(self, key, snapshot):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, snapshot)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+class SharedTokenCache:
+    """Token snapshots stored in the configured Django cache.
+
+    Entries are keyed by a digest of the token, so the cache never holds
+    a usable credential.
+    """
+
+    key_prefix = 'auth-token:'
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+
+    def cache_key(self, key):
+        return self.key_prefix + hashlib.sha256(key.encode()).hexdigest()
+
+    def get(self, key):
+        return cache.get(self.cache_key(key))
+
+    def set(self, key, snapshot):
+        cache.set(self.cache_key(key), snapshot, self.ttl)
+
+    def delete(self, key):
+        cache.delete(self.cache_key(key))
+
+
+def _build_token_cache():
+    if settings.TOKEN_AUTH_CACHE_BACKEND == 'shared':
+        return SharedTokenCache(settings.TOKEN_AUTH_CACHE_TTL)
+    return LocalTokenCache(
+        settings.TOKEN_AUTH_CACHE_SIZE,
+        settings.TOKEN_AUTH_CACHE_TTL
+    )
+
+
+token_cache = _build_token_cache()
+
+
+def take_snapshot(user, token):
+    """The user's fields, minus secrets, and the token's creation time."""
+    fields = {
+        field.attname: getattr(user, field.attname)
+        for field in User._meta.concrete_fields
+        if field.attname not in SECRET_FIELDS
+    }
+    return fields, token.created
+
+
+def restore_snapshot(key, snapshot):
+    """Rebuild the user and token of a snapshot without a query."""
+    fields, created = snapshot
+    db = router.db_for_read(User)
+    user = User.from_db(db, list(fields), list(fields.values()))
+    token = Token.from_db(
+        db, ['key', 'user_id', 'created'], [key, user.pk, created]
+    )
+    token.user = user
+    return user, token
+
+
+def invalidate_token(key):
+    """Drop a cached snapshot for a single token key."""
+    token_cache.delete(key)
+
+
+def invalidate_user_tokens(user_id):
+    """Drop cached snapshots for every token of the given user."""
+    for key in Token.objects.filter(user_id=user_id).values_list(
+        'key', flat=True
+    ):
+        token_cache.delete(key)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """Token authentication that skips the Token/User query on cache hits.
+
+    The ``shared`` backend, the default when ``REDIS_URL`` is set, makes
+    an invalidation take effect in every worker at once. With the
+    ``local`` backend each worker keeps its own LRU, so invalidation only
+    reaches the current process: a deactivated user or a deleted token
+    keeps working in other workers for up to ``TOKEN_AUTH_CACHE_TTL``
+    seconds, 5 by default for this backend.
+
+    Snapshots hold the user's fields except the password hash, which the
+    restored user reads from the database only if something asks for it.
+    """
+
+    def authenticate_credentials(self, key):
+        snapshot = token_cache.get(key)
+        record_cache_lookup('token', snapshot is not None)
+        if snapshot is not None:
+            return restore_snapshot(key, snapshot)
+
+        user, token = super().authenticate_credentials(key)
+        token_cache.set(key, take_snapshot(user, token))
+        return user, token
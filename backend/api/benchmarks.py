@@ -0,0 +1,113 @@
+import os
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.management.base import CommandError
+from django.core.signals import request_finished, request_started
+from django.db import close_old_connections, connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+
+@contextmanager
+def rolled_back():
+    """Run a benchmark inside a transaction that is always rolled back.
+
+    Django closes connections at the end of each request, which would
+    break the surrounding transaction, so the handlers are detached for
+    the duration of the block just like ``TestCase`` does.
+    """
+    request_started.disconnect(close_old_connections)
+    request_finished.disconnect(close_old_connections)
+    try:
+        with transaction.atomic():
+            yield
+            transaction.set_rollback(True)
+    finally:
+        request_started.connect(close_old_connections)
+        request_finished.connect(close_old_connections)
+
+
+def make_client(token=None):
+    """Return a test client bound to an allowed host."""
+    host = settings.ALLOWED_HOSTS[0].lstrip('.')
+    extra = {'HTTP_HOST': 'localhost' if host == '*' else host}
+    if token is not None:
+        extra['HTTP_AUTHORIZATION'] = f'Token {token}'
+    return Client(**extra)
+
+
+def measure(func, iterations=200, warmup=10):
+    """Call ``func`` repeatedly and return throughput and latency stats."""
+    for _ in range(warmup):
+        func()
+
+    with CaptureQueriesContext(connection) as queries:
+        func()
+    query_count = len(queries)
+
+    timings = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        call_started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - call_started)
+    elapsed = time.perf_counter() - started
+
+    stats = summarize(timings, elapsed)
+    stats['queries_per_request'] = query_count
+    return stats
+
+
+def summarize(timings, elapsed):
+    """Return throughput and latency percentiles for a list of timings."""
+    if len(timings) > 1:
+        percentiles = statistics.quantiles(timings, n=100)
+    else:
+        percentiles = timings * 99
+    return {
+        'requests': len(timings),
+        'rps': round(len(timings) / elapsed, 1),
+        'p50_ms': round(percentiles[49] * 1000, 3),
+        'p95_ms': round(percentiles[94] * 1000, 3),
+        'p99_ms': round(percentiles[98] * 1000, 3),
+    }
+
+
+@contextmanager
+def gunicorn_server(port, workers, **env):
+    """Run gunicorn with the project config and extra environment."""
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '--config', 'gunicorn.conf.py'],
+        cwd=settings.BASE_DIR,
+        env=dict(
+            os.environ,
+            GUNICORN_BIND=f'127.0.0.1:{port}',
+            GUNICORN_WORKERS=str(workers),
+            **env
+        ),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+    try:
+        yield server
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def wait_until_ready(url, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(url, timeout=1).read()
+            return
+        except (urllib.error.URLError, ConnectionError):
+            time.sleep(0.2)
+    raise CommandError(f'Server did not answer {url} in {timeout}s.')
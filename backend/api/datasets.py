@@ -0,0 +1,288 @@
+"""Row generators for the ``generate_dataset`` command.
+
+This module does not import Django, so pool workers can run it under any
+multiprocessing start method. Workers build plain dicts keyed by field
+attname, and encode them as ``COPY`` text themselves when the plan lists
+the table columns. Otherwise the command turns them into model instances
+for ``bulk_create``.
+
+Every chunk seeds its own ``random.Random`` from the run seed, the phase
+and the chunk start, so a run is reproducible whatever the number of
+processes and the order chunks finish in.
+"""
+import math
+import random
+from datetime import date, datetime, timedelta, timezone
+
+FIRST_NAMES = (
+    'Anna', 'Boris', 'Daria', 'Egor', 'Elena', 'Ivan', 'Maria', 'Nikita',
+    'Olga', 'Pavel', 'Sofia', 'Timur', 'Vera', 'Yuri', 'Zoya', 'Alex',
+)
+LAST_NAMES = (
+    'Ivanova', 'Petrov', 'Smirnova', 'Kuznetsov', 'Popova', 'Sokolov',
+    'Lebedeva', 'Kozlov', 'Novikova', 'Morozov', 'Volkova', 'Fedorov',
+)
+ADJECTIVES = (
+    'Quick', 'Spicy', 'Creamy', 'Grandma\'s', 'Crispy', 'Smoky', 'Light',
+    'Hearty', 'Summer', 'Winter', 'Lemon', 'Garlic', 'Honey', 'Rustic',
+)
+DISHES = (
+    'soup', 'salad', 'pie', 'stew', 'pasta', 'risotto', 'curry', 'pancakes',
+    'casserole', 'omelette', 'bowl', 'cake', 'dumplings', 'porridge',
+)
+# (name, slug) of the tags recipes are spread over.
+TAGS = (
+    ('Breakfast', 'breakfast'), ('Lunch', 'lunch'), ('Dinner', 'dinner'),
+    ('Dessert', 'dessert'), ('Vegetarian', 'vegetarian'),
+    ('Vegan', 'vegan'), ('Quick', 'quick'), ('Soup', 'soup'),
+    ('Salad', 'salad'), ('Baking', 'baking'), ('Snack', 'snack'),
+    ('Drinks', 'drinks'),
+)
+IMAGE = 'recipes/images/generated.png'
+# Recipes are dated over this period, newest ids last.
+HISTORY = timedelta(days=3 * 365)
+NOW = datetime(2026, 1, 1, tzinfo=timezone.utc)
+# Shape of the per-user activity distribution (favorites, cart and
+# follows); a lower value gives a longer tail of very active users.
+ACTIVITY_SHAPE = 1.5
+COPY_ESCAPES = str.maketrans({
+    '\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r'
+})
+
+plan = None
+
+
+def zipf_cum_weights(count, exponent=1.1):
+    """Cumulative weights of ranks 1..count under Zipf's law."""
+    total, cumulative = 0.0, []
+    for rank in range(1, count + 1):
+        total += rank ** -exponent
+        cumulative.append(total)
+    return cumulative
+
+
+def spread_stride(count):
+    """A stride coprime with ``count`` used to scatter popularity ranks."""
+    stride = max(1, int(count * 0.618))
+    while count > 1 and math.gcd(stride, count) != 1:
+        stride += 1
+    return stride
+
+
+def make_plan(seed, user_base, users, recipe_base, recipes, tag_ids,
+              ingredient_ids, favorites, cart, subscriptions,
+              copy_columns=None):
+    """Everything workers need, computed once in the parent process.
+
+    ``copy_columns`` maps row keys to ``(attname, default)`` pairs in table
+    column order; when given, workers return ``COPY`` text.
+    """
+    rng = random.Random(seed)
+    tag_ids, ingredient_ids = list(tag_ids), list(ingredient_ids)
+    rng.shuffle(tag_ids)
+    rng.shuffle(ingredient_ids)
+    return {
+        'seed': seed,
+        'user_base': user_base,
+        'users': users,
+        'recipe_base': recipe_base,
+        'recipes': recipes,
+        'tag_ids': tag_ids,
+        'tag_weights': zipf_cum_weights(len(tag_ids), 0.8),
+        'ingredient_ids': ingredient_ids,
+        'ingredient_weights': zipf_cum_weights(len(ingredient_ids)),
+        'user_weights': zipf_cum_weights(users, 0.9),
+        'user_stride': spread_stride(users),
+        'recipe_weights': zipf_cum_weights(recipes),
+        'recipe_stride': spread_stride(recipes),
+        'favorites': favorites,
+        'cart': cart,
+        'subscriptions': subscriptions,
+        'copy_columns': copy_columns,
+    }
+
+
+def init_worker(worker_plan):
+    global plan
+    plan = worker_plan
+
+
+def chunk_random(phase, start):
+    return random.Random(f'{plan["seed"]}-{phase}-{start}')
+
+
+def popular_users(rng, k):
+    """User ids drawn with power-law weights (prolific authors, stars)."""
+    ranks = rng.choices(
+        range(plan['users']), cum_weights=plan['user_weights'], k=k
+    )
+    return [
+        plan['user_base'] + rank * plan['user_stride'] % plan['users']
+        for rank in ranks
+    ]
+
+
+def popular_recipes(rng, k):
+    ranks = rng.choices(
+        range(plan['recipes']), cum_weights=plan['recipe_weights'], k=k
+    )
+    return [
+        plan['recipe_base'] + rank * plan['recipe_stride'] % plan['recipes']
+        for rank in ranks
+    ]
+
+
+def weighted_tags(rng, k):
+    return rng.choices(plan['tag_ids'], cum_weights=plan['tag_weights'], k=k)
+
+
+def weighted_ingredients(rng, k):
+    return rng.choices(
+        plan['ingredient_ids'], cum_weights=plan['ingredient_weights'], k=k
+    )
+
+
+def activity(rng, mean):
+    """A heavy-tailed count with the given mean."""
+    if mean <= 0:
+        return 0
+    pareto_mean = ACTIVITY_SHAPE / (ACTIVITY_SHAPE - 1)
+    return int(mean * rng.paretovariate(ACTIVITY_SHAPE) / pareto_mean)
+
+
+def distinct(draw, rng, k, limit):
+    """Up to ``k`` distinct values from a weighted ``draw(rng, n)``."""
+    k = min(k, limit)
+    chosen = set()
+    # Give up on the tail after a few rounds: the heaviest users would
+    # otherwise spin on the last few unpicked items.
+    for _ in range(8):
+        if len(chosen) >= k:
+            break
+        chosen.update(draw(rng, k - len(chosen)))
+    return chosen
+
+
+def user_rows(chunk):
+    start, stop = chunk
+    rng = chunk_random('users', start)
+    rows = []
+    for offset in range(start, stop):
+        user_id = plan['user_base'] + offset
+        rows.append({
+            'id': user_id,
+            'username': f'user{user_id}',
+            'email': f'user{user_id}@example.com',
+            'first_name': rng.choice(FIRST_NAMES),
+            'last_name': rng.choice(LAST_NAMES),
+            'password': '!',
+            'date_joined': NOW - HISTORY * rng.random(),
+        })
+    return {'users': rows}
+
+
+def recipe_rows(chunk):
+    start, stop = chunk
+    rng = chunk_random('recipes', start)
+    authors = popular_users(rng, stop - start)
+    recipes, tags, ingredients = [], [], []
+    for offset, author_id in zip(range(start, stop), authors):
+        recipe_id = plan['recipe_base'] + offset
+        created_at = NOW - HISTORY * (
+            1 - (offset + rng.random()) / plan['recipes']
+        )
+        recipes.append({
+            'id': recipe_id,
+            'author_id': author_id,
+            'name': f'{rng.choice(ADJECTIVES)} {rng.choice(DISHES)} '
+                    f'#{recipe_id}',
+            'text': 'Generated for scale testing.',
+            'image': IMAGE,
+            'cooking_time': min(int(rng.lognormvariate(3.3, 0.6)) + 1, 600),
+            'created_at': created_at,
+            'updated_at': created_at,
+        })
+        tag_count = rng.choices((1, 2, 3), (5, 3, 2))[0]
+        tags += [
+            {'recipe_id': recipe_id, 'tag_id': tag_id}
+            for tag_id in distinct(
+                weighted_tags, rng, tag_count, len(plan['tag_ids'])
+            )
+        ]
+        ingredients += [
+            {
+                'recipe_id': recipe_id,
+                'ingredient_id': ingredient_id,
+                'amount': rng.randint(1, 1000),
+            }
+            for ingredient_id in distinct(
+                weighted_ingredients, rng, rng.randint(5, 30),
+                len(plan['ingredient_ids'])
+            )
+        ]
+    return {'recipes': recipes, 'tags': tags, 'ingredients': ingredients}
+
+
+def interaction_rows(chunk):
+    start, stop = chunk
+    rng = chunk_random('interactions', start)
+    favorites, cart, subscriptions = [], [], []
+    for offset in range(start, stop):
+        user_id = plan['user_base'] + offset
+        for rows, mean in ((favorites, plan['favorites']),
+                           (cart, plan['cart'])):
+            rows += [
+                {'user_id': user_id, 'recipe_id': recipe_id}
+                for recipe_id in distinct(
+                    popular_recipes, rng, activity(rng, mean),
+                    plan['recipes']
+                )
+            ]
+        authors = distinct(
+            popular_users, rng, activity(rng, plan['subscriptions']),
+            plan['users']
+        )
+        subscriptions += [
+            {'user_id': user_id, 'author_id': author_id}
+            for author_id in authors if author_id != user_id
+        ]
+    return {'favorites': favorites, 'cart': cart,
+            'subscriptions': subscriptions}
+
+
+def copy_value(value):
+    """Format a value for ``COPY ... FROM STDIN`` in text format."""
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    if isinstance(value, date):
+        return value.isoformat()
+    return str(value).translate(COPY_ESCAPES)
+
+
+def copy_text(rows, columns):
+    return ''.join(
+        '\t'.join(
+            copy_value(row.get(attname, default))
+            for attname, default in columns
+        ) + '\n'
+        for row in rows
+    )
+
+
+GENERATORS = {
+    'users': user_rows,
+    'recipes': recipe_rows,
+    'interactions': interaction_rows,
+}
+
+
+def generate(phase, chunk):
+    """Pool task: ``{key: (row count, rows or COPY text)}`` for a chunk."""
+    result = GENERATORS[phase](chunk)
+    columns = plan['copy_columns']
+    return {
+        key: (len(rows), copy_text(rows, columns[key]) if columns else rows)
+        for key, rows in result.items()
+    }
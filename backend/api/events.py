@@ -0,0 +1,328 @@
+"""Server-Sent Events for favorite, cart and subscription changes.
+
+Each worker keeps the streams connected to it in an ``EventHub``. On
+PostgreSQL events are published with ``NOTIFY`` once the write commits,
+and every worker with open streams ``LISTEN``s on one dedicated
+connection and hands them to its hub, so a client gets events whichever
+worker handled the write. Other databases only reach streams of the
+publishing worker. Streams that may have missed events while the
+listener reconnected get a ``resync``.
+
+Browsers' ``EventSource`` cannot send headers, so they open the stream
+with a short-lived, single-use ticket from ``POST /api/events/ticket/``
+instead of putting their token in the URL.
+"""
+import asyncio
+import itertools
+import json
+import logging
+import os
+import secrets
+import select
+import threading
+import time
+from collections import defaultdict
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import DEFAULT_DB_ALIAS, close_old_connections, connections
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+from rest_framework import exceptions, status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from api.recipes.async_views import authenticate, json_response
+from users.models import StreamTicket, Subscription
+
+logger = logging.getLogger(__name__)
+
+User = get_user_model()
+
+RESYNC = ('resync', {})
+CHANNEL = 'foodgram_events'
+# Seconds between reconnection attempts of a failed listener.
+LISTEN_RETRY_SECONDS = 1
+
+
+class HubFull(Exception):
+    pass
+
+
+class Subscriber:
+    """One open stream with a bounded event queue."""
+
+    def __init__(self, user_id, max_queue):
+        self.user_id = user_id
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(max_queue)
+
+    def push(self, event):
+        """Queue an event; a slow client gets a single resync instead."""
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC)
+
+
+class EventHub:
+    """Routes events published from any thread to connected users."""
+
+    def __init__(self, max_connections, max_queue):
+        self.max_connections = max_connections
+        self.max_queue = max_queue
+        self._subscribers = defaultdict(set)
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def connect(self, user_id):
+        with self._lock:
+            if self._count >= self.max_connections:
+                raise HubFull
+            subscriber = Subscriber(user_id, self.max_queue)
+            self._subscribers[user_id].add(subscriber)
+            self._count += 1
+        listener.ensure_started()
+        return subscriber
+
+    def disconnect(self, subscriber):
+        with self._lock:
+            subscribers = self._subscribers.get(subscriber.user_id)
+            if subscribers and subscriber in subscribers:
+                subscribers.discard(subscriber)
+                self._count -= 1
+                if not subscribers:
+                    del self._subscribers[subscriber.user_id]
+
+    def connected_user_ids(self):
+        with self._lock:
+            return list(self._subscribers)
+
+    def publish(self, user_ids, event_type, payload):
+        with self._lock:
+            targets = [
+                subscriber
+                for user_id in user_ids
+                for subscriber in self._subscribers.get(user_id, ())
+            ]
+        for subscriber in targets:
+            try:
+                subscriber.loop.call_soon_threadsafe(
+                    subscriber.push, (event_type, payload)
+                )
+            except RuntimeError:
+                self.disconnect(subscriber)
+
+    def resync_all(self):
+        """Tell every stream to refetch, e.g. after missed events."""
+        self.publish(self.connected_user_ids(), *RESYNC)
+
+
+hub = EventHub(settings.EVENTS_MAX_CONNECTIONS, settings.EVENTS_QUEUE_SIZE)
+
+
+def deliver(message):
+    """Hand a published message to the streams of this process."""
+    user_ids = message.get('users')
+    if user_ids is None:
+        connected = hub.connected_user_ids()
+        if not connected:
+            return
+        try:
+            user_ids = list(Subscription.objects.filter(
+                author_id=message['followers_of'], user_id__in=connected
+            ).values_list('user_id', flat=True))
+        finally:
+            close_old_connections()
+    hub.publish(user_ids, message['type'], message['payload'])
+
+
+def broadcast(event_type, payload, user_ids=None, followers_of=None):
+    """Publish an event to the given users or to an author's followers.
+
+    Call it once the write has committed.
+    """
+    message = {'type': event_type, 'payload': payload}
+    if followers_of is None:
+        message['users'] = list(user_ids)
+    else:
+        message['followers_of'] = followers_of
+    connection = connections[DEFAULT_DB_ALIAS]
+    if connection.vendor != 'postgresql':
+        deliver(message)
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT pg_notify(%s, %s)',
+            [CHANNEL, json.dumps(message, separators=(',', ':'))]
+        )
+
+
+class NotifyListener:
+    """Thread feeding ``NOTIFY`` messages of every worker to the hub.
+
+    Started with the first stream of a process; it holds one database
+    connection outside of Django's for as long as the process lives.
+    """
+
+    def __init__(self):
+        self.pid = None
+        self._lock = threading.Lock()
+
+    def ensure_started(self):
+        if self.pid == os.getpid():
+            return
+        with self._lock:
+            if self.pid == os.getpid():
+                return
+            if connections[DEFAULT_DB_ALIAS].vendor != 'postgresql':
+                return
+            self.pid = os.getpid()
+            threading.Thread(
+                target=self.run, name='event-listener', daemon=True
+            ).start()
+
+    def run(self):
+        reconnecting = False
+        while True:
+            try:
+                self.listen(reconnecting)
+            except Exception:
+                logger.exception('Event listener failed, reconnecting.')
+            reconnecting = True
+            time.sleep(LISTEN_RETRY_SECONDS)
+
+    def listen(self, reconnecting):
+        wrapper = connections[DEFAULT_DB_ALIAS]
+        connection = wrapper.Database.connect(
+            **wrapper.get_connection_params()
+        )
+        try:
+            connection.autocommit = True
+            with connection.cursor() as cursor:
+                cursor.execute(f'LISTEN {CHANNEL}')
+            if reconnecting:
+                hub.resync_all()
+            while True:
+                if not select.select([connection], [], [], 60)[0]:
+                    continue
+                connection.poll()
+                while connection.notifies:
+                    notify = connection.notifies.pop(0)
+                    deliver(json.loads(notify.payload))
+        finally:
+            connection.close()
+
+
+listener = NotifyListener()
+
+
+def issue_ticket(user):
+    """Create a stream ticket for ``user``, dropping expired ones."""
+    StreamTicket.objects.filter(created_at__lt=ticket_cutoff()).delete()
+    return StreamTicket.objects.create(
+        key=secrets.token_urlsafe(30), user=user
+    )
+
+
+def redeem_ticket(key):
+    """Active user of an unexpired ticket, or None; the ticket is spent."""
+    user_id = StreamTicket.objects.filter(
+        key=key, created_at__gte=ticket_cutoff()
+    ).values_list('user_id', flat=True).first()
+    if user_id is None:
+        return None
+    # Only one of concurrent redemptions deletes the row.
+    deleted, _ = StreamTicket.objects.filter(key=key).delete()
+    if not deleted:
+        return None
+    return User.objects.filter(pk=user_id, is_active=True).first()
+
+
+def ticket_cutoff():
+    return timezone.now() - timedelta(seconds=settings.EVENTS_TICKET_TTL)
+
+
+class StreamTicketView(APIView):
+    """Issue a ticket for ``GET /api/events/?ticket=<ticket>``."""
+
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        ticket = issue_ticket(request.user)
+        return Response(
+            {'ticket': ticket.key, 'expires_in': settings.EVENTS_TICKET_TTL},
+            status=status.HTTP_201_CREATED
+        )
+
+
+def format_event(event_id, event_type, payload):
+    data = json.dumps(payload, separators=(',', ':'))
+    return f'id: {event_id}\nevent: {event_type}\ndata: {data}\n\n'
+
+
+async def stream(subscriber):
+    event_ids = itertools.count(1)
+    deadline = time.monotonic() + settings.EVENTS_MAX_STREAM_SECONDS
+    try:
+        yield 'retry: 5000\n\n'
+        while time.monotonic() < deadline:
+            try:
+                event_type, payload = await asyncio.wait_for(
+                    subscriber.queue.get(), settings.EVENTS_HEARTBEAT_SECONDS
+                )
+            except asyncio.TimeoutError:
+                yield ': ping\n\n'
+                continue
+            yield format_event(next(event_ids), event_type, payload)
+    finally:
+        hub.disconnect(subscriber)
+
+
+async def resolve_user(request):
+    """Authenticate by ``?ticket=`` or by the Authorization header."""
+    key = request.GET.get('ticket')
+    if key:
+        user = await sync_to_async(redeem_ticket)(key)
+        if user is None:
+            raise exceptions.AuthenticationFailed(
+                'Invalid or expired stream ticket.'
+            )
+        return user
+    drf_request = await authenticate(request)
+    return drf_request.user
+
+
+async def event_stream(request):
+    """Stream changes of the current user's favorites, cart and follows."""
+    try:
+        user = await resolve_user(request)
+    except exceptions.AuthenticationFailed as exc:
+        return json_response({'detail': exc.detail}, status=401)
+    if not user.is_authenticated:
+        return json_response(
+            {'detail': 'Authentication credentials were not provided.'},
+            status=401
+        )
+    try:
+        subscriber = hub.connect(user.pk)
+    except HubFull:
+        response = json_response(
+            {'detail': 'Too many open event streams.'}, status=503
+        )
+        response['Retry-After'] = settings.EVENTS_HEARTBEAT_SECONDS
+        return response
+
+    response = StreamingHttpResponse(
+        stream(subscriber), content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    response._resource_closers.append(lambda: hub.disconnect(subscriber))
+    return response
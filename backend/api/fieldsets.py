@@ -0,0 +1,94 @@
+"""Sparse fieldsets for read endpoints.
+
+``?fields=id,name`` renders only the listed fields, ``?omit=text`` drops
+fields, and ``?view=summary`` picks a preset declared on the serializer
+(``omit`` applies on top of both). Fields that are not rendered are
+never built, so unused nested serializers and per-row flag lookups cost
+nothing; views use the same selection to load less from the database.
+"""
+from rest_framework.exceptions import ValidationError
+
+FIELDS_PARAM = 'fields'
+OMIT_PARAM = 'omit'
+VIEW_PARAM = 'view'
+
+
+def split_names(value):
+    return [name.strip() for name in (value or '').split(',') if name.strip()]
+
+
+def requested_fields(query_params, serializer_class):
+    """Field names a request asks for, or None for all of them."""
+    view = query_params.get(VIEW_PARAM)
+    fields = split_names(query_params.get(FIELDS_PARAM))
+    omit = split_names(query_params.get(OMIT_PARAM))
+    if view is None and not fields and not omit:
+        return None
+
+    available = serializer_class.Meta.fields
+    views = serializer_class.field_views
+    errors = {}
+    if view is not None and view not in views:
+        errors[VIEW_PARAM] = [
+            f'Unknown view "{view}". Choose from: {", ".join(views)}.'
+        ]
+    for param, names in ((FIELDS_PARAM, fields), (OMIT_PARAM, omit)):
+        unknown = [name for name in names if name not in available]
+        if unknown:
+            errors[param] = [f'Unknown fields: {", ".join(unknown)}.']
+    if errors:
+        raise ValidationError(errors)
+
+    selected = fields or (views[view] if view is not None else available)
+    return frozenset(selected) - set(omit)
+
+
+class SparseFieldsMixin:
+    """Model serializer that renders only the ``fields`` it is given."""
+
+    # Named selections for ``?view=``.
+    field_views = {}
+
+    def __init__(self, *args, fields=None, **kwargs):
+        self.selected_fields = fields
+        super().__init__(*args, **kwargs)
+
+    def get_fields(self):
+        if self.selected_fields is None:
+            return super().get_fields()
+        # ModelSerializer deep-copies every declared field; shadow the
+        # class attribute so that only the selected ones are copied.
+        self._declared_fields = {
+            name: field for name, field in type(self)._declared_fields.items()
+            if name in self.selected_fields
+        }
+        try:
+            return super().get_fields()
+        finally:
+            del self._declared_fields
+
+    def get_field_names(self, declared_fields, info):
+        names = super().get_field_names(declared_fields, info)
+        if self.selected_fields is None:
+            return names
+        return [name for name in names if name in self.selected_fields]
+
+
+class SparseFieldsViewMixin:
+    """Apply the requested fieldset to the serializers of read actions."""
+
+    sparse_actions = ('list', 'retrieve')
+
+    def get_fieldset(self):
+        reading = self.request.method == 'GET'
+        if not reading or self.action not in self.sparse_actions:
+            return None
+        return requested_fields(
+            self.request.query_params, self.get_serializer_class()
+        )
+
+    def get_serializer(self, *args, **kwargs):
+        fields = self.get_fieldset()
+        if fields is not None:
+            kwargs.setdefault('fields', fields)
+        return super().get_serializer(*args, **kwargs)
@@ -0,0 +1,456 @@
+import base64
+import io
+import json
+import random
+import re
+import tempfile
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import defaultdict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import override_settings
+
+from PIL import Image
+from rest_framework.authtoken.models import Token
+
+from api.benchmarks import (gunicorn_server, make_client, rolled_back,
+                            summarize, wait_until_ready)
+from api.datasets import ADJECTIVES, DISHES
+from recipes.models import (Ingredient, Recipe, RecipeIngredient,
+                            ShoppingCart, Tag)
+from users.models import Subscription, UserStats
+
+User = get_user_model()
+
+PREFIX = 'bench-api'
+FIXTURE_IMAGE = 'recipes/images/bench.png'
+USERS = 20
+RECIPES_PER_USER = 10
+SERVER_QUERIES = re.compile(r'desc="(\d+) queries"')
+# Averages of whole query counts; more than half a query per request on
+# the same plan means a scenario issues extra queries.
+QUERY_SLACK = 0.5
+
+Call = namedtuple('Call', 'method path token body')
+Record = namedtuple('Record', 'scenario seconds status queries')
+
+
+def png_data_url(rng):
+    image = Image.new('RGB', (64, 64), tuple(rng.choices(range(256), k=3)))
+    buffer = io.BytesIO()
+    image.save(buffer, format='PNG')
+    encoded = base64.b64encode(buffer.getvalue()).decode()
+    return f'data:image/png;base64,{encoded}'
+
+
+def feed_anonymous(fixture, index, rng):
+    tags = '&'.join(
+        f'tags={slug}'
+        for slug in rng.sample(fixture['tags'], rng.randint(1, 2))
+    )
+    return [Call('GET', f'/api/recipes/?{tags}&page={rng.randint(1, 3)}',
+                 None, None)]
+
+
+def search(fixture, index, rng):
+    words = rng.sample(DISHES, 1) + rng.sample(ADJECTIVES, rng.randint(0, 1))
+    query = urllib.parse.urlencode({'search': ' '.join(words)})
+    return [Call('GET', f'/api/recipes/?{query}', None, None)]
+
+
+def facets(fixture, index, rng):
+    tags = '&'.join(
+        f'tags={slug}'
+        for slug in rng.sample(fixture['tags'], rng.randint(0, 2))
+    )
+    return [Call('GET', f'/api/recipes/facets/?{tags}', None, None)]
+
+
+def pantry_match(fixture, index, rng):
+    pantry = rng.sample(fixture['ingredients'], 20)
+    return [Call('POST', '/api/recipes/match/', None, {
+        'ingredients': pantry,
+        'order': rng.choice(('missing', 'coverage')),
+    })]
+
+
+def similar(fixture, index, rng):
+    recipe = rng.choice(fixture['recipes'])
+    return [Call('GET', f'/api/recipes/{recipe}/similar/', None, None)]
+
+
+def list_authenticated(fixture, index, rng):
+    return [Call('GET', f'/api/recipes/?page={rng.randint(1, 5)}',
+                 rng.choice(fixture['tokens']), None)]
+
+
+def detail_authenticated(fixture, index, rng):
+    return [Call('GET', f'/api/recipes/{rng.choice(fixture["recipes"])}/',
+                 rng.choice(fixture['tokens']), None)]
+
+
+def favorite_toggle(fixture, index, rng):
+    # Spread (user, recipe) pairs by index so that concurrent toggles
+    # never race on the same favorite.
+    tokens, recipes = fixture['tokens'], fixture['recipes']
+    token = tokens[index % len(tokens)]
+    path = f'/api/recipes/{recipes[index // len(tokens) % len(recipes)]}/'
+    return [
+        Call('POST', path + 'favorite/', token, None),
+        Call('DELETE', path + 'favorite/', token, None),
+    ]
+
+
+def recipe_create(fixture, index, rng):
+    return [Call('POST', '/api/recipes/', rng.choice(fixture['tokens']), {
+        'name': f'{PREFIX} new recipe {index}',
+        'text': 'Created by the API benchmark.',
+        'image': png_data_url(rng),
+        'cooking_time': rng.randint(1, 180),
+        'tags': rng.sample(fixture['tag_ids'], 2),
+        'ingredients': [
+            {'id': ingredient, 'amount': rng.randint(1, 500)}
+            for ingredient in rng.sample(fixture['ingredients'], 4)
+        ],
+    })]
+
+
+def subscriptions(fixture, index, rng):
+    return [Call('GET', '/api/users/subscriptions/?recipes_limit=3',
+                 rng.choice(fixture['tokens']), None)]
+
+
+def shopping_list(fixture, index, rng):
+    return [Call('GET', '/api/recipes/download_shopping_cart/',
+                 rng.choice(fixture['tokens']), None)]
+
+
+# name: (weight, builder)
+SCENARIOS = {
+    'feed_anonymous': (15, feed_anonymous),
+    'search': (5, search),
+    'facets': (5, facets),
+    'pantry_match': (5, pantry_match),
+    'similar': (5, similar),
+    'list_authenticated': (15, list_authenticated),
+    'detail_authenticated': (15, detail_authenticated),
+    'favorite_toggle': (10, favorite_toggle),
+    'recipe_create': (5, recipe_create),
+    'subscriptions': (10, subscriptions),
+    'shopping_list': (5, shopping_list),
+}
+
+
+def create_fixture(rng):
+    """Insert the users, recipes and relations the scenarios work on."""
+    users = User.objects.bulk_create([
+        User(
+            email=f'{PREFIX}-{index}@example.com',
+            username=f'{PREFIX}-{index}',
+            first_name='Bench',
+            last_name='User',
+            password='!'
+        )
+        for index in range(USERS)
+    ])
+    UserStats.objects.bulk_create(
+        [UserStats(user=user) for user in users], ignore_conflicts=True
+    )
+    tags = Tag.objects.bulk_create([
+        Tag(name=f'{PREFIX} tag {index}', slug=f'{PREFIX}-{index}')
+        for index in range(6)
+    ])
+    ingredients = Ingredient.objects.bulk_create([
+        Ingredient(name=f'{PREFIX} ingredient {index}', measurement_unit='g')
+        for index in range(40)
+    ])
+    recipes = Recipe.objects.bulk_create([
+        Recipe(
+            author=user,
+            name=f'{rng.choice(ADJECTIVES)} {rng.choice(DISHES)} '
+                 f'({PREFIX} {user.id}-{index})',
+            text='Seeded for the API benchmark.',
+            image=FIXTURE_IMAGE,
+            cooking_time=rng.randint(1, 180)
+        )
+        for user in users
+        for index in range(RECIPES_PER_USER)
+    ])
+    Recipe.tags.through.objects.bulk_create([
+        Recipe.tags.through(recipe_id=recipe.id, tag_id=tag.id)
+        for recipe in recipes
+        for tag in rng.sample(tags, rng.randint(1, 3))
+    ])
+    RecipeIngredient.objects.bulk_create([
+        RecipeIngredient(
+            recipe=recipe, ingredient=ingredient, amount=rng.randint(1, 500)
+        )
+        for recipe in recipes
+        for ingredient in rng.sample(ingredients, rng.randint(3, 8))
+    ])
+    Subscription.objects.bulk_create([
+        Subscription(user=user, author=users[(position + step) % USERS])
+        for position, user in enumerate(users)
+        for step in range(1, 6)
+    ])
+    ShoppingCart.objects.bulk_create([
+        ShoppingCart(user=user, recipe=recipe)
+        for user in users
+        for recipe in rng.sample(recipes, 8)
+    ])
+    return {
+        'tokens': [Token.objects.create(user=user).key for user in users],
+        'recipes': [recipe.id for recipe in recipes],
+        'tags': [tag.slug for tag in tags],
+        'tag_ids': [tag.id for tag in tags],
+        'ingredients': [ingredient.id for ingredient in ingredients],
+    }
+
+
+def delete_fixture():
+    """Remove committed fixture rows and the images uploaded during a run."""
+    for recipe in Recipe.objects.filter(
+        author__username__startswith=PREFIX
+    ).exclude(image=FIXTURE_IMAGE):
+        recipe.image.delete(save=False)
+    User.objects.filter(username__startswith=PREFIX).delete()
+    Tag.objects.filter(slug__startswith=PREFIX).delete()
+    Ingredient.objects.filter(name__startswith=PREFIX).delete()
+
+
+def queries_from(server_timing):
+    match = SERVER_QUERIES.search(server_timing or '')
+    return int(match.group(1)) if match else None
+
+
+def regressions(result, baseline, tolerance):
+    problems = []
+    for name, current in result['scenarios'].items():
+        expected = baseline['scenarios'].get(name)
+        if expected is None:
+            continue
+        if current['rps'] < expected['rps'] * (1 - tolerance):
+            problems.append(
+                f'{name}: {current["rps"]} rps, baseline {expected["rps"]}.'
+            )
+        if current['p95_ms'] > expected['p95_ms'] * (1 + tolerance):
+            problems.append(
+                f'{name}: p95 {current["p95_ms"]} ms, baseline '
+                f'{expected["p95_ms"]} ms.'
+            )
+        queries = current['queries_per_request']
+        expected_queries = expected['queries_per_request']
+        if None not in (queries, expected_queries) and (
+            queries > expected_queries + QUERY_SLACK
+        ):
+            problems.append(
+                f'{name}: {queries} queries per request, baseline '
+                f'{expected_queries}.'
+            )
+    return problems
+
+
+class Command(BaseCommand):
+    help = (
+        'Replay weighted API scenarios in-process, against a local '
+        'gunicorn or against a running server and report throughput, '
+        'latency percentiles and queries per request as JSON.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--target',
+            default='inprocess',
+            help='"inprocess", "gunicorn" or the base URL of a server that '
+                 'uses this database.'
+        )
+        parser.add_argument('--requests', type=int, default=1000)
+        parser.add_argument('--warmup', type=int, default=50)
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=16,
+            help='Parallel clients; in-process runs are sequential.'
+        )
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--workers', type=int, default=2)
+        parser.add_argument('--port', type=int, default=8766)
+        parser.add_argument('--output', help='Write the report to a file.')
+        parser.add_argument(
+            '--baseline', help='Fail on regressions against this report.'
+        )
+        parser.add_argument(
+            '--tolerance',
+            type=float,
+            default=0.2,
+            help='Allowed relative rps drop and p95 growth.'
+        )
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        if options['target'] == 'inprocess':
+            result = self.run_inprocess(rng, options)
+        else:
+            result = self.run_http(rng, options)
+        result['meta'] = {
+            'target': options['target'],
+            'database': connection.vendor,
+            'requests': options['requests'],
+            'concurrency': (
+                1 if options['target'] == 'inprocess'
+                else options['concurrency']
+            ),
+            'seed': options['seed'],
+        }
+
+        report = json.dumps(result, indent=2, sort_keys=True)
+        if options['output']:
+            Path(options['output']).write_text(report + '\n')
+        self.stdout.write(report)
+
+        errors = result['total']['errors']
+        if errors:
+            raise CommandError(f'{errors} request(s) failed.')
+        if options['baseline']:
+            baseline = json.loads(Path(options['baseline']).read_text())
+            problems = regressions(result, baseline, options['tolerance'])
+            if problems:
+                for problem in problems:
+                    self.stderr.write(problem)
+                raise CommandError(
+                    f'{len(problems)} regression(s) against '
+                    f'{options["baseline"]}.'
+                )
+
+    def plan(self, fixture, rng, count, offset=0):
+        names = list(SCENARIOS)
+        weights = [SCENARIOS[name][0] for name in names]
+        return [
+            (name, SCENARIOS[name][1](fixture, offset + index, rng))
+            for index, name in enumerate(
+                rng.choices(names, weights, k=count)
+            )
+        ]
+
+    def run_inprocess(self, rng, options):
+        clients = {}
+
+        def send(call):
+            if call.token not in clients:
+                clients[call.token] = make_client(call.token)
+            response = clients[call.token].generic(
+                call.method, call.path,
+                data=json.dumps(call.body) if call.body else '',
+                content_type='application/json'
+            )
+            if response.streaming:
+                b''.join(response.streaming_content)
+            return (response.status_code,
+                    queries_from(response.headers.get('Server-Timing')))
+
+        with tempfile.TemporaryDirectory() as media_root, override_settings(
+            SERVER_TIMING_ENABLED=True, MEDIA_ROOT=media_root
+        ), rolled_back():
+            fixture = create_fixture(rng)
+            return self.replay(fixture, rng, send, 1, options)
+
+    def run_http(self, rng, options):
+        def send(call):
+            headers = {'Content-Type': 'application/json'}
+            if call.token:
+                headers['Authorization'] = f'Token {call.token}'
+            request = urllib.request.Request(
+                base_url + call.path,
+                data=json.dumps(call.body).encode() if call.body else None,
+                headers=headers,
+                method=call.method
+            )
+            try:
+                with urllib.request.urlopen(request, timeout=30) as response:
+                    response.read()
+                    status, headers = response.status, response.headers
+            except urllib.error.HTTPError as error:
+                error.read()
+                status, headers = error.code, error.headers
+            except (urllib.error.URLError, ConnectionError):
+                return 0, None
+            return status, queries_from(headers.get('Server-Timing'))
+
+        delete_fixture()
+        try:
+            with transaction.atomic():
+                fixture = create_fixture(rng)
+            if options['target'] != 'gunicorn':
+                base_url = options['target'].rstrip('/')
+                return self.replay(
+                    fixture, rng, send, options['concurrency'], options
+                )
+            base_url = f'http://127.0.0.1:{options["port"]}'
+            with gunicorn_server(
+                options['port'], options['workers'],
+                SERVER_TIMING_ENABLED='True'
+            ):
+                wait_until_ready(base_url + '/api/tags/')
+                return self.replay(
+                    fixture, rng, send, options['concurrency'], options
+                )
+        finally:
+            delete_fixture()
+
+    def replay(self, fixture, rng, send, concurrency, options):
+        def run(item):
+            name, calls = item
+            records = []
+            for call in calls:
+                started = time.perf_counter()
+                status, queries = send(call)
+                records.append(Record(
+                    name, time.perf_counter() - started, status, queries
+                ))
+            return records
+
+        warmup = self.plan(fixture, rng, options['warmup'])
+        plan = self.plan(
+            fixture, rng, options['requests'], offset=options['warmup']
+        )
+        with ThreadPoolExecutor(concurrency) as executor:
+            # In-process runs stay on this thread, whose connection holds
+            # the rolled-back fixture.
+            mapper = map if concurrency == 1 else executor.map
+            list(mapper(run, warmup))
+            started = time.perf_counter()
+            batches = list(mapper(run, plan))
+            elapsed = time.perf_counter() - started
+
+        records = [record for batch in batches for record in batch]
+        by_scenario = defaultdict(list)
+        for record in records:
+            by_scenario[record.scenario].append(record)
+        return {
+            'total': self.stats(records, elapsed),
+            'scenarios': {
+                name: self.stats(by_scenario[name], elapsed)
+                for name in SCENARIOS if by_scenario[name]
+            },
+        }
+
+    @staticmethod
+    def stats(records, elapsed):
+        stats = summarize([record.seconds for record in records], elapsed)
+        stats['errors'] = sum(
+            not 200 <= record.status < 400 for record in records
+        )
+        queries = [
+            record.queries for record in records if record.queries is not None
+        ]
+        stats['queries_per_request'] = (
+            round(sum(queries) / len(queries), 2) if queries else None
+        )
+        return stats
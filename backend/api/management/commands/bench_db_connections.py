@@ -0,0 +1,87 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, close_old_connections, connections
+
+from api.benchmarks import make_client, measure
+from foodgram_backend.db.base import DatabaseWrapper as PooledWrapper
+from foodgram_backend.db.base import pool_stats
+
+MODES = {
+    'per_request': {'CONN_MAX_AGE': 0, 'POOL': None},
+    'persistent': {'CONN_MAX_AGE': 600, 'POOL': None},
+    'pooled': {'CONN_MAX_AGE': 0, 'POOL': {'MAX_SIZE': 4}},
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Show how much request time goes into opening database connections '
+        'with per-request, persistent and pooled connections.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=500)
+        parser.add_argument('--path', default='/api/tags/')
+
+    def handle(self, *args, **options):
+        connection = connections[DEFAULT_DB_ALIAS]
+        client = make_client()
+        original_settings = {
+            key: connection.settings_dict.get(key) for key in MODES['pooled']
+        }
+        results = {}
+        try:
+            for mode, overrides in MODES.items():
+                if overrides['POOL'] and not isinstance(
+                    connection, PooledWrapper
+                ):
+                    results[mode] = (
+                        'skipped: ENGINE is not foodgram_backend.db'
+                    )
+                    continue
+                connection.close()
+                connection.settings_dict.update(overrides)
+                results[mode] = self.run_mode(connection, client, options)
+        finally:
+            connection.close()
+            connection.settings_dict.update(original_settings)
+            connection.__dict__.pop('get_new_connection', None)
+
+        results['pool_stats'] = pool_stats()
+        self.stdout.write(json.dumps(results, indent=2))
+
+    def run_mode(self, connection, client, options):
+        probe = {'calls': 0, 'seconds': 0.0}
+        get_new_connection = type(connection).get_new_connection
+
+        def timed_get_new_connection(conn_params):
+            started = time.perf_counter()
+            try:
+                return get_new_connection(connection, conn_params)
+            finally:
+                probe['calls'] += 1
+                probe['seconds'] += time.perf_counter() - started
+
+        connection.get_new_connection = timed_get_new_connection
+
+        def request():
+            # The test client skips the request_started/request_finished
+            # connection handling of the real handlers, so replay it here.
+            close_old_connections()
+            response = client.get(options['path'])
+            close_old_connections()
+            assert response.status_code == 200, response.status_code
+
+        started = time.perf_counter()
+        stats = measure(request, options['iterations'], warmup=0)
+        total = time.perf_counter() - started
+        stats['connects'] = probe['calls']
+        stats['connect_ms_per_request'] = round(
+            probe['seconds'] * 1000 / (options['iterations'] + 1), 3
+        )
+        stats['connect_share_pct'] = round(
+            probe['seconds'] * 100 / total, 1
+        )
+        return stats
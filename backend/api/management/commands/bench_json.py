@@ -0,0 +1,91 @@
+import base64
+import io
+import json
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory
+
+from api.benchmarks import make_client, measure
+from api.parsers import FastJSONParser
+from api.recipes.views import RecipeViewSet
+from api.renderers import FastJSONRenderer, orjson
+
+
+def recipe_page(limit):
+    """Unrendered data of an anonymous recipe list page."""
+    request = APIRequestFactory().get(
+        '/api/recipes/', {'limit': limit},
+        HTTP_HOST=make_client().defaults['HTTP_HOST']
+    )
+    response = RecipeViewSet.as_view({'get': 'list'})(request)
+    return response.data
+
+
+def upload_body(kilobytes):
+    """Recipe create payload carrying an image of the given size."""
+    image = base64.b64encode(os.urandom(kilobytes * 1024)).decode()
+    return json.dumps({
+        'ingredients': [{'id': 1, 'amount': 10}, {'id': 2, 'amount': 5}],
+        'tags': [1, 2],
+        'image': f'data:image/png;base64,{image}',
+        'name': 'Benchmark recipe',
+        'text': 'Рецепт для замеров.',
+        'cooking_time': 30,
+    }, ensure_ascii=False).encode()
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare the stock and the orjson-backed JSON renderer on recipe '
+        'list pages and the parsers on large base64 upload bodies.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=200)
+        parser.add_argument(
+            '--page-sizes', type=int, nargs='+', default=[10, 100]
+        )
+        parser.add_argument(
+            '--upload-kb', type=int, nargs='+', default=[256, 4096],
+            help='Sizes of the uploaded images before base64 encoding.'
+        )
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            raise CommandError('orjson is not installed.')
+        results = {'render': {}, 'parse': {}}
+
+        for limit in options['page_sizes']:
+            data = recipe_page(limit)
+            outputs, stats = {}, {}
+            for name, renderer in (
+                ('stock', JSONRenderer()), ('fast', FastJSONRenderer())
+            ):
+                outputs[name] = renderer.render(data)
+                stats[name] = measure(
+                    lambda: renderer.render(data), options['iterations']
+                )
+            stats['bytes'] = len(outputs['stock'])
+            stats['identical'] = outputs['stock'] == outputs['fast']
+            results['render'][f'page_{limit}'] = stats
+
+        for kilobytes in options['upload_kb']:
+            body = upload_body(kilobytes)
+            outputs, stats = {}, {}
+            for name, parser in (
+                ('stock', JSONParser()), ('fast', FastJSONParser())
+            ):
+                outputs[name] = parser.parse(io.BytesIO(body))
+                stats[name] = measure(
+                    lambda: parser.parse(io.BytesIO(body)),
+                    options['iterations']
+                )
+            stats['bytes'] = len(body)
+            stats['identical'] = outputs['stock'] == outputs['fast']
+            results['parse'][f'upload_{kilobytes}kb'] = stats
+
+        self.stdout.write(json.dumps(results, indent=2))
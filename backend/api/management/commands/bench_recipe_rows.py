@@ -0,0 +1,84 @@
+import json
+import time
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+
+from rest_framework.authtoken.models import Token
+
+from api.benchmarks import make_client, measure, rolled_back
+
+User = get_user_model()
+
+MODES = (('serializers', False), ('rows', True))
+
+
+def cpu_seconds(func, iterations):
+    """Process CPU time of one call, averaged over ``iterations``."""
+    started = time.process_time()
+    for _ in range(iterations):
+        func()
+    return (time.process_time() - started) / iterations
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare recipe list pages rendered by the serializers and from '
+        'rows: latency and the CPU time of this process per recipe.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=200)
+        parser.add_argument(
+            '--page-sizes', type=int, nargs='+', default=[10, 100]
+        )
+
+    def handle(self, *args, **options):
+        results = {}
+        with rolled_back():
+            suffix = uuid.uuid4().hex[:8]
+            user = User.objects.create_user(
+                email=f'bench-{suffix}@example.com',
+                username=f'bench-{suffix}',
+                password=uuid.uuid4().hex,
+                first_name='Bench',
+                last_name='User'
+            )
+            clients = {
+                'anonymous': make_client(),
+                'authenticated': make_client(
+                    Token.objects.create(user=user).key
+                ),
+            }
+            for name, client in clients.items():
+                for limit in options['page_sizes']:
+                    results[f'{name}_{limit}'] = self.compare(
+                        client, f'/api/recipes/?limit={limit}', options
+                    )
+        self.stdout.write(json.dumps(results, indent=2))
+
+    def compare(self, client, path, options):
+        def request():
+            response = client.get(path)
+            assert response.status_code == 200, response.status_code
+            return response
+
+        recipes = len(request().json()['results'])
+        if not recipes:
+            raise CommandError('No recipes to render.')
+        result = {'recipes': recipes}
+        for name, fast in MODES:
+            with override_settings(
+                RECIPE_LIST_FAST_PATH=fast, RECIPE_FEED_CACHE_TTL=0
+            ):
+                stats = measure(request, options['iterations'])
+                cpu = cpu_seconds(request, options['iterations'])
+                stats['cpu_us_per_row'] = round(cpu / recipes * 1e6, 1)
+            result[name] = stats
+        before, after = (
+            result[name]['cpu_us_per_row'] for name, _ in MODES
+        )
+        result['cpu_us_saved_per_row'] = round(before - after, 1)
+        return result
@@ -0,0 +1,97 @@
+import json
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from itertools import cycle, islice
+
+from django.core.management.base import BaseCommand
+
+from api.benchmarks import gunicorn_server, summarize, wait_until_ready
+
+DEFAULT_PATHS = [
+    '/api/recipes/',
+    '/api/recipes/?page=2',
+    '/api/tags/',
+    '/api/ingredients/?name=a',
+]
+
+
+def process_rss_kb(pid):
+    """Resident set size of a process in kB (Linux only)."""
+    try:
+        with open(f'/proc/{pid}/status') as status:
+            for line in status:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1])
+    except FileNotFoundError:
+        pass
+    return 0
+
+
+def tree_rss_kb(pid):
+    """RSS of a gunicorn master and all of its workers."""
+    total = process_rss_kb(pid)
+    try:
+        with open(f'/proc/{pid}/task/{pid}/children') as children:
+            total += sum(process_rss_kb(int(child))
+                         for child in children.read().split())
+    except FileNotFoundError:
+        pass
+    return total
+
+
+class Command(BaseCommand):
+    help = (
+        'Start gunicorn in WSGI and ASGI mode with the same number of '
+        'workers and compare throughput, p99 latency and memory.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--modes', nargs='+', default=['wsgi', 'asgi'],
+            choices=['wsgi', 'asgi']
+        )
+        parser.add_argument('--workers', type=int, default=2)
+        parser.add_argument('--concurrency', type=int, default=32)
+        parser.add_argument('--requests', type=int, default=2000)
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument('--path', action='append', dest='paths')
+
+    def handle(self, *args, **options):
+        paths = options['paths'] or DEFAULT_PATHS
+        results = {}
+        for mode in options['modes']:
+            results[mode] = self.run_mode(mode, paths, options)
+        self.stdout.write(json.dumps(results, indent=2))
+
+    def run_mode(self, mode, paths, options):
+        base_url = f'http://127.0.0.1:{options["port"]}'
+        with gunicorn_server(
+            options['port'], options['workers'], SERVER_MODE=mode
+        ) as server:
+            wait_until_ready(base_url + paths[0])
+            stats = self.load(base_url, paths, options)
+            stats['rss_mb'] = round(tree_rss_kb(server.pid) / 1024, 1)
+            return stats
+
+    def load(self, base_url, paths, options):
+        def fetch(path):
+            started = time.perf_counter()
+            try:
+                urllib.request.urlopen(base_url + path, timeout=30).read()
+                failed = False
+            except (urllib.error.URLError, ConnectionError):
+                failed = True
+            return time.perf_counter() - started, failed
+
+        targets = list(islice(cycle(paths), options['requests']))
+        started = time.perf_counter()
+        with ThreadPoolExecutor(options['concurrency']) as executor:
+            outcomes = list(executor.map(fetch, targets))
+        stats = summarize(
+            [timing for timing, _ in outcomes],
+            time.perf_counter() - started
+        )
+        stats['errors'] = sum(failed for _, failed in outcomes)
+        return stats
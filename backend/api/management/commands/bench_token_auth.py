@@ -0,0 +1,54 @@
+import json
+import uuid
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+from rest_framework.views import APIView
+
+from api.authentication import CachedTokenAuthentication
+from api.benchmarks import make_client, measure, rolled_back
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare authenticated GET throughput with the stock and the cached '
+        'token authentication classes.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=500)
+        parser.add_argument('--path', default='/api/users/me/')
+
+    def handle(self, *args, **options):
+        results = {}
+        with rolled_back():
+            suffix = uuid.uuid4().hex[:8]
+            user = User.objects.create_user(
+                email=f'bench-{suffix}@example.com',
+                username=f'bench-{suffix}',
+                password=uuid.uuid4().hex,
+                first_name='Bench',
+                last_name='User'
+            )
+            client = make_client(Token.objects.create(user=user).key)
+
+            def request():
+                response = client.get(options['path'])
+                assert response.status_code == 200, response.status_code
+
+            for name, auth_class in (
+                ('token', TokenAuthentication),
+                ('cached_token', CachedTokenAuthentication),
+            ):
+                with mock.patch.object(
+                    APIView, 'authentication_classes', [auth_class]
+                ):
+                    results[name] = measure(request, options['iterations'])
+
+        self.stdout.write(json.dumps(results, indent=2))
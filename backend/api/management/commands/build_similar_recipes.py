@@ -0,0 +1,160 @@
+import multiprocessing
+import os
+import time
+from collections import deque
+from itertools import chain
+
+import numpy as np
+from django.core.management.base import BaseCommand
+from django.db import connections, transaction
+from django.utils import timezone
+
+from api import similarity
+from api.utils import int_array
+from recipes.models import Recipe, RecipeIngredient, SimilarRecipe
+
+BATCH_SIZE = 5000
+
+
+def read_pairs(queryset, fields):
+    rows = queryset.order_by().values_list(*fields).iterator(
+        chunk_size=20000
+    )
+    return int_array(chain.from_iterable(rows)).reshape(-1, 2)
+
+
+class Command(BaseCommand):
+    help = (
+        'Precompute the most similar recipes by shared ingredients and '
+        'tags, for every recipe or only for those affected by changes.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--stale', action='store_true',
+            help='Only refresh recipes saved since their last refresh and '
+                 'recipes listing them as similar.'
+        )
+        parser.add_argument(
+            '--top-k', type=int, default=10,
+            help='Similar recipes stored per recipe.'
+        )
+        parser.add_argument(
+            '--max-df', type=float, default=0.02,
+            help='Ingredients and tags used by more than this share of '
+                 'recipes only affect scores, not the candidate search.'
+        )
+        parser.add_argument(
+            '--block-size', type=int, default=256,
+            help='Recipes per sparse product.'
+        )
+        parser.add_argument(
+            '--processes', type=int, default=os.cpu_count(),
+            help='Worker processes.'
+        )
+
+    def handle(self, *args, **options):
+        started = timezone.now()
+        if options['stale']:
+            stale = Recipe.objects.filter(similar_stale=True)
+            targets = set(stale.values_list('pk', flat=True))
+            targets.update(SimilarRecipe.objects.filter(
+                similar__in=stale
+            ).values_list('recipe_id', flat=True))
+            if not targets:
+                self.stdout.write('No stale recipes.')
+                return
+
+        timer = time.perf_counter()
+        vectors = similarity.RecipeVectors(
+            ids=int_array(
+                Recipe.objects.order_by().values_list(
+                    'pk', flat=True
+                ).iterator(chunk_size=20000)
+            ),
+            ingredients=read_pairs(
+                RecipeIngredient.objects, ('recipe_id', 'ingredient_id')
+            ),
+            tags=read_pairs(
+                Recipe.tags.through.objects, ('recipe_id', 'tag_id')
+            ),
+            max_df=options['max_df']
+        )
+        rows = (
+            vectors.rows_of(sorted(targets)) if options['stale']
+            else np.arange(len(vectors.ids))
+        )
+        blocks = [
+            rows[start:start + options['block_size']]
+            for start in range(0, len(rows), options['block_size'])
+        ]
+        self.stdout.write(
+            f'Loaded {len(vectors.ids)} recipes in '
+            f'{time.perf_counter() - timer:.0f}s; refreshing {len(rows)}.'
+        )
+
+        # Forked workers must not inherit open database sockets.
+        connections.close_all()
+        timer, stored = time.perf_counter(), 0
+        with multiprocessing.Pool(
+            options['processes'],
+            initializer=similarity.init_worker,
+            initargs=(vectors,)
+        ) as pool:
+            results = self.compute(pool, blocks, options)
+            for done, (block, result) in enumerate(results, 1):
+                stored += self.store(vectors.ids[block], result, started)
+                self.stdout.write(
+                    f'\r{done * 100 // len(blocks)}% {stored} similar '
+                    f'recipes ({time.perf_counter() - timer:.0f}s)',
+                    ending=''
+                )
+                self.stdout.flush()
+        self.stdout.write('')
+        self.stdout.write(self.style.SUCCESS(
+            f'Refreshed similar recipes of {len(rows)} recipes.'
+        ))
+
+    def compute(self, pool, blocks, options):
+        """Yield ``(block, neighbours)`` keeping a few blocks in flight."""
+        pending = deque()
+        for block in blocks:
+            pending.append((block, pool.apply_async(
+                similarity.neighbours, (block, options['top_k'])
+            )))
+            if len(pending) > 2 * options['processes']:
+                block, result = pending.popleft()
+                yield block, result.get()
+        while pending:
+            block, result = pending.popleft()
+            yield block, result.get()
+
+    def store(self, recipe_ids, neighbours, started):
+        """Replace the similar recipes of a block; return the row count."""
+        recipe_ids = recipe_ids.tolist()
+        sources, targets, scores = (
+            column.tolist() for column in neighbours
+        )
+        with transaction.atomic():
+            # Skip recipes deleted since the vectors were loaded.
+            alive = set(Recipe.objects.filter(
+                pk__in=set(recipe_ids) | set(targets)
+            ).values_list('pk', flat=True))
+            SimilarRecipe.objects.filter(recipe_id__in=recipe_ids).delete()
+            created = SimilarRecipe.objects.bulk_create(
+                [
+                    SimilarRecipe(
+                        recipe_id=source, similar_id=target, score=score
+                    )
+                    for source, target, score in zip(
+                        sources, targets, scores
+                    )
+                    if source in alive and target in alive
+                ],
+                batch_size=BATCH_SIZE
+            )
+            # Recipes saved again meanwhile stay stale.
+            Recipe.objects.filter(
+                pk__in=recipe_ids, updated_at__lte=started
+            ).update(similar_stale=False)
+        return len(created)
@@ -0,0 +1,312 @@
+import json
+import random
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+
+from rest_framework.authtoken.models import Token
+
+from api.benchmarks import make_client, rolled_back
+from foodgram_backend.timing import fingerprint
+from recipes.models import (Favorite, Ingredient, Recipe, RecipeIngredient,
+                            ShoppingCart, SimilarRecipe, Tag)
+from recipes.search import update_search_vectors
+from users.models import Subscription, UserStats
+
+User = get_user_model()
+
+BASELINE = Path(settings.BASE_DIR) / 'api' / 'query_plans.json'
+BATCH_SIZE = 5000
+# Pagination counts read every matching row by design; only their cost is
+# compared with the baseline.
+COUNT_PREFIX = 'SELECT COUNT('
+
+# (name, authenticated, path); ``{recipe}`` and ``{author}`` are filled in.
+ENDPOINTS = (
+    ('recipes-list', False, '/api/recipes/'),
+    ('recipes-list-page', False, '/api/recipes/?page=50&limit=6'),
+    ('recipes-list-tags', False, '/api/recipes/?tags=tag-1&tags=tag-2'),
+    ('recipes-list-author', False, '/api/recipes/?author={author}'),
+    ('recipes-list-search', False, '/api/recipes/?search=recipe+100'),
+    ('recipes-list-summary', False, '/api/recipes/?view=summary'),
+    ('recipes-list-auth', True, '/api/recipes/'),
+    ('recipes-list-favorited', True, '/api/recipes/?is_favorited=1'),
+    ('recipes-list-cart', True, '/api/recipes/?is_in_shopping_cart=1'),
+    ('recipes-detail', False, '/api/recipes/{recipe}/'),
+    ('recipes-similar', False, '/api/recipes/{recipe}/similar/'),
+    ('recipes-download-shopping-cart', True,
+     '/api/recipes/download_shopping_cart/'),
+    ('users-subscriptions', True, '/api/users/subscriptions/'),
+    ('users-subscriptions-activity', True,
+     '/api/users/subscriptions/?ordering=activity'),
+    ('users-list', False, '/api/users/'),
+    ('users-list-summary', False, '/api/users/?view=summary'),
+    ('ingredients-list', False, '/api/ingredients/?name=ingredient-1'),
+)
+
+
+def plan_nodes(plan):
+    yield plan
+    for child in plan.get('Plans', ()):
+        yield from plan_nodes(child)
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed a dataset in a rolled-back transaction, EXPLAIN the SQL of '
+        'the main endpoints and fail on sequential scans of large tables '
+        'or on plan costs above the checked-in baseline.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=3000)
+        parser.add_argument('--recipes', type=int, default=20000)
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument(
+            '--large-table',
+            type=int,
+            default=5000,
+            help='Row estimate above which a sequential scan is an error.'
+        )
+        parser.add_argument(
+            '--tolerance',
+            type=float,
+            default=0.5,
+            help='Allowed relative cost growth over the baseline.'
+        )
+        parser.add_argument(
+            '--update-baseline',
+            action='store_true',
+            help=f'Write the measured costs to {BASELINE.name}.'
+        )
+        parser.add_argument(
+            '--verbose-plans',
+            action='store_true',
+            help='Print the plan of every query.'
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('Query plans are only checked on PostgreSQL.')
+
+        with rolled_back():
+            self.stdout.write('Seeding dataset...')
+            user, recipe_id, author_id = self.seed(
+                options['users'], options['recipes'],
+                random.Random(options['seed'])
+            )
+            with connection.cursor() as cursor:
+                # Merge the seeded rows into the search index, as
+                # autovacuum would: the planner costs a long GIN pending
+                # list as a full scan of it.
+                cursor.execute(
+                    "SELECT gin_clean_pending_list('recipe_search_idx')"
+                )
+                cursor.execute('ANALYZE')
+            row_estimates = self.row_estimates()
+            token = Token.objects.create(user=user).key
+            clients = {False: make_client(), True: make_client(token)}
+            measured = {}
+            for name, authenticated, path in ENDPOINTS:
+                path = path.format(recipe=recipe_id, author=author_id)
+                measured[name] = self.explain_endpoint(
+                    clients[authenticated], path, options['verbose_plans']
+                )
+
+        if options['update_baseline']:
+            BASELINE.write_text(json.dumps({
+                name: {sql: result['cost'] for sql, result in queries.items()}
+                for name, queries in measured.items()
+            }, indent=2, sort_keys=True) + '\n')
+            self.stdout.write(self.style.SUCCESS(f'Wrote {BASELINE}.'))
+
+        problems = self.find_problems(measured, row_estimates, options)
+        if problems:
+            for problem in problems:
+                self.stderr.write(problem)
+            raise CommandError(f'{len(problems)} query plan problem(s).')
+        self.stdout.write(self.style.SUCCESS(
+            f'{sum(map(len, measured.values()))} queries on '
+            f'{len(measured)} endpoints have acceptable plans.'
+        ))
+
+    def seed(self, user_count, recipe_count, rng):
+        """Bulk insert a skewed dataset and return a busy user."""
+        users = User.objects.bulk_create(
+            [
+                User(
+                    email=f'plan-user-{index}@example.com',
+                    username=f'plan-user-{index}',
+                    first_name='Plan',
+                    last_name='User',
+                    password='!'
+                )
+                for index in range(user_count)
+            ],
+            batch_size=BATCH_SIZE
+        )
+        tags = Tag.objects.bulk_create([
+            Tag(name=f'Tag {index}', slug=f'tag-{index}')
+            for index in range(20)
+        ])
+        ingredients = Ingredient.objects.bulk_create(
+            [
+                Ingredient(name=f'ingredient-{index}', measurement_unit='g')
+                for index in range(2000)
+            ],
+            batch_size=BATCH_SIZE
+        )
+        # A few prolific authors write most of the recipes.
+        authors = [rng.choice(users[:user_count // 10 or 1])
+                   if rng.random() < 0.8 else rng.choice(users)
+                   for _ in range(recipe_count)]
+        recipes = Recipe.objects.bulk_create(
+            [
+                Recipe(
+                    author=author,
+                    name=f'Plan recipe {index}',
+                    text='Seeded for query plan checks.',
+                    image='recipes/images/plan.png',
+                    cooking_time=rng.randint(1, 180)
+                )
+                for index, author in enumerate(authors)
+            ],
+            batch_size=BATCH_SIZE
+        )
+        update_search_vectors(Recipe.objects.all())
+        UserStats.objects.bulk_create(
+            [UserStats(user=user) for user in users],
+            batch_size=BATCH_SIZE,
+            ignore_conflicts=True
+        )
+        Recipe.tags.through.objects.bulk_create(
+            [
+                Recipe.tags.through(recipe_id=recipe.id, tag_id=tag.id)
+                for recipe in recipes
+                for tag in rng.sample(tags, rng.randint(1, 3))
+            ],
+            batch_size=BATCH_SIZE
+        )
+        RecipeIngredient.objects.bulk_create(
+            [
+                RecipeIngredient(
+                    recipe=recipe, ingredient=ingredient,
+                    amount=rng.randint(1, 500)
+                )
+                for recipe in recipes
+                for ingredient in rng.sample(ingredients, rng.randint(3, 8))
+            ],
+            batch_size=BATCH_SIZE
+        )
+        SimilarRecipe.objects.bulk_create(
+            [
+                SimilarRecipe(
+                    recipe_id=recipe.id, similar_id=similar.id,
+                    score=rng.random()
+                )
+                for recipe in recipes
+                for similar in rng.sample(recipes, 10)
+            ],
+            batch_size=BATCH_SIZE
+        )
+
+        busy_user = users[0]
+        for model, per_user in ((Favorite, 3), (ShoppingCart, 1)):
+            pairs = {
+                (user.id, rng.choice(recipes).id)
+                for user in users for _ in range(per_user)
+            }
+            pairs |= {(busy_user.id, recipe.id) for recipe in recipes[:40]}
+            model.objects.bulk_create(
+                [model(user_id=user_id, recipe_id=recipe_id)
+                 for user_id, recipe_id in pairs],
+                batch_size=BATCH_SIZE
+            )
+        follows = {
+            (user.id, rng.choice(users).id)
+            for user in users for _ in range(5)
+        }
+        follows |= {(busy_user.id, author.id) for author in users[1:31]}
+        Subscription.objects.bulk_create(
+            [Subscription(user_id=user_id, author_id=author_id)
+             for user_id, author_id in follows if user_id != author_id],
+            batch_size=BATCH_SIZE
+        )
+        return busy_user, recipes[len(recipes) // 2].id, authors[0].id
+
+    def row_estimates(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT relname, reltuples FROM pg_class "
+                "WHERE relkind = 'r' AND relnamespace = "
+                "'public'::regnamespace"
+            )
+            return dict(cursor.fetchall())
+
+    def explain_endpoint(self, client, path, verbose):
+        # A cached response would hide the queries behind it.
+        with override_settings(RECIPE_FEED_CACHE_TTL=0):
+            with CaptureQueriesContext(connection) as queries:
+                response = client.get(path)
+        if response.status_code != 200:
+            raise CommandError(
+                f'GET {path} returned {response.status_code}.'
+            )
+
+        results = {}
+        with connection.cursor() as cursor:
+            for query in queries.captured_queries:
+                sql = query['sql']
+                if not sql.lstrip().upper().startswith('SELECT'):
+                    continue
+                cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}')
+                plan = cursor.fetchone()[0][0]['Plan']
+                results[fingerprint(sql)] = {
+                    'cost': plan['Total Cost'],
+                    'plan': plan,
+                }
+                if verbose:
+                    self.stdout.write(
+                        f'{path}\n{sql}\n{json.dumps(plan, indent=2)}\n'
+                    )
+        return results
+
+    def sequential_scans(self, name, sql, plan, row_estimates, large_table):
+        problems = []
+        for node in plan_nodes(plan):
+            if node['Node Type'] != 'Seq Scan':
+                continue
+            rows = row_estimates.get(node['Relation Name'], 0)
+            if rows >= large_table:
+                problems.append(
+                    f'{name}: sequential scan on {node["Relation Name"]} '
+                    f'(~{int(rows)} rows) in\n  {sql}'
+                )
+        return problems
+
+    def find_problems(self, measured, row_estimates, options):
+        baseline = (
+            json.loads(BASELINE.read_text()) if BASELINE.exists() else {}
+        )
+        problems = []
+        for name, queries in measured.items():
+            for sql, result in queries.items():
+                if not sql.startswith(COUNT_PREFIX):
+                    problems += self.sequential_scans(
+                        name, sql, result['plan'], row_estimates,
+                        options['large_table']
+                    )
+                expected = baseline.get(name, {}).get(sql)
+                if expected is None:
+                    continue
+                if result['cost'] > expected * (1 + options['tolerance']):
+                    problems.append(
+                        f'{name}: cost {result["cost"]} exceeds baseline '
+                        f'{expected} by more than '
+                        f'{options["tolerance"]:.0%} in\n  {sql}'
+                    )
+        return problems
@@ -0,0 +1,267 @@
+import csv
+import io
+import multiprocessing
+import os
+import time
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, connections, transaction
+from django.db.models import Max
+
+from api import datasets
+from recipes.models import (Favorite, Ingredient, Recipe, RecipeIngredient,
+                            ShoppingCart, Tag)
+from recipes.search import update_search_vectors
+from users.models import Subscription
+
+User = get_user_model()
+
+INGREDIENTS_CSV = Path(settings.BASE_DIR).parent / 'data' / 'ingredients.csv'
+BATCH_SIZE = 5000
+# Row keys returned by the generators and the models they are stored in.
+MODELS = {
+    'users': User,
+    'recipes': Recipe,
+    'tags': Recipe.tags.through,
+    'ingredients': RecipeIngredient,
+    'favorites': Favorite,
+    'cart': ShoppingCart,
+    'subscriptions': Subscription,
+}
+# Phases run in order so that foreign keys always point at inserted rows.
+PHASES = ('users', 'recipes', 'interactions')
+
+
+@contextmanager
+def explicit_timestamps(model):
+    """Let ``bulk_create`` keep generated ``auto_now(_add)`` values."""
+    fields = [
+        (field, field.auto_now, field.auto_now_add)
+        for field in model._meta.concrete_fields
+        if any(getattr(field, flag, False)
+               for flag in ('auto_now', 'auto_now_add'))
+    ]
+    for field, _, _ in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in fields:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class Command(BaseCommand):
+    help = (
+        'Insert a reproducible synthetic dataset with power-law authors, '
+        'recipe popularity and user activity for scale testing.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10000)
+        parser.add_argument('--recipes', type=int, default=50000)
+        parser.add_argument(
+            '--favorites', type=float, default=20,
+            help='Mean favorites per user.'
+        )
+        parser.add_argument(
+            '--cart', type=float, default=3,
+            help='Mean shopping cart size per user.'
+        )
+        parser.add_argument(
+            '--subscriptions', type=float, default=10,
+            help='Mean followed authors per user.'
+        )
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument(
+            '--processes', type=int, default=os.cpu_count(),
+            help='Row generator processes.'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=2000,
+            help='Users or recipes generated per task. Part of the seed: '
+                 'change it and the dataset changes.'
+        )
+        parser.add_argument(
+            '--ingredients', type=Path, default=INGREDIENTS_CSV,
+            help='CSV of "name,measurement unit" rows.'
+        )
+        parser.add_argument(
+            '--method', choices=('auto', 'copy', 'bulk'), default='auto',
+            help='"copy" (PostgreSQL only) or "bulk" (bulk_create); '
+                 '"auto" uses COPY when available.'
+        )
+
+    def handle(self, *args, **options):
+        if options['users'] < 1 or options['recipes'] < 1:
+            raise CommandError('--users and --recipes must be positive.')
+        method = options['method']
+        if method == 'auto':
+            method = 'copy' if connection.vendor == 'postgresql' else 'bulk'
+        if method == 'copy' and connection.vendor != 'postgresql':
+            raise CommandError('COPY is only available on PostgreSQL.')
+        self.insert = getattr(self, f'insert_{method}')
+        self.copy_fields = {
+            key: self.copy_fields_of(model) for key, model in MODELS.items()
+        }
+
+        recipe_base = self.next_id(Recipe)
+        plan = datasets.make_plan(
+            seed=options['seed'],
+            user_base=self.next_id(User),
+            users=options['users'],
+            recipe_base=recipe_base,
+            recipes=options['recipes'],
+            tag_ids=self.ensure_tags(),
+            ingredient_ids=self.ensure_ingredients(options['ingredients']),
+            favorites=options['favorites'],
+            cart=options['cart'],
+            subscriptions=options['subscriptions'],
+            copy_columns={
+                key: [
+                    (field.attname, field.get_default()) for field in fields
+                ]
+                for key, fields in self.copy_fields.items()
+            } if method == 'copy' else None
+        )
+        # Forked workers must not inherit open database sockets.
+        connections.close_all()
+        started = time.perf_counter()
+        with multiprocessing.Pool(
+            options['processes'],
+            initializer=datasets.init_worker,
+            initargs=(plan,)
+        ) as pool:
+            for phase in PHASES:
+                count = options['recipes' if phase == 'recipes' else 'users']
+                chunks = [
+                    (start, min(start + options['chunk_size'], count))
+                    for start in range(0, count, options['chunk_size'])
+                ]
+                self.run_phase(
+                    phase, self.generate(pool, phase, chunks, options),
+                    len(chunks), recipe_base
+                )
+
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(
+                no_style(), [User, Recipe]
+            ):
+                cursor.execute(sql)
+            if connection.vendor == 'postgresql':
+                cursor.execute('ANALYZE')
+        call_command('reconcile_user_stats', stdout=self.stdout)
+        self.stdout.write(self.style.SUCCESS(
+            f'Generated {options["users"]} users and {options["recipes"]} '
+            f'recipes in {time.perf_counter() - started:.0f}s.'
+        ))
+
+    def generate(self, pool, phase, chunks, options):
+        """Yield ``(chunk, result)`` keeping a few chunks in flight.
+
+        Bounding the queue keeps fast workers from piling generated rows
+        up in memory while the database catches up.
+        """
+        pending = deque()
+        for chunk in chunks:
+            pending.append(
+                (chunk, pool.apply_async(datasets.generate, (phase, chunk)))
+            )
+            if len(pending) > 2 * options['processes']:
+                chunk, result = pending.popleft()
+                yield chunk, result.get()
+        while pending:
+            chunk, result = pending.popleft()
+            yield chunk, result.get()
+
+    def run_phase(self, phase, results, chunks, recipe_base):
+        rows, started = {}, time.perf_counter()
+        for done, ((start, stop), result) in enumerate(results, 1):
+            with transaction.atomic():
+                for key, (count, payload) in result.items():
+                    if count:
+                        self.insert(key, payload)
+                    rows[key] = rows.get(key, 0) + count
+                if phase == 'recipes':
+                    update_search_vectors(Recipe.objects.filter(
+                        pk__range=(recipe_base + start, recipe_base + stop - 1)
+                    ))
+            elapsed = time.perf_counter() - started
+            counts = ', '.join(f'{count} {key}' for key, count in rows.items())
+            self.stdout.write(
+                f'\r{phase}: {done * 100 // chunks}% {counts} '
+                f'({sum(rows.values()) / elapsed:,.0f} rows/s)',
+                ending=''
+            )
+            self.stdout.flush()
+        self.stdout.write('')
+
+    def next_id(self, model):
+        return (model.objects.aggregate(last=Max('pk'))['last'] or 0) + 1
+
+    def ensure_tags(self):
+        Tag.objects.bulk_create(
+            [Tag(name=name, slug=slug) for name, slug in datasets.TAGS],
+            ignore_conflicts=True
+        )
+        return list(Tag.objects.values_list('pk', flat=True))
+
+    def ensure_ingredients(self, path):
+        if not path.is_file():
+            raise CommandError(f'{path} does not exist.')
+        max_length = Ingredient._meta.get_field('name').max_length
+        with open(path, encoding='utf-8', newline='') as source:
+            wanted = {
+                (name.strip(), unit.strip())
+                for name, unit in csv.reader(source)
+                if len(name.strip()) <= max_length
+            }
+        existing = set(Ingredient.objects.values_list(
+            'name', 'measurement_unit'
+        ))
+        Ingredient.objects.bulk_create(
+            [
+                Ingredient(name=name, measurement_unit=unit)
+                for name, unit in sorted(wanted - existing)
+            ],
+            batch_size=BATCH_SIZE
+        )
+        return [
+            pk for pk, name, unit in Ingredient.objects.values_list(
+                'pk', 'name', 'measurement_unit'
+            ).order_by('pk')
+            if (name, unit) in wanted
+        ]
+
+    def insert_bulk(self, key, rows):
+        model = MODELS[key]
+        with explicit_timestamps(model):
+            model.objects.bulk_create(
+                [model(**row) for row in rows], batch_size=BATCH_SIZE
+            )
+
+    def insert_copy(self, key, text):
+        quote = connection.ops.quote_name
+        columns = ', '.join(
+            quote(field.column) for field in self.copy_fields[key]
+        )
+        with connection.cursor() as cursor:
+            cursor.copy_expert(
+                f'COPY {quote(MODELS[key]._meta.db_table)} ({columns}) '
+                f'FROM STDIN',
+                io.StringIO(text)
+            )
+
+    @staticmethod
+    def copy_fields_of(model):
+        """Columns to COPY; only users and recipes get explicit ids."""
+        return [
+            field for field in model._meta.concrete_fields
+            if not field.primary_key or model in (User, Recipe)
+        ]
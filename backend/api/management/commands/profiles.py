@@ -0,0 +1,104 @@
+import io
+import pstats
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from foodgram_backend.profiling import list_profiles, make_token
+
+SORT_KEYS = ('cumulative', 'tottime', 'ncalls')
+
+
+def describe(path):
+    """Split a profile file name into its recorded fields."""
+    stamp, method, route, elapsed, _ = path.stem.split('_')
+    return {
+        'name': path.name,
+        'time': stamp,
+        'method': method,
+        'route': route,
+        'ms': int(elapsed.removesuffix('ms')),
+        'kb': round(path.stat().st_size / 1024, 1),
+    }
+
+
+class Command(BaseCommand):
+    help = 'List and summarize request profiles captured by the middleware.'
+
+    def add_arguments(self, parser):
+        actions = parser.add_subparsers(dest='action', required=True)
+
+        list_parser = actions.add_parser(
+            'list', help='Show captured profiles, newest first.'
+        )
+        list_parser.add_argument('--route', help='Only this URL name.')
+
+        show_parser = actions.add_parser(
+            'show',
+            help='Print the hottest functions of one profile, or of all '
+                 'profiles of a route combined.'
+        )
+        show_parser.add_argument('name', nargs='?', help='Profile file name.')
+        show_parser.add_argument('--route', help='Combine profiles by route.')
+        show_parser.add_argument('--limit', type=int, default=25)
+        show_parser.add_argument(
+            '--sort', choices=SORT_KEYS, default='cumulative'
+        )
+
+        actions.add_parser(
+            'token', help='Print a signed value for the X-Profile header.'
+        )
+
+    def handle(self, *args, **options):
+        getattr(self, f'handle_{options["action"]}')(options)
+
+    def profiles(self, route=None):
+        profiles = [describe(path) for path in list_profiles()]
+        if route:
+            profiles = [row for row in profiles if row['route'] == route]
+        return profiles
+
+    def handle_list(self, options):
+        profiles = self.profiles(options['route'])
+        if not profiles:
+            self.stdout.write(f'No profiles in {settings.PROFILE_DIR}.')
+            return
+        self.stdout.write(
+            f'{"time":<22} {"method":<7} {"route":<40} {"ms":>7} {"kb":>7}'
+        )
+        for row in profiles:
+            self.stdout.write(
+                f'{row["time"]:<22} {row["method"]:<7} {row["route"]:<40} '
+                f'{row["ms"]:>7} {row["kb"]:>7}'
+            )
+        durations = sorted(row['ms'] for row in profiles)
+        self.stdout.write(
+            f'{len(profiles)} profiles, median '
+            f'{durations[len(durations) // 2]} ms, max {durations[-1]} ms.'
+        )
+
+    def handle_show(self, options):
+        if options['name']:
+            paths = [Path(settings.PROFILE_DIR) / options['name']]
+            if not paths[0].is_file():
+                raise CommandError(f'No profile named {options["name"]}.')
+        elif options['route']:
+            paths = [
+                Path(settings.PROFILE_DIR) / row['name']
+                for row in self.profiles(options['route'])
+            ]
+            if not paths:
+                raise CommandError(f'No profiles for {options["route"]}.')
+        else:
+            raise CommandError('Pass a profile name or --route.')
+
+        output = io.StringIO()
+        stats = pstats.Stats(*map(str, paths), stream=output)
+        stats.strip_dirs().sort_stats(options['sort']).print_stats(
+            options['limit']
+        )
+        self.stdout.write(output.getvalue())
+
+    def handle_token(self, options):
+        self.stdout.write(make_token())
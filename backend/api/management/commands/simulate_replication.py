@@ -0,0 +1,50 @@
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from foodgram_backend.routers import replica_aliases
+
+
+class Command(BaseCommand):
+    help = (
+        'Copy the primary SQLite database to every replica with a fixed '
+        'lag, to try the replica router locally. For PostgreSQL replicas '
+        'set recovery_min_apply_delay on the standby instead.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--lag', type=float, default=2.0,
+            help='Seconds between taking a snapshot and applying it.'
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Apply a single snapshot without waiting and exit.'
+        )
+
+    def handle(self, *args, **options):
+        primary = settings.DATABASES['default']
+        replicas = [settings.DATABASES[alias] for alias in replica_aliases()]
+        databases = [primary] + replicas
+        if not replicas:
+            raise CommandError('No replica databases are configured.')
+        if any('sqlite3' not in db['ENGINE'] for db in databases):
+            raise CommandError(
+                'Only SQLite databases can be replicated by this command.'
+            )
+
+        while True:
+            snapshot = sqlite3.connect(':memory:')
+            with sqlite3.connect(primary['NAME']) as source:
+                source.backup(snapshot)
+            if not options['once']:
+                time.sleep(options['lag'])
+            for replica in replicas:
+                with sqlite3.connect(replica['NAME']) as target:
+                    snapshot.backup(target)
+            snapshot.close()
+            self.stdout.write(f'Replicated to {len(replicas)} database(s).')
+            if options['once']:
+                return
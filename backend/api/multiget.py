@@ -0,0 +1,49 @@
+"""Many objects by id in one request: ``?ids=1,5,9``.
+
+List endpoints that support it answer with ``{"results": [...],
+"missing": [...]}`` instead of a page: the objects in the order their
+ids were given, loaded with the same queryset as the list, and the ids
+that matched nothing. At most ``MULTI_GET_MAX_IDS`` ids are accepted.
+"""
+from operator import attrgetter
+
+from django.conf import settings
+
+from rest_framework.exceptions import ValidationError
+
+from api.fieldsets import split_names
+from api.utils import parse_id
+
+IDS_PARAM = 'ids'
+
+
+def requested_ids(query_params):
+    """Distinct ids of ``?ids=`` in request order, or None without it."""
+    value = query_params.get(IDS_PARAM)
+    if value is None:
+        return None
+    ids = [parse_id(name) for name in split_names(value)]
+    if not ids or None in ids:
+        raise ValidationError(
+            {IDS_PARAM: ['Expected comma-separated positive integers.']}
+        )
+    ids = list(dict.fromkeys(ids))
+    if len(ids) > settings.MULTI_GET_MAX_IDS:
+        raise ValidationError({IDS_PARAM: [
+            f'Ensure no more than {settings.MULTI_GET_MAX_IDS} ids are '
+            f'requested.'
+        ]})
+    return ids
+
+
+def in_request_order(ids, objects, key=attrgetter('pk')):
+    """``objects`` ordered like ``ids``, and the ids none of them has."""
+    found = {key(obj): obj for obj in objects}
+    return (
+        [found[pk] for pk in ids if pk in found],
+        [pk for pk in ids if pk not in found],
+    )
+
+
+def multi_get_data(results, missing):
+    return {'results': results, 'missing': missing}
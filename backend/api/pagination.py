@@ -9,7 +9,8 @@ class PageToLimitOffsetPagination(LimitOffsetPagination):
     limit_query_param = 'limit'
     offset_query_param = 'offset'
 
-    def paginate_queryset(self, queryset, request, view=None):
+    def get_page_offset(self, request):
+        """Translate ``?page=`` into an offset, or None if it is absent."""
         page = request.query_params.get('page')
         limit = request.query_params.get(
             self.limit_query_param,
@@ -18,13 +19,17 @@ class PageToLimitOffsetPagination(LimitOffsetPagination):
 
         if page is not None:
             try:
-                page = int(page)
-                limit = int(limit)
-                offset = (page - 1) * limit
-                request.query_params._mutable = True
-                request.query_params[self.offset_query_param] = offset
-                request.query_params._mutable = False
+                return (int(page) - 1) * int(limit)
             except ValueError:
                 pass
+        return None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        offset = self.get_page_offset(request)
+
+        if offset is not None:
+            request.query_params._mutable = True
+            request.query_params[self.offset_query_param] = offset
+            request.query_params._mutable = False
 
         return super().paginate_queryset(queryset, request, view)
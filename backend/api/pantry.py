@@ -0,0 +1,180 @@
+import threading
+import time
+
+import numpy as np
+from django.conf import settings
+
+from api.utils import int_array
+from recipes.models import RecipeIngredient
+
+ID_TYPE = np.uint32
+EMPTY = np.zeros(0, dtype=ID_TYPE)
+ORDERS = ('missing', 'coverage')
+# Ranking keys pack several columns into one int64 so that a single
+# argpartition finds the best rows: counts are clipped to COUNT_BITS and
+# the recipe id (newest first) breaks ties.
+COUNT_BITS = 10
+ID_BITS = 32
+COVERAGE_BITS = 20
+
+
+class PantryIndex:
+    """Inverted index from ingredient id to the recipes that use it.
+
+    Each ingredient maps to a sorted array of recipe ids, and a dense
+    array holds the number of ingredients of every recipe id. Matching a
+    pantry counts how many of its ingredients each recipe uses with one
+    ``bincount`` over the concatenated postings, so its cost grows with
+    the postings read rather than with the number of recipes in the
+    database.
+
+    Saves and deletes in this process update the index in place (copy on
+    write, so concurrent readers see either the old or the new state).
+    Changes made by other workers are picked up by the full reload every
+    ``ttl`` seconds; recipes deleted elsewhere in the meantime simply
+    drop out when the matched rows are fetched.
+    """
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._state = ({}, np.zeros(0, dtype=np.uint16))
+        self._loaded_at = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _read_keys():
+        """Sorted, distinct ``ingredient_id << 32 | recipe_id`` keys."""
+        rows = RecipeIngredient.objects.order_by().values_list(
+            'ingredient_id', 'recipe_id'
+        ).iterator(chunk_size=20000)
+        keys = int_array(
+            ingredient_id << ID_BITS | recipe_id
+            for ingredient_id, recipe_id in rows
+        )
+        keys.sort()
+        distinct = np.ones(len(keys), dtype=bool)
+        distinct[1:] = keys[1:] != keys[:-1]
+        return keys[distinct]
+
+    def _load(self):
+        keys = self._read_keys()
+        recipes = (keys & (1 << ID_BITS) - 1).astype(ID_TYPE)
+        ingredients = (keys >> ID_BITS).astype(ID_TYPE)
+        del keys
+        starts = np.flatnonzero(ingredients[1:] != ingredients[:-1]) + 1
+        postings = dict(zip(
+            ingredients[np.r_[0, starts]].tolist() if len(recipes) else [],
+            np.split(recipes, starts)
+        ))
+        sizes = np.bincount(recipes).astype(np.uint16)
+        self._state = (postings, sizes)
+        self._loaded_at = time.monotonic()
+
+    def _is_stale(self):
+        if self._loaded_at is None:
+            return True
+        return time.monotonic() - self._loaded_at > self.ttl
+
+    def _ensure_loaded(self):
+        if self._is_stale():
+            with self._lock:
+                if self._is_stale():
+                    self._load()
+
+    def _replace(self, recipe_id, ingredient_ids):
+        old_postings, old_sizes = self._state
+        postings = dict(old_postings)
+        for ingredient_id, recipes in old_postings.items():
+            if ingredient_id in ingredient_ids:
+                continue
+            position = recipes.searchsorted(recipe_id)
+            if position < len(recipes) and recipes[position] == recipe_id:
+                postings[ingredient_id] = np.delete(recipes, position)
+        for ingredient_id in ingredient_ids:
+            recipes = postings.get(ingredient_id, EMPTY)
+            position = recipes.searchsorted(recipe_id)
+            if position == len(recipes) or recipes[position] != recipe_id:
+                postings[ingredient_id] = np.insert(
+                    recipes, position, recipe_id
+                )
+        sizes = np.zeros(
+            max(len(old_sizes), recipe_id + 1), dtype=old_sizes.dtype
+        )
+        sizes[:len(old_sizes)] = old_sizes
+        sizes[recipe_id] = len(ingredient_ids)
+        self._state = (postings, sizes)
+
+    def refresh(self, recipe_id):
+        """Re-read the ingredients of a saved recipe."""
+        if self._loaded_at is None:
+            return
+        ingredient_ids = set(RecipeIngredient.objects.filter(
+            recipe_id=recipe_id
+        ).values_list('ingredient_id', flat=True))
+        with self._lock:
+            self._replace(recipe_id, ingredient_ids)
+
+    def discard(self, recipe_id):
+        if self._loaded_at is None:
+            return
+        with self._lock:
+            self._replace(recipe_id, set())
+
+    def match(self, ingredient_ids, limit, order='missing',
+              max_missing=None):
+        """The best ``limit`` recipes for a pantry.
+
+        Returns ``(recipe_id, matched, missing)`` tuples. ``missing``
+        ordering puts recipes needing the fewest extra ingredients first,
+        ``coverage`` the ones whose ingredients are most fully in the
+        pantry. Only recipes using at least one pantry item are returned.
+        """
+        self._ensure_loaded()
+        postings, sizes = self._state
+        lists = [
+            postings[ingredient_id] for ingredient_id in set(ingredient_ids)
+            if ingredient_id in postings
+        ]
+        if not lists:
+            return []
+        matched = np.bincount(np.concatenate(lists), minlength=len(sizes))
+        recipe_ids = np.flatnonzero(matched)
+        matched = matched[recipe_ids]
+        missing = sizes[recipe_ids] - matched
+        if max_missing is not None:
+            keep = missing <= max_missing
+            recipe_ids, matched, missing = (
+                recipe_ids[keep], matched[keep], missing[keep]
+            )
+        keys = self._ranking_keys(order, recipe_ids, matched, missing)
+        if len(keys) > limit:
+            best = np.argpartition(keys, limit - 1)[:limit]
+        else:
+            best = np.arange(len(keys))
+        best = best[np.argsort(keys[best])]
+        return list(zip(
+            recipe_ids[best].tolist(),
+            matched[best].tolist(),
+            missing[best].tolist()
+        ))
+
+    @staticmethod
+    def _ranking_keys(order, recipe_ids, matched, missing):
+        """Keys sorting the best match first, newest recipe on ties."""
+        top = (1 << COUNT_BITS) - 1
+        newest = ((1 << ID_BITS) - 1) - recipe_ids.astype(np.int64)
+        if order == 'coverage':
+            # Distinct fractions of counts below 2**10 stay distinct when
+            # scaled to 2**20.
+            scale = 1 << COVERAGE_BITS
+            coverage = matched * scale // (matched + missing)
+            first = (
+                (scale - coverage) << COUNT_BITS | np.minimum(missing, top)
+            )
+        else:
+            fewer_matched = top - np.minimum(matched, top)
+            first = np.minimum(missing, top) << COUNT_BITS | fewer_matched
+        return first << ID_BITS | newest
+
+
+pantry_index = PantryIndex(settings.PANTRY_INDEX_TTL)
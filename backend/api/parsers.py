@@ -0,0 +1,48 @@
+"""JSON request parsing with orjson when it is installed."""
+import codecs
+import io
+
+from django.conf import settings
+
+from rest_framework.parsers import JSONParser
+
+from api.renderers import FastJSONRenderer, orjson
+
+# orjson reads integers that do not fit in 64 bits as floats.
+WIDE_NUMBER = 2 ** 63
+
+
+def has_wide_number(value):
+    if isinstance(value, float):
+        return abs(value) >= WIDE_NUMBER
+    if isinstance(value, dict):
+        value = value.values()
+    elif not isinstance(value, list):
+        return False
+    return any(has_wide_number(item) for item in value)
+
+
+class FastJSONParser(JSONParser):
+    """``JSONParser`` that decodes UTF-8 bodies with orjson.
+
+    Bodies orjson rejects (syntax errors, ``NaN``) or may read differently
+    (numbers beyond 64-bit integers) go to the stock parser, so parsed
+    values and error messages stay the same.
+    """
+
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        if orjson is None or codecs.lookup(encoding).name != 'utf-8':
+            return super().parse(stream, media_type, parser_context)
+        body = stream.read()
+        try:
+            data = orjson.loads(body)
+        except orjson.JSONDecodeError:
+            data = None
+        else:
+            if not has_wide_number(data):
+                return data
+        return super().parse(io.BytesIO(body), media_type, parser_context)
@@ -0,0 +1,273 @@
+"""Async read endpoints served when the app runs under ASGI.
+
+Only safe methods are handled here; writes are delegated to the regular
+DRF viewsets. The same querysets, filters and serializers are reused, so
+responses have the same shape in both deployment modes.
+"""
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.http import Http404, HttpResponse, HttpResponseRedirect
+from django.utils.cache import patch_cache_control
+
+from rest_framework import exceptions
+from rest_framework.request import Request
+
+from api.fieldsets import requested_fields
+from api.multiget import in_request_order, multi_get_data, requested_ids
+from api.pagination import PageToLimitOffsetPagination
+from api.recipes import feed_cache
+from api.recipes.filters import IngredientFilter, RecipeFilter
+from api.recipes.serializers import (
+    IngredientSerializer,
+    RecipeSerializer,
+    TagSerializer,
+)
+from api.recipes.views import (IngredientViewSet, RecipeViewSet, TagViewSet,
+                               recipe_queryset)
+from api.renderers import FastJSONRenderer
+from api.shortlinks import decode_code, live_recipes
+from recipes.models import Favorite, ShoppingCart
+from users.models import Subscription
+
+
+def json_response(data, status=200):
+    # Same bytes as the DRF views produce.
+    return HttpResponse(
+        FastJSONRenderer().render(data), status=status,
+        content_type=FastJSONRenderer.media_type
+    )
+
+
+def split_by_method(async_view, sync_view):
+    """Serve safe methods asynchronously and everything else via DRF."""
+    async def view(request, *args, **kwargs):
+        if request.method in ('GET', 'HEAD'):
+            return await async_view(request, *args, **kwargs)
+        return await sync_to_async(sync_view)(request, *args, **kwargs)
+
+    view.csrf_exempt = True
+    return view
+
+
+async def authenticate(request):
+    """Resolve the DRF user and return a DRF request wrapping ``request``."""
+    drf_request = Request(
+        request,
+        authenticators=[
+            auth() for auth in RecipeViewSet.authentication_classes
+        ]
+    )
+    await sync_to_async(lambda: drf_request.user)()
+    request.user = drf_request.user
+    return drf_request
+
+
+def in_own_thread(func, *args):
+    """Run a blocking ORM call so that gathered calls can overlap.
+
+    The async ORM runs every query of a request on one sync thread, so
+    gathered queries would still take turns. With ``DB_POOL_SIZE`` set,
+    each call gets a pool thread and a pooled connection of its own, so
+    they overlap on the database; the connection goes back to the pool on
+    return. Without the pool every such thread would open and close a
+    connection, which costs more than the overlap saves, so the calls
+    stay on the request's thread and run one after another.
+    """
+    if not settings.DB_POOL_SIZE:
+        return sync_to_async(func)(*args)
+
+    def call():
+        try:
+            return func(*args)
+        finally:
+            close_old_connections()
+
+    return sync_to_async(call, thread_sensitive=False)()
+
+
+def fetch_list(queryset):
+    return in_own_thread(list, queryset)
+
+
+def fetch_ids(queryset, field):
+    return in_own_thread(set, queryset.values_list(field, flat=True))
+
+
+async def interaction_context(user, recipes, fields=None):
+    """Collect favorite, cart and subscription flags for a page at once.
+
+    Only flags rendered with ``fields`` (every field when None) are
+    looked up.
+    """
+    context = {
+        'favorited_ids': set(),
+        'in_cart_ids': set(),
+        'subscribed_ids': set(),
+    }
+    if not user.is_authenticated:
+        return context
+
+    recipe_ids = [recipe.id for recipe in recipes]
+    lookups = {}
+    if fields is None or 'is_favorited' in fields:
+        lookups['favorited_ids'] = fetch_ids(
+            Favorite.objects.filter(user=user, recipe_id__in=recipe_ids),
+            'recipe_id'
+        )
+    if fields is None or 'is_in_shopping_cart' in fields:
+        lookups['in_cart_ids'] = fetch_ids(
+            ShoppingCart.objects.filter(user=user, recipe_id__in=recipe_ids),
+            'recipe_id'
+        )
+    if fields is None or 'author' in fields:
+        author_ids = {recipe.author_id for recipe in recipes}
+        lookups['subscribed_ids'] = fetch_ids(
+            Subscription.objects.filter(user=user, author_id__in=author_ids),
+            'author_id'
+        )
+    context.update(zip(lookups, await asyncio.gather(*lookups.values())))
+    return context
+
+
+def handle_api_errors(view):
+    """Render DRF-style error bodies for the async views."""
+    async def wrapper(request, *args, **kwargs):
+        try:
+            return await view(request, *args, **kwargs)
+        except exceptions.APIException as exc:
+            detail = exc.detail
+            if not isinstance(detail, (dict, list)):
+                detail = {'detail': detail}
+            response = json_response(detail, status=exc.status_code)
+            if exc.status_code == 401:
+                response['WWW-Authenticate'] = 'Token'
+            return response
+        except Http404 as exc:
+            return json_response({'detail': str(exc)}, status=404)
+
+    return wrapper
+
+
+@handle_api_errors
+async def recipe_list(request):
+    drf_request = await authenticate(request)
+    # The async views always answer with JSON, as negotiated for most
+    # clients of the sync view, so both share feed cache entries.
+    drf_request.accepted_renderer = FastJSONRenderer()
+    drf_request.accepted_media_type = FastJSONRenderer.media_type
+    if feed_cache.is_cacheable(drf_request):
+        return await feed_cache.acached_response(
+            drf_request, lambda: recipe_list_page(drf_request)
+        )
+    return await recipe_list_page(drf_request)
+
+
+async def recipe_list_page(drf_request):
+    fields = requested_fields(drf_request.query_params, RecipeSerializer)
+    filterset = RecipeFilter(
+        data=drf_request.query_params,
+        queryset=recipe_queryset(fields),
+        request=drf_request
+    )
+    if not filterset.is_valid():
+        raise exceptions.ValidationError(filterset.errors)
+    queryset = filterset.qs
+    ids = requested_ids(drf_request.query_params)
+    if ids is not None:
+        recipes, missing = in_request_order(
+            ids, await fetch_list(queryset.filter(pk__in=ids))
+        )
+        context = await interaction_context(drf_request.user, recipes, fields)
+        context['request'] = drf_request
+        data = RecipeSerializer(
+            recipes, many=True, context=context, fields=fields
+        ).data
+        return json_response(multi_get_data(data, missing))
+
+    paginator = PageToLimitOffsetPagination()
+    paginator.request = drf_request
+    paginator.limit = paginator.get_limit(drf_request)
+    page_offset = paginator.get_page_offset(drf_request)
+    paginator.offset = (
+        page_offset if page_offset is not None
+        else paginator.get_offset(drf_request)
+    )
+
+    page = queryset[paginator.offset:paginator.offset + paginator.limit]
+    count, recipes = await asyncio.gather(
+        in_own_thread(queryset.count),
+        fetch_list(page),
+    )
+    paginator.count = count
+    context = await interaction_context(drf_request.user, recipes, fields)
+    context['request'] = drf_request
+    data = RecipeSerializer(
+        recipes, many=True, context=context, fields=fields
+    ).data
+    return json_response({
+        'count': count,
+        'next': paginator.get_next_link(),
+        'previous': paginator.get_previous_link(),
+        'results': data,
+    })
+
+
+@handle_api_errors
+async def recipe_detail(request, pk):
+    drf_request = await authenticate(request)
+    fields = requested_fields(drf_request.query_params, RecipeSerializer)
+    recipe = await recipe_queryset(fields).filter(pk=pk).afirst()
+    if recipe is None:
+        raise Http404('No Recipe matches the given query.')
+    context = await interaction_context(request.user, [recipe], fields)
+    context['request'] = drf_request
+    return json_response(
+        RecipeSerializer(recipe, context=context, fields=fields).data
+    )
+
+
+@handle_api_errors
+async def tag_list(request):
+    tags = await fetch_list(TagViewSet.queryset.all())
+    return json_response(TagSerializer(tags, many=True).data)
+
+
+@handle_api_errors
+async def tag_detail(request, pk):
+    tag = await TagViewSet.queryset.filter(pk=pk).afirst()
+    if tag is None:
+        raise Http404('No Tag matches the given query.')
+    return json_response(TagSerializer(tag).data)
+
+
+@handle_api_errors
+async def ingredient_list(request):
+    filterset = IngredientFilter(
+        data=request.GET, queryset=IngredientViewSet.queryset.all()
+    )
+    if not filterset.is_valid():
+        raise exceptions.ValidationError(filterset.errors)
+    ingredients = await fetch_list(filterset.qs)
+    return json_response(IngredientSerializer(ingredients, many=True).data)
+
+
+@handle_api_errors
+async def ingredient_detail(request, pk):
+    ingredient = await IngredientViewSet.queryset.filter(pk=pk).afirst()
+    if ingredient is None:
+        raise Http404('No Ingredient matches the given query.')
+    return json_response(IngredientSerializer(ingredient).data)
+
+
+async def short_link_redirect(request, code):
+    recipe_id = decode_code(code)
+    if recipe_id is None or not await live_recipes.aexists(recipe_id):
+        raise Http404
+    response = HttpResponseRedirect(f'/recipes/{recipe_id}/')
+    patch_cache_control(
+        response, public=True, max_age=settings.SHORT_LINK_CACHE_SECONDS
+    )
+    return response
@@ -0,0 +1,142 @@
+"""Counts shown next to the recipe list filters.
+
+All facets of a filter set come from one statement: the filtered recipes
+are selected once into a CTE (materialised by PostgreSQL because it is
+referenced several times), and the tag, author and cooking time counts
+are grouped from it and glued together with ``UNION ALL``. Results are
+cached for ``RECIPE_FACETS_CACHE_TTL`` seconds under a key built from the
+cleaned filter values, so equivalent query strings share an entry.
+"""
+import hashlib
+import json
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet
+from django.db import connections
+
+from foodgram_backend.metrics import record_cache_lookup
+from recipes.models import Recipe, Tag
+
+User = get_user_model()
+
+TOP_AUTHORS = 10
+# Upper bounds (minutes, inclusive) of the cooking time buckets; the last
+# bucket is open-ended.
+COOKING_TIME_BUCKETS = (15, 30, 60, 120)
+# Filters whose result depends on the requesting user.
+PERSONAL_FILTERS = ('is_favorited', 'is_in_shopping_cart')
+
+
+def cache_key(filterset):
+    """Key of the facets of a validated ``RecipeFilter``."""
+    values = {
+        name: str(value)
+        for name, value in filterset.form.cleaned_data.items()
+        if value not in (None, '')
+    }
+    if 'tags' in values:
+        values['tags'] = sorted(set(filterset.data.getlist('tags')))
+    if 'search' in values:
+        values['search'] = ' '.join(values['search'].lower().split())
+    if any(name in values for name in PERSONAL_FILTERS):
+        values['user'] = filterset.request.user.pk
+    digest = hashlib.sha256(
+        json.dumps(values, sort_keys=True).encode()
+    ).hexdigest()
+    return f'recipe-facets:{digest}'
+
+
+def facet_rows(queryset):
+    """``(facet, value, count)`` rows for the recipes of ``queryset``."""
+    try:
+        recipes_sql, params = queryset.order_by().values(
+            'id', 'author_id', 'cooking_time'
+        ).query.sql_with_params()
+    except EmptyResultSet:
+        return []
+    connection = connections[queryset.db]
+    quote = connection.ops.quote_name
+    bucket = ' '.join(
+        f'WHEN cooking_time <= %s THEN {index}'
+        for index in range(len(COOKING_TIME_BUCKETS))
+    )
+    sql = f"""
+        WITH filtered (id, author_id, cooking_time) AS ({recipes_sql})
+        SELECT 'tags', tag_id, COUNT(*)
+        FROM {quote(Recipe.tags.through._meta.db_table)}
+        INNER JOIN filtered ON recipe_id = filtered.id
+        GROUP BY tag_id
+        UNION ALL
+        SELECT 'authors', author_id, total FROM (
+            SELECT author_id, COUNT(*) AS total, ROW_NUMBER() OVER (
+                ORDER BY COUNT(*) DESC, author_id
+            ) AS position
+            FROM filtered GROUP BY author_id
+        ) AS authors
+        WHERE position <= %s
+        UNION ALL
+        SELECT 'cooking_time', CASE {bucket}
+            ELSE {len(COOKING_TIME_BUCKETS)} END, COUNT(*)
+        FROM filtered
+        GROUP BY 2
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            sql, (*params, TOP_AUTHORS, *COOKING_TIME_BUCKETS)
+        )
+        return cursor.fetchall()
+
+
+def compute_facets(queryset):
+    counts = {'tags': {}, 'authors': {}, 'cooking_time': {}}
+    for facet, value, count in facet_rows(queryset):
+        counts[facet][value] = count
+
+    tags = Tag.objects.in_bulk(counts['tags'])
+    authors = User.objects.only(
+        'username', 'first_name', 'last_name'
+    ).in_bulk(counts['authors'])
+    lower_bounds = (1, *(bound + 1 for bound in COOKING_TIME_BUCKETS))
+    upper_bounds = (*COOKING_TIME_BUCKETS, None)
+    return {
+        'count': sum(counts['cooking_time'].values()),
+        'tags': sorted(
+            (
+                {'id': tag.id, 'name': tag.name, 'slug': tag.slug,
+                 'count': counts['tags'][tag.id]}
+                for tag in tags.values()
+            ),
+            key=lambda item: (-item['count'], item['name'])
+        ),
+        'authors': [
+            {'id': author_id, 'username': authors[author_id].username,
+             'first_name': authors[author_id].first_name,
+             'last_name': authors[author_id].last_name, 'count': count}
+            # Rows come back in no particular order.
+            for author_id, count in sorted(
+                counts['authors'].items(),
+                key=lambda item: (-item[1], item[0])
+            )
+            if author_id in authors
+        ],
+        'cooking_time': [
+            {'min': low, 'max': high,
+             'count': counts['cooking_time'].get(index, 0)}
+            for index, (low, high) in enumerate(
+                zip(lower_bounds, upper_bounds)
+            )
+        ],
+    }
+
+
+def recipe_facets(filterset):
+    """Facet counts of a validated ``RecipeFilter``, cached briefly."""
+    key = cache_key(filterset)
+    facets = cache.get(key)
+    record_cache_lookup('recipe_facets', facets is not None)
+    if facets is None:
+        facets = compute_facets(filterset.qs)
+        cache.set(key, facets, settings.RECIPE_FACETS_CACHE_TTL)
+    return facets
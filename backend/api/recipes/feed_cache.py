@@ -0,0 +1,146 @@
+"""Cache of anonymous recipe list responses.
+
+Anonymous ``GET /api/recipes/`` traffic repeats a few filter and page
+combinations. Rendered JSON responses are cached in the Django cache
+under the host, the accepted media type and the query string with its
+parameters (and the values of ``tags``) sorted, so equivalent requests
+share an entry; pagination links keep the parameter order of the
+request that filled it.
+
+Every entry records the recipe version it was built from. The version
+is a token replaced, once the transaction commits, whenever a recipe, a
+tag or a recipe ingredient is saved or deleted. An entry is fresh for
+``RECIPE_FEED_CACHE_TTL`` seconds while its version is current. A stale
+entry is rebuilt by one request at a time (a lock taken with
+``cache.add``) while concurrent requests are served the stale copy, for
+at most ``RECIPE_FEED_CACHE_STALE_TTL`` seconds past its freshness.
+Requests of signed-in users never read or fill the cache. The sync
+viewset and the async list view share entries.
+
+Entries and the version live in the default cache, which is shared by
+every worker when ``REDIS_URL`` is set, so a write in one worker makes
+the entries of all of them stale. Without it each worker keeps its own
+entries and version and only sees its own writes; other workers catch
+up within ``RECIPE_FEED_CACHE_TTL``.
+"""
+import hashlib
+import time
+import uuid
+from urllib.parse import urlencode
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+
+from foodgram_backend.metrics import record_cache_lookup
+
+VERSION_KEY = 'recipe-feed:version'
+# Parameters whose values may come in any order.
+UNORDERED_PARAMS = ('tags',)
+# Seconds after which a rebuild that never finished stops blocking others.
+REBUILD_LOCK_TIMEOUT = 30
+
+
+def current_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, uuid.uuid4().hex, None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def bump_version():
+    """Make every cached recipe list response stale."""
+    cache.set(VERSION_KEY, uuid.uuid4().hex, None)
+
+
+def normalized_query(query_params):
+    pairs = []
+    for name, values in sorted(query_params.lists()):
+        if name in UNORDERED_PARAMS:
+            values = sorted(set(values))
+        pairs.extend((name, value) for value in values)
+    return urlencode(pairs)
+
+
+def cache_key(request):
+    parts = (
+        request.build_absolute_uri('/'),
+        request.accepted_media_type,
+        normalized_query(request.query_params),
+    )
+    digest = hashlib.sha256('\n'.join(parts).encode()).hexdigest()
+    return f'recipe-feed:{digest}'
+
+
+def is_cacheable(request):
+    if settings.RECIPE_FEED_CACHE_TTL <= 0 or request.user.is_authenticated:
+        return False
+    json = request.accepted_renderer.format == 'json'
+    return json and request.method in ('GET', 'HEAD')
+
+
+def lookup(key, version):
+    """A cached response, or None and the rebuild lock taken, if any."""
+    entry = cache.get(key)
+    if entry is None:
+        record_cache_lookup('recipe_feed', False)
+        return None, None
+    entry_version, fresh_until, content, content_type = entry
+    if entry_version == version and time.time() < fresh_until:
+        record_cache_lookup('recipe_feed', True)
+        return HttpResponse(content, content_type=content_type), None
+    lock = f'{key}:lock'
+    if not cache.add(lock, True, REBUILD_LOCK_TIMEOUT):
+        record_cache_lookup('recipe_feed', True, stale=True)
+        return HttpResponse(content, content_type=content_type), None
+    record_cache_lookup('recipe_feed', False)
+    return None, lock
+
+
+def store(key, version, response, lock):
+    """Cache a rendered 200 response and release the rebuild lock."""
+    try:
+        if response is not None and response.status_code == 200:
+            ttl = settings.RECIPE_FEED_CACHE_TTL
+            cache.set(
+                key,
+                (version, time.time() + ttl, response.content,
+                 response['Content-Type']),
+                ttl + settings.RECIPE_FEED_CACHE_STALE_TTL
+            )
+    finally:
+        if lock is not None:
+            cache.delete(lock)
+
+
+def cached_response(request, build):
+    """Response to ``request`` from the cache, or from ``build()``.
+
+    ``build`` returns a rendered response; only 200 responses are stored.
+    """
+    key = cache_key(request)
+    version = current_version()
+    response, lock = lookup(key, version)
+    if response is not None:
+        return response
+    try:
+        response = build()
+    finally:
+        store(key, version, response, lock)
+    return response
+
+
+async def acached_response(request, build):
+    """``cached_response`` for async views, awaiting ``build()``."""
+    key = cache_key(request)
+    version = await sync_to_async(current_version)()
+    response, lock = await sync_to_async(lookup)(key, version)
+    if response is not None:
+        return response
+    try:
+        response = await build()
+    finally:
+        await sync_to_async(store)(key, version, response, lock)
+    return response
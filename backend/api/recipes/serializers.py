@@ -1,9 +1,14 @@
+from django.conf import settings
+from django.db import transaction
+
 from rest_framework import serializers
 
+from api.fieldsets import SparseFieldsMixin
+from api.pantry import ORDERS
 from api.users.serializers import CustomUserSerializer
-from api.utils import Base64ImageField
+from api.utils import MAX_ID, Base64ImageField
 from recipes.models import (Favorite, Ingredient, Recipe, RecipeIngredient,
-                            ShoppingCart, Tag)
+                            ShoppingCart, SimilarRecipe, Tag)
 
 
 class IngredientSerializer(serializers.ModelSerializer):
@@ -107,6 +112,7 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
             ) for ingredient_data in ingredients_data
         ])
 
+    @transaction.atomic
     def create(self, validated_data):
         ingredients_data = validated_data.pop('recipe_ingredients')
         tags_data = validated_data.pop('tags')
@@ -117,6 +123,7 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
 
         return recipe
 
+    @transaction.atomic
     def update(self, instance, validated_data):
         ingredients_data = validated_data.pop('recipe_ingredients')
 
@@ -132,7 +139,7 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
         return RecipeSerializer(instance, context=self.context).data
 
 
-class RecipeSerializer(serializers.ModelSerializer):
+class RecipeSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer for recipes."""
 
     author = CustomUserSerializer(read_only=True)
@@ -151,19 +158,78 @@ class RecipeSerializer(serializers.ModelSerializer):
             'is_favorited', 'is_in_shopping_cart'
         ]
 
+    field_views = {'summary': ('id', 'name', 'image', 'cooking_time')}
+
     def get_is_favorited(self, obj):
+        favorited_ids = self.context.get('favorited_ids')
+        if favorited_ids is not None:
+            return obj.id in favorited_ids
         user = self.context.get('request').user
         if user.is_authenticated:
             return Favorite.objects.filter(user=user, recipe=obj).exists()
         return False
 
     def get_is_in_shopping_cart(self, obj):
+        in_cart_ids = self.context.get('in_cart_ids')
+        if in_cart_ids is not None:
+            return obj.id in in_cart_ids
         user = self.context.get('request').user
         if user.is_authenticated:
             return ShoppingCart.objects.filter(user=user, recipe=obj).exists()
         return False
 
 
+class PantryMatchSerializer(serializers.Serializer):
+    """Pantry sent to the recipe matching endpoint."""
+
+    ingredients = serializers.ListField(
+        child=serializers.IntegerField(min_value=1, max_value=MAX_ID),
+        min_length=1,
+        max_length=settings.PANTRY_MAX_INGREDIENTS,
+        source='ingredient_ids'
+    )
+    order = serializers.ChoiceField(choices=ORDERS, default=ORDERS[0])
+    limit = serializers.IntegerField(
+        min_value=1, max_value=100, default=settings.DEFAULT_PAGINATION_LIMIT
+    )
+    max_missing = serializers.IntegerField(min_value=0, required=False)
+
+
+class RecipeStatusSerializer(serializers.Serializer):
+    """Recipes whose interaction flags are requested in bulk."""
+
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1, max_value=MAX_ID),
+        min_length=1,
+        max_length=settings.RECIPE_STATUS_MAX_IDS
+    )
+
+
+class PantryMatchRecipeSerializer(RecipeSerializer):
+    """Recipe with how much of it the pantry covers."""
+
+    matched_count = serializers.IntegerField(read_only=True)
+    missing_count = serializers.IntegerField(read_only=True)
+
+    class Meta(RecipeSerializer.Meta):
+        fields = RecipeSerializer.Meta.fields + [
+            'matched_count', 'missing_count'
+        ]
+
+
+class SimilarRecipeSerializer(serializers.ModelSerializer):
+    """Short representation of a precomputed similar recipe."""
+
+    id = serializers.ReadOnlyField(source='similar.id')
+    name = serializers.ReadOnlyField(source='similar.name')
+    image = serializers.ImageField(source='similar.image', read_only=True)
+    cooking_time = serializers.ReadOnlyField(source='similar.cooking_time')
+
+    class Meta:
+        model = SimilarRecipe
+        fields = ['id', 'name', 'image', 'cooking_time', 'score']
+
+
 class ShoppingCartSerializer(serializers.ModelSerializer):
     """Serializer for the shopping cart."""
 
@@ -1,40 +1,129 @@
-from django.db.models import F, Sum
-from django.http import HttpResponse, HttpResponseRedirect
-from django.shortcuts import get_object_or_404
-from django.urls import reverse
+from operator import itemgetter
+
+from django.conf import settings
+from django.db.models import Exists, F, OuterRef, Prefetch, Sum
+from django.http import Http404, HttpResponse, HttpResponseRedirect
+from django.utils.cache import patch_cache_control
+from django.views import View
 
 from rest_framework import status, viewsets
 from rest_framework.decorators import action, permission_classes
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
-from rest_framework.views import APIView
 
+from api.fieldsets import SparseFieldsViewMixin
+from api.multiget import in_request_order, multi_get_data, requested_ids
 from api.pagination import PageToLimitOffsetPagination
+from api.pantry import pantry_index
+from api.recipes import feed_cache
+from api.recipes.facets import recipe_facets
 from api.permissions import IsAuthorOrReadOnly
 from api.recipes.filters import IngredientFilter, RecipeFilter
+from api.recipes.rows import RecipeRows
 from api.recipes.serializers import (
     FavoriteSerializer,
     IngredientSerializer,
+    PantryMatchRecipeSerializer,
+    PantryMatchSerializer,
     RecipeCreateSerializer,
     RecipeSerializer,
+    RecipeStatusSerializer,
     ShoppingCartSerializer,
+    SimilarRecipeSerializer,
     TagSerializer,
 )
-from recipes.models import Favorite, Ingredient, Recipe, ShoppingCart, Tag
+from api.shortlinks import decode_code, live_recipes, short_link_path
+from api.utils import parse_id
+from recipes.models import (Favorite, Ingredient, Recipe, RecipeIngredient,
+                            ShoppingCart, SimilarRecipe, Tag)
+from users.models import Subscription
+
+
+# Recipe columns rendered as is by RecipeSerializer.
+RECIPE_COLUMNS = {'name', 'text', 'image', 'cooking_time'}
+
+
+def recipe_queryset(fields=None):
+    """Recipes with what the given ``RecipeSerializer`` fields need.
+
+    ``None`` stands for every field.
+    """
+    queryset = Recipe.objects.all()
+    if fields is not None:
+        queryset = queryset.only(
+            'id', *(RECIPE_COLUMNS & fields),
+            *(['author'] if 'author' in fields else [])
+        )
+    if fields is None or 'author' in fields:
+        queryset = queryset.select_related('author', 'author__stats')
+    # Tags and ingredients in a fixed order, the one RecipeRows renders.
+    if fields is None or 'tags' in fields:
+        queryset = queryset.prefetch_related(Prefetch(
+            'tags', queryset=Tag.objects.order_by('id')
+        ))
+    if fields is None or 'ingredients' in fields:
+        queryset = queryset.prefetch_related(Prefetch(
+            'recipe_ingredients',
+            queryset=RecipeIngredient.objects.select_related(
+                'ingredient'
+            ).order_by('id')
+        ))
+    return queryset
 
 
-class RecipeViewSet(viewsets.ModelViewSet):
+class RecipeViewSet(SparseFieldsViewMixin, viewsets.ModelViewSet):
     """ViewSet for managing recipes."""
 
-    queryset = Recipe.objects.select_related('author').prefetch_related(
-        'tags',
-        'ingredients'
-    )
+    queryset = recipe_queryset()
     filterset_class = RecipeFilter
     pagination_class = PageToLimitOffsetPagination
 
+    def get_queryset(self):
+        fields = self.get_fieldset()
+        if fields is None:
+            return super().get_queryset()
+        return recipe_queryset(fields)
+
+    def list(self, request, *args, **kwargs):
+        if feed_cache.is_cacheable(request):
+            return feed_cache.cached_response(
+                request, lambda: self.rendered(self.list_page(request))
+            )
+        return self.list_page(request)
+
+    def list_page(self, request):
+        ids = requested_ids(request.query_params)
+        if not settings.RECIPE_LIST_FAST_PATH:
+            if ids is not None:
+                return self.list_by_ids(ids)
+            return super().list(request)
+        rows = RecipeRows(request, self.get_fieldset())
+        queryset = rows.select(self.filter_queryset(Recipe.objects.all()))
+        if ids is not None:
+            found, missing = in_request_order(
+                ids, queryset.filter(pk__in=ids), itemgetter('id')
+            )
+            return Response(multi_get_data(rows.render(found), missing))
+        page = self.paginate_queryset(queryset)
+        if page is None:
+            return Response(rows.render(queryset))
+        return self.get_paginated_response(rows.render(page))
+
+    def list_by_ids(self, ids):
+        """The recipes of ``ids`` that pass the filters, in that order."""
+        queryset = self.filter_queryset(self.get_queryset())
+        found, missing = in_request_order(ids, queryset.filter(pk__in=ids))
+        serializer = self.get_serializer(found, many=True)
+        return Response(multi_get_data(serializer.data, missing))
+
+    def rendered(self, response):
+        response = self.finalize_response(self.request, response)
+        return response.render()
+
     def get_permissions(self):
-        if self.action in ['list', 'retrieve', 'get_link']:
+        if self.action in ['list', 'retrieve', 'get_link', 'match',
+                           'similar', 'facets']:
             return [AllowAny()]
         elif self.action in ['update', 'partial_update', 'destroy']:
             return [IsAuthenticated(), IsAuthorOrReadOnly()]
@@ -75,12 +164,107 @@ class RecipeViewSet(viewsets.ModelViewSet):
     @permission_classes([AllowAny])
     def get_link(self, request, pk=None):
         """Get short link"""
-        recipe = self.get_object()
-        base_url = request.build_absolute_uri('/')
-        short_link = f"{base_url.rstrip('/')}/s/{recipe.id}"
+        recipe_id = parse_id(pk)
+        if recipe_id is None or not live_recipes.exists(recipe_id):
+            raise Http404
+        short_link = request.build_absolute_uri(short_link_path(recipe_id))
 
         return Response({'short-link': short_link}, status=status.HTTP_200_OK)
 
+    @action(detail=False, methods=['get'], url_path='facets')
+    def facets(self, request):
+        """Tag, author and cooking time counts for the list filters."""
+        filterset = self.filterset_class(
+            request.query_params, queryset=Recipe.objects.all(),
+            request=request
+        )
+        if not filterset.is_valid():
+            raise ValidationError(filterset.errors)
+        return Response(recipe_facets(filterset))
+
+    @action(detail=False, methods=['post'], url_path='match')
+    def match(self, request):
+        """Recipes needing the fewest ingredients beyond a pantry."""
+        serializer = PantryMatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        matches = pantry_index.match(**serializer.validated_data)
+        recipes = self.get_queryset().in_bulk(
+            [recipe_id for recipe_id, _, _ in matches]
+        )
+        results = []
+        for recipe_id, matched, missing in matches:
+            # Recipes deleted by another worker are still in its index.
+            recipe = recipes.get(recipe_id)
+            if recipe is not None:
+                recipe.matched_count = matched
+                recipe.missing_count = missing
+                results.append(recipe)
+        context = self.get_serializer_context()
+        if request.user.is_authenticated:
+            context['favorited_ids'] = set(request.user.favorites.filter(
+                recipe_id__in=list(recipes)
+            ).values_list('recipe_id', flat=True))
+            context['in_cart_ids'] = set(request.user.shopping_cart.filter(
+                recipe_id__in=list(recipes)
+            ).values_list('recipe_id', flat=True))
+            context['subscribed_ids'] = set(Subscription.objects.filter(
+                user=request.user,
+                author_id__in={recipe.author_id for recipe in results}
+            ).values_list('author_id', flat=True))
+        return Response(
+            PantryMatchRecipeSerializer(
+                results, many=True, context=context
+            ).data
+        )
+
+    @action(detail=False, methods=['post'], url_path='status')
+    def interaction_status(self, request):
+        """Favorite, cart and author subscription flags of many recipes.
+
+        Lets clients overlay the user's state on a shared, cached list
+        page. Unknown ids are left out; the rest keep the request order.
+        """
+        serializer = RecipeStatusSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = list(dict.fromkeys(serializer.validated_data['ids']))
+        user = request.user
+        subscribed = dict(Recipe.objects.filter(pk__in=ids).annotate(
+            is_subscribed=Exists(Subscription.objects.filter(
+                user=user, author=OuterRef('author')
+            ))
+        ).values_list('pk', 'is_subscribed'))
+        favorited = set(user.favorites.filter(
+            recipe_id__in=ids
+        ).values_list('recipe_id', flat=True))
+        in_cart = set(user.shopping_cart.filter(
+            recipe_id__in=ids
+        ).values_list('recipe_id', flat=True))
+        return Response([
+            {
+                'id': recipe_id,
+                'is_favorited': recipe_id in favorited,
+                'is_in_shopping_cart': recipe_id in in_cart,
+                'is_subscribed': subscribed[recipe_id],
+            }
+            for recipe_id in ids if recipe_id in subscribed
+        ])
+
+    @action(detail=True, methods=['get'], url_path='similar')
+    def similar(self, request, pk=None):
+        """Recipes sharing the most ingredients and tags with this one."""
+        recipe_id = parse_id(pk)
+        if recipe_id is None or not live_recipes.exists(recipe_id):
+            raise Http404
+        similar = SimilarRecipe.objects.filter(
+            recipe_id=recipe_id
+        ).select_related('similar').only(
+            'score', 'similar__name', 'similar__image',
+            'similar__cooking_time'
+        ).order_by('-score')
+        return Response(SimilarRecipeSerializer(
+            similar, many=True, context=self.get_serializer_context()
+        ).data)
+
     def _handle_interaction(self, request, recipe, interaction_model,
                             serializer_class=None):
         """Helper function to manage interactions (favorite, shopping cart)."""
@@ -171,10 +355,15 @@ class TagViewSet(viewsets.ReadOnlyModelViewSet):
     pagination_class = None
 
 
-class ShortLinkRedirectView(APIView):
+class ShortLinkRedirectView(View):
     """Handler for redirecting using a short link."""
 
-    def get(self, request, pk):
-        recipe = get_object_or_404(Recipe, id=pk)
-        url = reverse('recipe-detail', args=[recipe.id])
-        return HttpResponseRedirect(url)
+    def get(self, request, code):
+        recipe_id = decode_code(code)
+        if recipe_id is None or not live_recipes.exists(recipe_id):
+            raise Http404
+        response = HttpResponseRedirect(f'/recipes/{recipe_id}/')
+        patch_cache_control(
+            response, public=True, max_age=settings.SHORT_LINK_CACHE_SECONDS
+        )
+        return response
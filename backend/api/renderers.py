@@ -0,0 +1,47 @@
+"""JSON rendering with orjson when it is installed.
+
+The output is byte-for-byte what DRF's ``JSONRenderer`` produces for the
+compact, non-ASCII-escaped settings this project uses: values orjson has
+no native encoding for (lazy translation strings, ``Decimal``) and dates
+and times, which DRF formats its own way (``Z`` for UTC), go through
+DRF's encoder, and U+2028/U+2029 are escaped the same way. Anything
+orjson refuses (integers wider than 64 bits, lone surrogates) and
+indented output for the browsable API fall back to the stock renderer.
+The differences are the spelling of floats below 1e-4 or from 1e16 up
+(``1e-05`` vs ``0.00001``), which parse back to the same value, and NaN,
+which DRF rejects and orjson renders as ``null``.
+"""
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+
+class FastJSONRenderer(JSONRenderer):
+    """``JSONRenderer`` that encodes with orjson where it can."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        fast = orjson is not None and self.compact and not self.ensure_ascii
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if data is None or not fast or indent is not None:
+            return super().render(
+                data, accepted_media_type, renderer_context
+            )
+        try:
+            content = orjson.dumps(
+                data, default=self.encoder_class().default,
+                option=ORJSON_OPTIONS
+            )
+        except orjson.JSONEncodeError:
+            return super().render(
+                data, accepted_media_type, renderer_context
+            )
+        # Keep the output a strict JavaScript subset, as DRF does.
+        return content.replace(
+            b'\xe2\x80\xa8', b'\\u2028'
+        ).replace(b'\xe2\x80\xa9', b'\\u2029')
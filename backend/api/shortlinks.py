@@ -0,0 +1,129 @@
+import string
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from api.utils import MAX_ID, parse_id
+from foodgram_backend.metrics import record_cache_lookup
+from recipes.models import Recipe
+
+ALPHABET = string.digits + string.ascii_letters
+BASE = len(ALPHABET)
+INDEX = {char: position for position, char in enumerate(ALPHABET)}
+# Codes start with a letter, so they never look like the plain recipe ids
+# of links shared before codes existed (``/s/12/``), which still work.
+CODE_PREFIX = 'r'
+
+
+def encode_id(value):
+    """Encode a positive integer as a prefixed base62 short code."""
+    if value <= 0:
+        raise ValueError('Only positive ids can be encoded.')
+    chars = []
+    while value:
+        value, remainder = divmod(value, BASE)
+        chars.append(ALPHABET[remainder])
+    return CODE_PREFIX + ''.join(reversed(chars))
+
+
+def decode_code(code):
+    """Recipe id of a short code or of a legacy numeric link.
+
+    Returns None for malformed input and for ids no recipe can have.
+    """
+    if not code.startswith(CODE_PREFIX):
+        return parse_id(code)
+    if len(code) == len(CODE_PREFIX):
+        return None
+    value = 0
+    for char in code[len(CODE_PREFIX):]:
+        position = INDEX.get(char)
+        if position is None:
+            return None
+        value = value * BASE + position
+        if value > MAX_ID:
+            return None
+    return value or None
+
+
+class LiveIdIndex:
+    """Bitmap of existing primary keys for a model.
+
+    Lookups of known ids never touch the database. A miss falls back to
+    a single indexed query so rows created by other workers are picked
+    up, and the whole bitmap is reloaded every ``ttl`` seconds to forget
+    rows deleted elsewhere.
+    """
+
+    def __init__(self, model, ttl):
+        self.model = model
+        self.ttl = ttl
+        self._bits = bytearray()
+        self._loaded_at = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        bits = bytearray()
+        for pk in self.model.objects.order_by().values_list(
+            'pk', flat=True
+        ).iterator(chunk_size=10000):
+            self._set(bits, pk)
+        self._bits = bits
+        self._loaded_at = time.monotonic()
+
+    def _is_stale(self):
+        if self._loaded_at is None:
+            return True
+        return time.monotonic() - self._loaded_at > self.ttl
+
+    def _ensure_loaded(self):
+        if self._is_stale():
+            with self._lock:
+                if self._is_stale():
+                    self._load()
+
+    @staticmethod
+    def _set(bits, pk):
+        byte, bit = divmod(pk, 8)
+        if byte >= len(bits):
+            bits.extend(bytes(byte - len(bits) + 1))
+        bits[byte] |= 1 << bit
+
+    def _test(self, pk):
+        byte, bit = divmod(pk, 8)
+        return byte < len(self._bits) and bool(self._bits[byte] >> bit & 1)
+
+    def add(self, pk):
+        if self._loaded_at is not None:
+            self._set(self._bits, pk)
+
+    def discard(self, pk):
+        byte, bit = divmod(pk, 8)
+        if byte < len(self._bits):
+            self._bits[byte] &= ~(1 << bit) & 0xFF
+
+    def exists(self, pk):
+        self._ensure_loaded()
+        hit = self._test(pk)
+        record_cache_lookup('short_link', hit)
+        if hit:
+            return True
+        if self.model.objects.filter(pk=pk).exists():
+            self._set(self._bits, pk)
+            return True
+        return False
+
+    async def aexists(self, pk):
+        if not self._is_stale() and self._test(pk):
+            record_cache_lookup('short_link', True)
+            return True
+        return await sync_to_async(self.exists)(pk)
+
+
+live_recipes = LiveIdIndex(Recipe, settings.SHORT_LINK_INDEX_TTL)
+
+
+def short_link_path(recipe_id):
+    return f'/s/{encode_id(recipe_id)}/'
@@ -0,0 +1,120 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from rest_framework.authtoken.models import Token
+
+from api.authentication import invalidate_token, invalidate_user_tokens
+from api.events import broadcast
+from api.pantry import pantry_index
+from api.recipes import feed_cache
+from api.shortlinks import live_recipes
+from recipes.models import (Favorite, Recipe, RecipeIngredient, ShoppingCart,
+                            Tag)
+from users.models import Subscription
+
+User = get_user_model()
+
+
+@receiver(post_delete, sender=Token)
+def token_deleted(sender, instance, **kwargs):
+    """Logout and token revocation drop the cached snapshot."""
+    invalidate_token(instance.key)
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, **kwargs):
+    """Password changes, deactivation and profile edits refresh snapshots."""
+    invalidate_user_tokens(instance.pk)
+
+
+@receiver(post_save, sender=Recipe)
+def recipe_saved(sender, instance, created, **kwargs):
+    # Ingredients are written after the recipe row, in the same
+    # transaction, so the pantry index re-reads them on commit.
+    transaction.on_commit(lambda: pantry_index.refresh(instance.pk))
+    if created:
+        # A rolled back id must not pass the short link index.
+        transaction.on_commit(lambda: live_recipes.add(instance.pk))
+        if settings.ASYNC_VIEWS:
+            transaction.on_commit(lambda: notify_followers(instance))
+
+
+@receiver(post_delete, sender=Recipe)
+def recipe_deleted(sender, instance, **kwargs):
+    live_recipes.discard(instance.pk)
+    pantry_index.discard(instance.pk)
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_delete, sender=Recipe)
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+@receiver(post_save, sender=RecipeIngredient)
+@receiver(post_delete, sender=RecipeIngredient)
+@receiver(m2m_changed, sender=Recipe.tags.through)
+def recipe_data_changed(sender, **kwargs):
+    # After commit, so a rebuild under the new version sees the change.
+    transaction.on_commit(feed_cache.bump_version)
+
+
+def notify_followers(recipe):
+    """Tell connected followers that an author published a recipe."""
+    broadcast(
+        'recipe',
+        {'id': recipe.pk, 'author': recipe.author_id},
+        followers_of=recipe.author_id
+    )
+
+
+INTERACTION_EVENTS = {Favorite: 'favorite', ShoppingCart: 'shopping_cart'}
+
+
+def publish_change(user_id, event_type, payload):
+    # Streams, and so their listeners, only exist in ASGI mode.
+    if settings.ASYNC_VIEWS:
+        transaction.on_commit(
+            lambda: broadcast(event_type, payload, [user_id])
+        )
+
+
+@receiver(post_save, sender=Favorite)
+@receiver(post_save, sender=ShoppingCart)
+def interaction_saved(sender, instance, created, **kwargs):
+    if created:
+        publish_change(
+            instance.user_id,
+            INTERACTION_EVENTS[sender],
+            {'id': instance.recipe_id, 'active': True}
+        )
+
+
+@receiver(post_delete, sender=Favorite)
+@receiver(post_delete, sender=ShoppingCart)
+def interaction_deleted(sender, instance, **kwargs):
+    publish_change(
+        instance.user_id,
+        INTERACTION_EVENTS[sender],
+        {'id': instance.recipe_id, 'active': False}
+    )
+
+
+@receiver(post_save, sender=Subscription)
+def subscription_saved(sender, instance, created, **kwargs):
+    if created:
+        publish_change(
+            instance.user_id,
+            'subscription',
+            {'id': instance.author_id, 'active': True}
+        )
+
+
+@receiver(post_delete, sender=Subscription)
+def subscription_deleted(sender, instance, **kwargs):
+    publish_change(
+        instance.user_id,
+        'subscription',
+        {'id': instance.author_id, 'active': False}
+    )
@@ -0,0 +1,122 @@
+"""Nearest-neighbour recipes by shared ingredients and tags.
+
+Every recipe is a row of a sparse matrix with a column per ingredient
+and per tag. Columns are weighted by inverse document frequency (a rare
+ingredient says more about a recipe than salt does) and rows are
+normalised, so the product of two rows is their cosine similarity.
+
+Candidates come from a blockwise sparse product over the informative
+columns only: an ingredient or tag used by more than ``max_df`` of all
+recipes would make nearly every pair a candidate while adding little to
+the score. The best candidates are then rescored with the full vectors.
+
+Like ``api.datasets`` this module does not import Django, so the
+``build_similar_recipes`` pool workers can run it under any
+multiprocessing start method.
+"""
+import numpy as np
+from scipy import sparse
+
+# Tags are coarse, so a shared tag counts for less than a shared
+# ingredient of the same rarity.
+TAG_WEIGHT = 0.5
+# Candidates rescored per neighbour kept.
+CANDIDATES_PER_NEIGHBOUR = 10
+
+vectors = None
+
+
+class RecipeVectors:
+    """IDF-weighted ingredient and tag vectors of recipes.
+
+    ``ingredients`` and ``tags`` are ``(recipe_id, feature_id)`` arrays;
+    pairs of recipes missing from ``ids`` are ignored.
+    """
+
+    def __init__(self, ids, ingredients, tags, max_df):
+        self.ids = np.unique(ids)
+        blocks, frequencies = [], []
+        for pairs, weight in ((ingredients, 1.0), (tags, TAG_WEIGHT)):
+            block, frequency = self._feature_block(pairs, weight)
+            blocks.append(block)
+            frequencies.append(frequency)
+        matrix = sparse.hstack(blocks, format='csr', dtype=np.float32)
+        norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)))
+        norms[norms == 0] = 1
+        self.matrix = sparse.csr_matrix(matrix.multiply(1 / norms))
+        informative = np.concatenate(frequencies) <= max_df * len(self.ids)
+        self.informative = self.matrix[:, informative]
+        self.informative_t = self.informative.T.tocsr()
+
+    def _feature_block(self, pairs, weight):
+        """Binary recipe x feature matrix scaled by IDF, with frequencies."""
+        rows = np.searchsorted(self.ids, pairs[:, 0])
+        known = rows < len(self.ids)
+        known[known] = self.ids[rows[known]] == pairs[known, 0]
+        _, columns = np.unique(pairs[known, 1], return_inverse=True)
+        block = sparse.csr_matrix(
+            (np.ones(len(columns), dtype=np.float32),
+             (rows[known], columns)),
+            shape=(len(self.ids), columns.max(initial=-1) + 1)
+        )
+        block.sum_duplicates()
+        block.data[:] = 1
+        frequency = np.bincount(block.indices, minlength=block.shape[1])
+        idf = np.log((1 + len(self.ids)) / (1 + frequency)) + 1
+        return block.multiply(weight * idf).tocsr(), frequency
+
+    def rows_of(self, recipe_ids):
+        """Matrix rows of the given recipe ids that were loaded."""
+        recipe_ids = np.asarray(recipe_ids, dtype=np.int64)
+        rows = np.searchsorted(self.ids, recipe_ids)
+        known = rows < len(self.ids)
+        known[known] = self.ids[rows[known]] == recipe_ids[known]
+        return rows[known]
+
+    def neighbours(self, rows, k):
+        """Top ``k`` neighbours of ``rows``.
+
+        Returns ``(recipe_ids, similar_ids, scores)`` arrays, grouped by
+        recipe with the most similar first.
+        """
+        products = self.informative[rows] @ self.informative_t
+        # One more than needed: the recipe itself is its best match.
+        wanted = k * CANDIDATES_PER_NEIGHBOUR + 1
+        sources = [np.zeros(0, dtype=np.int64)]
+        targets = [np.zeros(0, dtype=np.int64)]
+        for index, row in enumerate(rows):
+            start, end = products.indptr[index:index + 2]
+            columns = products.indices[start:end]
+            if len(columns) > wanted:
+                columns = columns[np.argpartition(
+                    products.data[start:end], -wanted
+                )[-wanted:]]
+            columns = columns[columns != row]
+            sources.append(np.full(len(columns), row))
+            targets.append(columns)
+        sources, targets = np.concatenate(sources), np.concatenate(targets)
+        scores = np.asarray(
+            self.matrix[sources].multiply(self.matrix[targets]).sum(axis=1)
+        ).ravel()
+        order = np.lexsort((-scores, sources))
+        sources, targets, scores = (
+            sources[order], targets[order], scores[order]
+        )
+        starts = np.flatnonzero(np.r_[True, sources[1:] != sources[:-1]])
+        rank = np.arange(len(sources)) - np.repeat(
+            starts, np.diff(np.r_[starts, len(sources)])
+        )
+        keep = (rank < k) & (scores > 0)
+        return (
+            self.ids[sources[keep]], self.ids[targets[keep]], scores[keep]
+        )
+
+
+def init_worker(worker_vectors):
+    global vectors
+    vectors = worker_vectors
+
+
+def neighbours(rows, k):
+    """Pool task: ``RecipeVectors.neighbours`` of the worker's vectors."""
+    return vectors.neighbours(rows, k)
@@ -0,0 +1,13 @@
+"""URLconf mounting the async recipe list where the sync one lives."""
+from django.urls import include, path
+
+from api.recipes import async_views
+from api.recipes.views import RecipeViewSet
+
+urlpatterns = [
+    path('api/recipes/', async_views.split_by_method(
+        async_views.recipe_list,
+        RecipeViewSet.as_view({'get': 'list', 'post': 'create'})
+    ), name='recipes-list'),
+    path('', include('foodgram_backend.urls')),
+]
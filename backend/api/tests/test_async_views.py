@@ -0,0 +1,101 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import AsyncRequestFactory, TestCase, override_settings
+
+from rest_framework.authtoken.models import Token
+
+from api.recipes.async_views import authenticate, recipe_list_page
+from recipes.models import (Favorite, Ingredient, Recipe, RecipeIngredient,
+                            ShoppingCart, Tag)
+from users.models import Subscription
+
+User = get_user_model()
+
+PATHS = (
+    '/api/recipes/',
+    '/api/recipes/?limit=2&page=2',
+    '/api/recipes/?tags=breakfast',
+    '/api/recipes/?fields=id,name,author',
+    '/api/recipes/?view=summary',
+    '/api/recipes/?is_favorited=1',
+)
+
+
+@override_settings(RECIPE_FEED_CACHE_TTL=0, DB_POOL_SIZE=0)
+class AsyncRecipeListTests(TestCase):
+    """The async list renders the same bytes as the sync viewset."""
+
+    @classmethod
+    def setUpTestData(cls):
+        author, viewer = [
+            User.objects.create_user(
+                email=f'{name}@example.com', username=name,
+                password='password', first_name=name.title(),
+                last_name='Cook'
+            )
+            for name in ('author', 'viewer')
+        ]
+        tag = Tag.objects.create(name='Breakfast', slug='breakfast')
+        flour = Ingredient.objects.create(name='flour', measurement_unit='g')
+        recipes = []
+        for index in range(5):
+            recipe = Recipe.objects.create(
+                author=author, name=f'Recipe {index}', text='Cook it.',
+                image='recipes/images/test.png', cooking_time=index + 5
+            )
+            if index % 2:
+                recipe.tags.add(tag)
+            RecipeIngredient.objects.create(
+                recipe=recipe, ingredient=flour, amount=index + 1
+            )
+            recipes.append(recipe)
+        Subscription.objects.create(user=viewer, author=author)
+        Favorite.objects.create(user=viewer, recipe=recipes[0])
+        ShoppingCart.objects.create(user=viewer, recipe=recipes[1])
+        cls.token = Token.objects.create(user=viewer).key
+
+    def setUp(self):
+        cache.clear()
+
+    def headers(self, signed_in):
+        if not signed_in:
+            return {}
+        return {'Authorization': f'Token {self.token}'}
+
+    async def assertSameBodies(self, signed_in):
+        headers = self.headers(signed_in)
+        for path in PATHS:
+            with self.subTest(path=path, signed_in=signed_in):
+                sync_response = await self.async_client.get(
+                    path, headers=headers
+                )
+                with override_settings(ROOT_URLCONF='api.tests.async_urls'):
+                    async_response = await self.async_client.get(
+                        path, headers=headers
+                    )
+                self.assertEqual(sync_response.status_code, 200)
+                self.assertEqual(async_response.status_code, 200)
+                # Only the DRF viewset answers with a ``Response``.
+                self.assertFalse(hasattr(async_response, 'data'))
+                self.assertEqual(
+                    async_response.content, sync_response.content
+                )
+
+    async def test_anonymous_list_matches_sync_viewset(self):
+        await self.assertSameBodies(signed_in=False)
+
+    async def test_signed_in_list_matches_sync_viewset(self):
+        await self.assertSameBodies(signed_in=True)
+
+    async def test_list_page_matches_sync_viewset(self):
+        for signed_in in (False, True):
+            headers = self.headers(signed_in)
+            sync_response = await self.async_client.get(
+                '/api/recipes/?limit=3', headers=headers
+            )
+            request = AsyncRequestFactory().get(
+                '/api/recipes/?limit=3', headers=headers
+            )
+            response = await recipe_list_page(await authenticate(request))
+            with self.subTest(signed_in=signed_in):
+                self.assertEqual(response.content, sync_response.content)
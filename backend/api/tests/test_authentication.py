@@ -0,0 +1,103 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from api.authentication import LocalTokenCache, SharedTokenCache
+
+User = get_user_model()
+
+ME = '/api/users/me/'
+
+
+class TokenCacheInvalidationMixin:
+    """Cached tokens stop working as soon as they are revoked."""
+
+    def make_token_cache(self):
+        raise NotImplementedError
+
+    def setUp(self):
+        cache.clear()
+        self.token_cache = self.make_token_cache()
+        patcher = mock.patch(
+            'api.authentication.token_cache', self.token_cache
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.user = User.objects.create_user(
+            email='reader@example.com', username='reader',
+            password='old-password-1', first_name='Reader',
+            last_name='Reader'
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        self.assertEqual(self.client.get(ME).status_code, 200)
+        self.assertIsNotNone(self.token_cache.get(self.token.key))
+
+    def token_queries(self):
+        """Status of a request and the token lookups it ran."""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(ME)
+        lookups = [
+            query for query in queries.captured_queries
+            if Token._meta.db_table in query['sql']
+        ]
+        return response.status_code, len(lookups)
+
+    def test_cached_token_authenticates_without_token_query(self):
+        self.assertEqual(self.token_queries(), (200, 0))
+
+    def test_logout_revokes_cached_token(self):
+        response = self.client.post('/api/auth/token/logout/')
+        self.assertEqual(response.status_code, 204)
+
+        self.assertEqual(self.client.get(ME).status_code, 401)
+
+    def test_deactivation_revokes_cached_token(self):
+        self.user.is_active = False
+        self.user.save()
+
+        self.assertEqual(self.client.get(ME).status_code, 401)
+
+    def test_password_change_drops_cached_snapshot(self):
+        response = self.client.post('/api/users/set_password/', {
+            'current_password': 'old-password-1',
+            'new_password': 'new-password-2',
+        }, format='json')
+        self.assertEqual(response.status_code, 204)
+
+        # The next request authenticates against the database again.
+        self.assertEqual(self.token_queries(), (200, 1))
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.check_password('new-password-2'))
+
+    def test_snapshot_leaves_out_the_password_hash(self):
+        fields, _ = self.token_cache.get(self.token.key)
+
+        self.assertNotIn('password', fields)
+        self.assertEqual(fields['id'], self.user.pk)
+
+
+class LocalTokenCacheTests(TokenCacheInvalidationMixin, TestCase):
+
+    def make_token_cache(self):
+        return LocalTokenCache(max_size=100, ttl=60)
+
+
+class SharedTokenCacheTests(TokenCacheInvalidationMixin, TestCase):
+
+    def make_token_cache(self):
+        return SharedTokenCache(ttl=60)
+
+    def test_cache_key_is_a_digest_of_the_token(self):
+        key = self.token_cache.cache_key(self.token.key)
+
+        self.assertNotIn(self.token.key, key)
+        self.assertIsNotNone(cache.get(key))
@@ -0,0 +1,260 @@
+import asyncio
+import json
+import select
+import unittest
+from datetime import timedelta
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import (SimpleTestCase, TestCase, TransactionTestCase,
+                         override_settings)
+from django.utils import timezone
+
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from api import events
+from api.events import (RESYNC, EventHub, StreamTicketView, issue_ticket,
+                        redeem_ticket)
+from users.models import StreamTicket, Subscription
+
+User = get_user_model()
+
+
+class StreamTicketTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email='reader@example.com', username='reader',
+            password='password', first_name='Reader', last_name='Reader'
+        )
+
+    def test_view_issues_ticket(self):
+        request = APIRequestFactory().post('/api/events/ticket/')
+        force_authenticate(request, user=self.user)
+
+        response = StreamTicketView.as_view()(request)
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(redeem_ticket(response.data['ticket']), self.user)
+
+    def test_view_requires_authentication(self):
+        request = APIRequestFactory().post('/api/events/ticket/')
+
+        response = StreamTicketView.as_view()(request)
+
+        self.assertEqual(response.status_code, 401)
+
+    def test_ticket_is_single_use(self):
+        ticket = issue_ticket(self.user)
+
+        self.assertEqual(redeem_ticket(ticket.key), self.user)
+        self.assertIsNone(redeem_ticket(ticket.key))
+
+    @override_settings(EVENTS_TICKET_TTL=30)
+    def test_expired_ticket_is_rejected(self):
+        ticket = issue_ticket(self.user)
+        StreamTicket.objects.filter(pk=ticket.pk).update(
+            created_at=timezone.now() - timedelta(seconds=31)
+        )
+
+        self.assertIsNone(redeem_ticket(ticket.key))
+
+    def test_inactive_user_is_rejected(self):
+        ticket = issue_ticket(self.user)
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+
+        self.assertIsNone(redeem_ticket(ticket.key))
+
+    def test_unknown_ticket_is_rejected(self):
+        self.assertIsNone(redeem_ticket('unknown'))
+
+
+def queued(subscriber):
+    """Events waiting in a subscriber's queue, oldest first."""
+    items = []
+    while not subscriber.queue.empty():
+        items.append(subscriber.queue.get_nowait())
+    return items
+
+
+async def flush():
+    """Run the pushes scheduled on this loop by ``publish``."""
+    for _ in range(3):
+        await asyncio.sleep(0)
+
+
+class HubTestMixin:
+
+    def setUp(self):
+        super().setUp()
+        self.hub = EventHub(max_connections=10, max_queue=2)
+        # Streams of these tests must not start the NOTIFY listener.
+        for patcher in (
+            mock.patch.object(events, 'hub', self.hub),
+            mock.patch.object(events.listener, 'ensure_started'),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+
+class EventHubTests(HubTestMixin, SimpleTestCase):
+
+    async def test_slow_subscriber_gets_resync(self):
+        slow = self.hub.connect(1)
+        fast = self.hub.connect(1)
+        received = []
+
+        for number in range(3):
+            # From another thread, as the NOTIFY listener publishes.
+            await asyncio.wait_for(asyncio.to_thread(
+                self.hub.publish, [1], 'favorite', {'id': number}
+            ), timeout=1)
+            await flush()
+            received += queued(fast)
+
+        self.assertEqual(
+            received, [('favorite', {'id': number}) for number in range(3)]
+        )
+        self.assertEqual(queued(slow), [RESYNC])
+
+    async def test_resynced_subscriber_keeps_receiving(self):
+        slow = self.hub.connect(1)
+        for number in range(3):
+            self.hub.publish([1], 'favorite', {'id': number})
+        await flush()
+        self.assertEqual(queued(slow), [RESYNC])
+
+        self.hub.publish([1], 'favorite', {'id': 3})
+        await flush()
+
+        self.assertEqual(queued(slow), [('favorite', {'id': 3})])
+
+    async def test_publish_reaches_only_given_users(self):
+        first, second = self.hub.connect(1), self.hub.connect(1)
+        other = self.hub.connect(2)
+
+        self.hub.publish([1, 3], 'cart', {'id': 5})
+        await flush()
+
+        self.assertEqual(queued(first), [('cart', {'id': 5})])
+        self.assertEqual(queued(second), [('cart', {'id': 5})])
+        self.assertEqual(queued(other), [])
+
+    async def test_disconnected_subscriber_is_skipped(self):
+        subscriber = self.hub.connect(1)
+        self.hub.disconnect(subscriber)
+
+        self.hub.publish([1], 'cart', {'id': 5})
+        await flush()
+
+        self.assertEqual(queued(subscriber), [])
+        self.assertEqual(self.hub.connected_user_ids(), [])
+
+
+class BroadcastTests(HubTestMixin, TransactionTestCase):
+    # ``deliver`` closes obsolete connections, which would end a
+    # TestCase transaction.
+
+    def setUp(self):
+        super().setUp()
+        self.author, self.follower, self.reader = [
+            User.objects.create_user(
+                email=f'{name}@example.com', username=name,
+                password='password', first_name=name, last_name=name
+            )
+            for name in ('author', 'follower', 'reader')
+        ]
+        Subscription.objects.create(user=self.follower, author=self.author)
+
+    def connect_all(self):
+        return {
+            user: self.hub.connect(user.pk)
+            for user in (self.author, self.follower, self.reader)
+        }
+
+    def assertReceived(self, subscribers, event, *users):
+        for user, subscriber in subscribers.items():
+            with self.subTest(user=user.username):
+                self.assertEqual(
+                    queued(subscriber), [event] if user in users else []
+                )
+
+    async def test_deliver_to_users(self):
+        subscribers = self.connect_all()
+
+        await sync_to_async(events.deliver)({
+            'type': 'cart', 'payload': {'id': 5},
+            'users': [self.reader.pk],
+        })
+        await flush()
+
+        self.assertReceived(subscribers, ('cart', {'id': 5}), self.reader)
+
+    async def test_deliver_to_followers(self):
+        subscribers = self.connect_all()
+
+        await sync_to_async(events.deliver)({
+            'type': 'recipe', 'payload': {'id': 7},
+            'followers_of': self.author.pk,
+        })
+        await flush()
+
+        self.assertReceived(
+            subscribers, ('recipe', {'id': 7}), self.follower
+        )
+
+    @unittest.skipUnless(
+        connection.vendor == 'postgresql', 'Broadcasts use NOTIFY.'
+    )
+    async def test_broadcast_notifies_every_worker(self):
+        subscribers = self.connect_all()
+        # Stands in for the listener of another worker.
+        listening = connection.Database.connect(
+            **connection.get_connection_params()
+        )
+        self.addCleanup(listening.close)
+        listening.autocommit = True
+        with listening.cursor() as cursor:
+            cursor.execute(f'LISTEN {events.CHANNEL}')
+
+        await sync_to_async(events.broadcast)(
+            'recipe', {'id': 7}, followers_of=self.author.pk
+        )
+        await sync_to_async(events.broadcast)(
+            'cart', {'id': 5}, user_ids=[self.reader.pk]
+        )
+        self.assertTrue(select.select([listening], [], [], 5)[0])
+        listening.poll()
+        messages = [
+            json.loads(notify.payload) for notify in listening.notifies
+        ]
+        self.assertEqual(len(messages), 2)
+        for message in messages:
+            await sync_to_async(events.deliver)(message)
+        await flush()
+
+        self.assertEqual(queued(subscribers[self.author]), [])
+        self.assertEqual(
+            queued(subscribers[self.follower]), [('recipe', {'id': 7})]
+        )
+        self.assertEqual(
+            queued(subscribers[self.reader]), [('cart', {'id': 5})]
+        )
+
+    @unittest.skipIf(
+        connection.vendor == 'postgresql', 'Broadcasts use NOTIFY.'
+    )
+    async def test_broadcast_delivers_locally(self):
+        subscribers = self.connect_all()
+
+        await sync_to_async(events.broadcast)(
+            'recipe', {'id': 7}, followers_of=self.author.pk
+        )
+        await flush()
+
+        self.assertReceived(
+            subscribers, ('recipe', {'id': 7}), self.follower
+        )
@@ -0,0 +1,99 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+
+from rest_framework.test import APIClient
+
+from recipes.models import Recipe, Tag
+
+User = get_user_model()
+
+
+class RecipeFacetsTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.anna, cls.bob = [
+            User.objects.create_user(
+                email=f'{name}@example.com', username=name,
+                password='password', first_name=name.title(),
+                last_name='Cook'
+            )
+            for name in ('anna', 'bob')
+        ]
+        cls.breakfast, cls.dinner, cls.unused = Tag.objects.bulk_create([
+            Tag(name='Breakfast', slug='breakfast'),
+            Tag(name='Dinner', slug='dinner'),
+            Tag(name='Unused', slug='unused'),
+        ])
+        for index, (author, minutes, tags) in enumerate((
+            (cls.anna, 10, [cls.breakfast]),
+            (cls.anna, 15, [cls.breakfast, cls.dinner]),
+            (cls.anna, 45, [cls.dinner]),
+            (cls.bob, 90, [cls.dinner]),
+            (cls.bob, 240, []),
+        )):
+            recipe = Recipe.objects.create(
+                author=author, name=f'Recipe {index}', text='Cook it.',
+                image='recipes/images/test.png', cooking_time=minutes
+            )
+            recipe.tags.set(tags)
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def facets(self, query=''):
+        response = self.client.get(f'/api/recipes/facets/{query}')
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_counts_of_all_recipes(self):
+        facets = self.facets()
+
+        self.assertEqual(facets['count'], 5)
+        self.assertEqual(
+            [(tag['slug'], tag['count']) for tag in facets['tags']],
+            [('dinner', 3), ('breakfast', 2)]
+        )
+        self.assertEqual(
+            [(author['id'], author['count'])
+             for author in facets['authors']],
+            [(self.anna.id, 3), (self.bob.id, 2)]
+        )
+        self.assertEqual(facets['cooking_time'], [
+            {'min': 1, 'max': 15, 'count': 2},
+            {'min': 16, 'max': 30, 'count': 0},
+            {'min': 31, 'max': 60, 'count': 1},
+            {'min': 61, 'max': 120, 'count': 1},
+            {'min': 121, 'max': None, 'count': 1},
+        ])
+
+    def test_counts_follow_the_filters(self):
+        facets = self.facets(f'?tags=dinner&author={self.anna.id}')
+
+        self.assertEqual(facets['count'], 2)
+        self.assertEqual(
+            [(tag['slug'], tag['count']) for tag in facets['tags']],
+            [('dinner', 2), ('breakfast', 1)]
+        )
+        self.assertEqual(
+            [(author['id'], author['count'])
+             for author in facets['authors']],
+            [(self.anna.id, 2)]
+        )
+
+    def test_no_matches(self):
+        facets = self.facets('?tags=unused')
+
+        self.assertEqual(facets['count'], 0)
+        self.assertEqual(facets['tags'], [])
+        self.assertEqual(facets['authors'], [])
+
+    def test_equivalent_queries_share_the_cached_result(self):
+        self.facets('?tags=breakfast&tags=dinner')
+        Recipe.objects.filter(author=self.bob).delete()
+
+        with self.assertNumQueries(0):
+            facets = self.facets('?tags=dinner&tags=breakfast')
+        self.assertEqual(facets['count'], 4)
@@ -0,0 +1,69 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import AsyncRequestFactory, TestCase, override_settings
+
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from api.recipes.async_views import recipe_list
+from recipes.models import Recipe
+
+User = get_user_model()
+
+
+@override_settings(RECIPE_FEED_CACHE_TTL=30)
+class RecipeFeedCacheTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(
+            email='cook@example.com', username='cook', password='password',
+            first_name='Cook', last_name='Cook'
+        )
+        cls.create_recipe('Porridge')
+
+    @classmethod
+    def create_recipe(cls, name):
+        return Recipe.objects.create(
+            author=cls.author, name=name, text='Cook it.',
+            image='recipes/images/test.png', cooking_time=10
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def test_repeated_request_is_served_from_cache(self):
+        first = self.client.get('/api/recipes/?limit=5')
+
+        with self.assertNumQueries(0):
+            second = self.client.get('/api/recipes/?limit=5')
+        self.assertEqual(second.content, first.content)
+
+    def test_committed_recipe_makes_entries_stale(self):
+        self.client.get('/api/recipes/')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_recipe('Pancakes')
+
+        self.assertEqual(self.client.get('/api/recipes/').json()['count'], 2)
+
+    def test_signed_in_requests_bypass_cache(self):
+        self.client.get('/api/recipes/')
+        Recipe.objects.all().delete()
+        token = Token.objects.create(user=self.author)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+
+        self.assertEqual(self.client.get('/api/recipes/').json()['count'], 0)
+
+    async def test_async_view_shares_entries(self):
+        sync_response = await self.async_client.get('/api/recipes/')
+        request = AsyncRequestFactory().get('/api/recipes/')
+
+        # A rebuilt page would come back empty.
+        await Recipe.objects.all().adelete()
+
+        response = await recipe_list(request)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, sync_response.content)
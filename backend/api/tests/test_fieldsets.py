@@ -0,0 +1,170 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.http import QueryDict
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import ValidationError
+from rest_framework.test import APIClient
+
+from api.fieldsets import requested_fields
+from api.recipes.serializers import RecipeSerializer
+from recipes.models import (Favorite, Ingredient, Recipe, RecipeIngredient,
+                            ShoppingCart, Tag)
+from users.models import Subscription
+
+User = get_user_model()
+
+RECIPE_SUMMARY = ['id', 'name', 'image', 'cooking_time']
+USER_SUMMARY = ['id', 'username', 'first_name', 'last_name', 'avatar']
+# Tables only the full recipe payload needs.
+RELATED_TABLES = [
+    model._meta.db_table for model in (
+        Tag, RecipeIngredient, Ingredient, Favorite, ShoppingCart,
+        Subscription,
+    )
+]
+
+
+class RequestedFieldsTests(SimpleTestCase):
+
+    def fields(self, query):
+        return requested_fields(QueryDict(query), RecipeSerializer)
+
+    def test_every_field_by_default(self):
+        self.assertIsNone(self.fields(''))
+
+    def test_fields_omit_and_view(self):
+        self.assertEqual(self.fields('fields=id,name'), {'id', 'name'})
+        self.assertEqual(
+            self.fields('omit=text,author'),
+            set(RecipeSerializer.Meta.fields) - {'text', 'author'}
+        )
+        self.assertEqual(self.fields('view=summary'), set(RECIPE_SUMMARY))
+        self.assertEqual(
+            self.fields('view=summary&omit=image'),
+            set(RECIPE_SUMMARY) - {'image'}
+        )
+
+    def test_unknown_names(self):
+        with self.assertRaises(ValidationError) as error:
+            self.fields('fields=id,secret&omit=nope&view=huge')
+
+        self.assertEqual(
+            set(error.exception.detail), {'fields', 'omit', 'view'}
+        )
+
+
+class SparseFieldsetViewTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author, viewer = [
+            User.objects.create_user(
+                email=f'{name}@example.com', username=name,
+                password='password', first_name=name.title(),
+                last_name='Cook'
+            )
+            for name in ('author', 'viewer')
+        ]
+        tag = Tag.objects.create(name='Soup', slug='soup')
+        onion = Ingredient.objects.create(name='onion', measurement_unit='g')
+        cls.recipes = []
+        for index in range(3):
+            recipe = Recipe.objects.create(
+                author=cls.author, name=f'Soup {index}', text='Boil it.',
+                image='recipes/images/soup.png', cooking_time=20
+            )
+            recipe.tags.add(tag)
+            RecipeIngredient.objects.create(
+                recipe=recipe, ingredient=onion, amount=100
+            )
+            cls.recipes.append(recipe)
+        Favorite.objects.create(user=viewer, recipe=cls.recipes[0])
+        Subscription.objects.create(user=viewer, author=cls.author)
+        cls.token = Token.objects.create(user=viewer).key
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token}')
+
+    def get(self, path):
+        response = self.client.get(path)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def test_recipe_payload_shapes(self):
+        detail = f'/api/recipes/{self.recipes[0].pk}/'
+        for query, expected in (
+            ('', RecipeSerializer.Meta.fields),
+            ('?fields=id,name,is_favorited', ['id', 'name', 'is_favorited']),
+            ('?view=summary', RECIPE_SUMMARY),
+            ('?view=summary&omit=image', ['id', 'name', 'cooking_time']),
+            ('?omit=text,ingredients', [
+                name for name in RecipeSerializer.Meta.fields
+                if name not in ('text', 'ingredients')
+            ]),
+        ):
+            with self.subTest(query=query):
+                page = self.get(f'/api/recipes/{query}')
+                self.assertEqual(list(page['results'][0]), list(expected))
+                self.assertEqual(list(self.get(detail + query)), expected)
+
+    def test_user_payload_shapes(self):
+        for query, expected in (
+            ('?view=summary', USER_SUMMARY),
+            ('?fields=id,recipes_count', ['id', 'recipes_count']),
+        ):
+            with self.subTest(query=query):
+                page = self.get(f'/api/users/{query}')
+                self.assertEqual(list(page['results'][0]), expected)
+                self.assertEqual(list(self.get(f'/api/users/me/{query}')),
+                                 expected)
+
+    def test_unknown_names_are_rejected(self):
+        for path in (
+            '/api/recipes/?fields=secret', '/api/recipes/?view=huge',
+            '/api/users/?omit=password',
+        ):
+            with self.subTest(path=path):
+                self.assertEqual(self.client.get(path).status_code, 400)
+
+    def assertNoRelatedQueries(self, queries):
+        for query in queries:
+            for table in RELATED_TABLES:
+                self.assertNotIn(f'"{table}"', query['sql'])
+
+    def test_recipe_summary_skips_related_queries(self):
+        # Caches the token, so only the view's own queries are counted.
+        self.get('/api/users/me/')
+
+        # Count and page.
+        with self.assertNumQueries(2):
+            with CaptureQueriesContext(connection) as queries:
+                self.get('/api/recipes/?view=summary')
+        self.assertNoRelatedQueries(queries.captured_queries)
+
+        with self.assertNumQueries(1):
+            with CaptureQueriesContext(connection) as queries:
+                self.get(f'/api/recipes/{self.recipes[0].pk}/?view=summary')
+        self.assertNoRelatedQueries(queries.captured_queries)
+
+        # The serializer path loads through ``recipe_queryset`` as well.
+        with override_settings(RECIPE_LIST_FAST_PATH=False):
+            with self.assertNumQueries(2):
+                with CaptureQueriesContext(connection) as queries:
+                    self.get('/api/recipes/?view=summary')
+        self.assertNoRelatedQueries(queries.captured_queries)
+
+    def test_user_summary_skips_stats_and_subscriptions(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.get('/api/users/?view=summary')
+
+        for query in queries.captured_queries:
+            self.assertNotIn('"users_userstats"', query['sql'])
+            self.assertNotIn(
+                f'"{Subscription._meta.db_table}"', query['sql']
+            )
@@ -0,0 +1,102 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from api.utils import MAX_ID
+from recipes.models import Favorite, Recipe, ShoppingCart
+from users.models import Subscription
+
+User = get_user_model()
+
+URL = '/api/recipes/status/'
+
+
+class InteractionStatusTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.viewer, followed, other = [
+            User.objects.create_user(
+                email=f'{name}@example.com', username=name,
+                password='password', first_name=name.title(),
+                last_name='Cook'
+            )
+            for name in ('viewer', 'followed', 'other')
+        ]
+        cls.favorite, cls.in_cart, cls.followed_recipe, cls.plain = [
+            Recipe.objects.create(
+                author=author, name=name, text='Cook it.',
+                image='recipes/images/test.png', cooking_time=10
+            )
+            for author, name in (
+                (other, 'Favorite'), (other, 'In cart'),
+                (followed, 'Followed'), (other, 'Plain'),
+            )
+        ]
+        Favorite.objects.create(user=cls.viewer, recipe=cls.favorite)
+        ShoppingCart.objects.create(user=cls.viewer, recipe=cls.in_cart)
+        Subscription.objects.create(user=cls.viewer, author=followed)
+        cls.token = Token.objects.create(user=cls.viewer).key
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token}')
+
+    def status(self, ids):
+        return self.client.post(URL, {'ids': ids}, format='json')
+
+    def test_flags(self):
+        response = self.status([
+            self.favorite.pk, self.in_cart.pk, self.followed_recipe.pk,
+            self.plain.pk,
+        ])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), [
+            {'id': self.favorite.pk, 'is_favorited': True,
+             'is_in_shopping_cart': False, 'is_subscribed': False},
+            {'id': self.in_cart.pk, 'is_favorited': False,
+             'is_in_shopping_cart': True, 'is_subscribed': False},
+            {'id': self.followed_recipe.pk, 'is_favorited': False,
+             'is_in_shopping_cart': False, 'is_subscribed': True},
+            {'id': self.plain.pk, 'is_favorited': False,
+             'is_in_shopping_cart': False, 'is_subscribed': False},
+        ])
+
+    def test_unknown_ids_are_left_out(self):
+        response = self.status([self.plain.pk + 1000, self.plain.pk])
+
+        self.assertEqual(
+            [item['id'] for item in response.json()], [self.plain.pk]
+        )
+
+    def test_duplicates_collapse_in_request_order(self):
+        response = self.status([
+            self.plain.pk, self.favorite.pk, self.plain.pk, self.in_cart.pk
+        ])
+
+        self.assertEqual(
+            [item['id'] for item in response.json()],
+            [self.plain.pk, self.favorite.pk, self.in_cart.pk]
+        )
+
+    def test_too_many_ids(self):
+        limit = settings.RECIPE_STATUS_MAX_IDS
+        response = self.status(list(range(1, limit + 2)))
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_out_of_range_ids(self):
+        for ids in ([0], [1, MAX_ID + 1], [], ['x']):
+            with self.subTest(ids=ids):
+                self.assertEqual(self.status(ids).status_code, 400)
+
+    def test_anonymous(self):
+        response = APIClient().post(
+            URL, {'ids': [self.plain.pk]}, format='json'
+        )
+
+        self.assertEqual(response.status_code, 401)
@@ -0,0 +1,133 @@
+import io
+import uuid
+from datetime import date, datetime, time, timedelta, timezone
+from decimal import Decimal
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+from django.utils.translation import gettext_lazy as _
+
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from api.parsers import FastJSONParser
+from api.renderers import FastJSONRenderer, orjson
+from recipes.models import Recipe, Tag
+
+User = get_user_model()
+
+SAMPLES = {
+    'scalars': {'int': 7, 'float': 2.5, 'bool': True, 'none': None},
+    'text': 'Борщ «домашний» 🍲 and "quotes"\n',
+    'line_separators': 'a b c',
+    'nested': [{'id': 1, 'tags': [{'slug': 'soup'}]}, [], {}],
+    'int_keys': {1: 'one', 2: 'two'},
+    'utc': datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=timezone.utc),
+    'offset': datetime(
+        2024, 5, 1, 12, 30, tzinfo=timezone(timedelta(hours=3))
+    ),
+    'naive': datetime(2024, 5, 1, 12, 30),
+    'date': date(2024, 5, 1),
+    'time': time(8, 15, 30),
+    'decimal': Decimal('12.50'),
+    'lazy': _('name'),
+    'uuid': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+    'wide': 2 ** 64 + 1,
+}
+
+
+@skipUnless(orjson, 'orjson is not installed')
+class FastJSONRendererTests(SimpleTestCase):
+
+    def assertSameOutput(self, data, *args):
+        self.assertEqual(
+            FastJSONRenderer().render(data, *args),
+            JSONRenderer().render(data, *args)
+        )
+
+    def test_matches_stock_renderer(self):
+        for name, value in SAMPLES.items():
+            with self.subTest(name):
+                self.assertSameOutput({name: value})
+
+    def test_matches_stock_renderer_on_mixed_document(self):
+        self.assertSameOutput(SAMPLES)
+
+    def test_none_renders_empty(self):
+        self.assertSameOutput(None)
+
+    def test_indented_output(self):
+        self.assertSameOutput(
+            SAMPLES['nested'], 'application/json; indent=2'
+        )
+
+
+@skipUnless(orjson, 'orjson is not installed')
+class FastJSONResponseTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user(
+            email='cook@example.com', username='cook', password='password',
+            first_name='Анна', last_name='Cook'
+        )
+        cls.recipe = Recipe.objects.create(
+            author=author, name='Борщ 🍲', text='Свёкла и капуста.',
+            image='recipes/images/borscht.png', cooking_time=90
+        )
+        cls.recipe.tags.add(Tag.objects.create(name='Суп', slug='soup'))
+
+    def setUp(self):
+        # Cached list responses carry no data to render again.
+        cache.clear()
+
+    def test_api_responses_match_stock_renderer(self):
+        for path in (
+            '/api/recipes/', f'/api/recipes/{self.recipe.pk}/',
+            '/api/tags/', '/api/users/',
+        ):
+            with self.subTest(path):
+                response = self.client.get(path)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(
+                    response.content, JSONRenderer().render(response.data)
+                )
+
+
+@skipUnless(orjson, 'orjson is not installed')
+class FastJSONParserTests(SimpleTestCase):
+
+    def parse(self, parser, body):
+        return parser.parse(io.BytesIO(body.encode()))
+
+    def test_matches_stock_parser(self):
+        for body in (
+            '{"name": "Борщ", "tags": [1, 2], "cooking_time": 30}',
+            '{"amount": 1.5, "flag": false, "empty": null}',
+            f'{{"wide": {2 ** 64}, "negative": {-2 ** 63 - 1}}}',
+            '[]',
+        ):
+            with self.subTest(body):
+                self.assertEqual(
+                    self.parse(FastJSONParser(), body),
+                    self.parse(JSONParser(), body)
+                )
+
+    def test_wide_numbers_stay_integers(self):
+        data = self.parse(FastJSONParser(), f'{{"id": {2 ** 70}}}')
+
+        self.assertEqual(data, {'id': 2 ** 70})
+
+    def test_same_error_as_stock_parser(self):
+        for body in ('{"name": ', '{"value": NaN}'):
+            with self.subTest(body):
+                with self.assertRaises(ParseError) as stock:
+                    self.parse(JSONParser(), body)
+                with self.assertRaises(ParseError) as fast:
+                    self.parse(FastJSONParser(), body)
+                self.assertEqual(
+                    str(fast.exception.detail), str(stock.exception.detail)
+                )
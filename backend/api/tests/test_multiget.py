@@ -0,0 +1,110 @@
+from django.contrib.auth import get_user_model
+from django.http import QueryDict
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from rest_framework.exceptions import ValidationError
+from rest_framework.test import APIClient
+
+from api.multiget import requested_ids
+from api.utils import MAX_ID, parse_id
+from recipes.models import Recipe
+
+User = get_user_model()
+
+
+class ParseIdTests(SimpleTestCase):
+
+    def test_accepts_ascii_decimal_ids(self):
+        for value, expected in (('1', 1), ('007', 7), (str(MAX_ID), MAX_ID)):
+            with self.subTest(value):
+                self.assertEqual(parse_id(value), expected)
+
+    def test_rejects_other_values(self):
+        for value in (
+            '', '0', '-1', '+1', ' 1', '1.0', '²', '٣', '１',
+            str(MAX_ID + 1), '9' * 5000,
+        ):
+            with self.subTest(value):
+                self.assertIsNone(parse_id(value))
+
+
+class RequestedIdsTests(SimpleTestCase):
+
+    def ids(self, query):
+        return requested_ids(QueryDict(query))
+
+    def test_without_parameter(self):
+        self.assertIsNone(self.ids('limit=5'))
+
+    def test_distinct_ids_in_request_order(self):
+        self.assertEqual(self.ids('ids=5, 1,5,,3'), [5, 1, 3])
+
+    def test_rejects_malformed_ids(self):
+        for value in ('', ',', 'a', '0', '1,²', f'1,{MAX_ID + 1}', '1.5'):
+            with self.subTest(value):
+                with self.assertRaises(ValidationError):
+                    self.ids(f'ids={value}')
+
+    @override_settings(MULTI_GET_MAX_IDS=3)
+    def test_limits_number_of_ids(self):
+        self.assertEqual(self.ids('ids=1,2,3,3'), [1, 2, 3])
+        with self.assertRaises(ValidationError):
+            self.ids('ids=1,2,3,4')
+
+
+@override_settings(RECIPE_FEED_CACHE_TTL=0)
+class MultiGetViewTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user(
+            email='cook@example.com', username='cook', password='password',
+            first_name='Cook', last_name='Cook'
+        )
+        cls.first, cls.second = [
+            Recipe.objects.create(
+                author=author, name=name, text='Cook it.',
+                image='recipes/images/test.png', cooking_time=10
+            )
+            for name in ('Porridge', 'Pancakes')
+        ]
+        cls.author = author
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_recipes_in_request_order_with_missing_ids(self):
+        missing = self.second.pk + 1000
+        response = self.client.get(
+            f'/api/recipes/?ids={self.second.pk},{missing},{self.first.pk}'
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [recipe['id'] for recipe in response.data['results']],
+            [self.second.pk, self.first.pk]
+        )
+        self.assertEqual(response.data['missing'], [missing])
+
+    def test_users_by_ids(self):
+        response = self.client.get(f'/api/users/?ids={self.author.pk}')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [user['id'] for user in response.data['results']],
+            [self.author.pk]
+        )
+
+    def test_malformed_ids_are_rejected(self):
+        for value in ('²', str(MAX_ID + 1), '1,x'):
+            with self.subTest(value):
+                response = self.client.get(f'/api/recipes/?ids={value}')
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('ids', response.data)
+
+    def test_recipe_actions_404_on_malformed_ids(self):
+        for pk in ('²', str(MAX_ID + 1), '0'):
+            for action in ('get-link', 'similar'):
+                with self.subTest(pk=pk, action=action):
+                    response = self.client.get(f'/api/recipes/{pk}/{action}/')
+                    self.assertEqual(response.status_code, 404)
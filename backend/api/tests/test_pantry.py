@@ -0,0 +1,140 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from rest_framework.test import APIClient
+
+from api.pantry import pantry_index
+from recipes.models import Favorite, Ingredient, Recipe, RecipeIngredient
+from users.models import Subscription
+
+User = get_user_model()
+
+
+class PantryIndexRefreshTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(
+            email='cook@example.com', username='cook', password='password',
+            first_name='Cook', last_name='Cook'
+        )
+        cls.flour, cls.eggs, cls.milk = Ingredient.objects.bulk_create([
+            Ingredient(name='flour', measurement_unit='g'),
+            Ingredient(name='eggs', measurement_unit='pcs'),
+            Ingredient(name='milk', measurement_unit='ml'),
+        ])
+
+    def setUp(self):
+        pantry_index._load()
+
+    def create_recipe(self, name, *ingredients):
+        recipe = Recipe.objects.create(
+            author=self.author, name=name, text='Mix and cook.',
+            image='recipes/images/test.png', cooking_time=20
+        )
+        RecipeIngredient.objects.bulk_create([
+            RecipeIngredient(recipe=recipe, ingredient=ingredient, amount=1)
+            for ingredient in ingredients
+        ])
+        return recipe
+
+    def match(self, *ingredients):
+        return pantry_index.match(
+            [ingredient.pk for ingredient in ingredients], limit=10
+        )
+
+    def test_new_recipe_is_indexed_after_commit(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            recipe = self.create_recipe('Pancakes', self.flour, self.eggs)
+            self.assertEqual(self.match(self.flour), [])
+
+        for callback in callbacks:
+            callback()
+
+        self.assertEqual(self.match(self.flour), [(recipe.pk, 1, 1)])
+
+    def test_changed_ingredients_are_reindexed(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            recipe = self.create_recipe('Pancakes', self.flour, self.eggs)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            recipe.recipe_ingredients.filter(ingredient=self.eggs).delete()
+            RecipeIngredient.objects.create(
+                recipe=recipe, ingredient=self.milk, amount=1
+            )
+            recipe.save()
+
+        self.assertEqual(self.match(self.eggs), [])
+        self.assertEqual(
+            self.match(self.flour, self.milk), [(recipe.pk, 2, 0)]
+        )
+
+    def test_deleted_recipe_is_dropped(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            recipe = self.create_recipe('Pancakes', self.flour)
+
+        recipe.delete()
+
+        self.assertEqual(self.match(self.flour), [])
+
+
+class PantryMatchViewTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.viewer = User.objects.create_user(
+            email='viewer@example.com', username='viewer',
+            password='password', first_name='Viewer', last_name='Viewer'
+        )
+        cls.flour = Ingredient.objects.create(
+            name='flour', measurement_unit='g'
+        )
+        cls.authors = [
+            User.objects.create_user(
+                email=f'cook-{index}@example.com', username=f'cook-{index}',
+                password='password', first_name='Cook', last_name='Cook'
+            )
+            for index in range(4)
+        ]
+        cls.recipes = []
+        for index, author in enumerate(cls.authors):
+            recipe = Recipe.objects.create(
+                author=author, name=f'Bread {index}', text='Bake it.',
+                image='recipes/images/test.png', cooking_time=60
+            )
+            RecipeIngredient.objects.create(
+                recipe=recipe, ingredient=cls.flour, amount=500
+            )
+            cls.recipes.append(recipe)
+        Subscription.objects.create(user=cls.viewer, author=cls.authors[1])
+        Favorite.objects.create(user=cls.viewer, recipe=cls.recipes[2])
+
+    def setUp(self):
+        pantry_index._load()
+        self.client = APIClient()
+        self.client.force_authenticate(self.viewer)
+
+    def match(self, limit):
+        return self.client.post('/api/recipes/match/', {
+            'ingredients': [self.flour.pk], 'limit': limit
+        }, format='json')
+
+    def test_flags_come_from_one_query_each(self):
+        with self.assertNumQueries(6):
+            small = self.match(limit=1)
+        with self.assertNumQueries(6):
+            response = self.match(limit=4)
+
+        self.assertEqual(small.status_code, 200)
+        flags = {
+            recipe['id']: (
+                recipe['author']['is_subscribed'], recipe['is_favorited']
+            )
+            for recipe in response.json()
+        }
+        self.assertEqual(flags, {
+            self.recipes[0].pk: (False, False),
+            self.recipes[1].pk: (True, False),
+            self.recipes[2].pk: (False, True),
+            self.recipes[3].pk: (False, False),
+        })
@@ -0,0 +1,136 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from api.recipes.serializers import RecipeSerializer
+from recipes.models import (Favorite, Ingredient, Recipe, RecipeIngredient,
+                            ShoppingCart, Tag)
+from users.models import Subscription, UserStats
+
+User = get_user_model()
+
+# ``{author}`` is filled in with the fixture author without stats and
+# ``{ids}`` with fixture recipe ids out of order, a repeat and a missing id.
+PATHS = (
+    '/api/recipes/',
+    '/api/recipes/?limit=100',
+    '/api/recipes/?author={author}',
+    '/api/recipes/?author={author}&view=summary',
+    '/api/recipes/?author={author}&omit=text,author',
+    '/api/recipes/?tags={tag}',
+    '/api/recipes/?search=contract',
+    '/api/recipes/?is_favorited=1',
+    '/api/recipes/?is_in_shopping_cart=0&page=2&limit=3',
+    '/api/recipes/?offset=100000000',
+    '/api/recipes/?ids={ids}',
+    '/api/recipes/?ids={ids}&is_favorited=1&fields=id,name',
+    *(
+        f'/api/recipes/?author={{author}}&fields={name}'
+        for name in RecipeSerializer.Meta.fields
+    ),
+)
+
+
+class RecipeRowsTests(TestCase):
+    """The row-based recipe list renders exactly what the serializers do."""
+
+    @classmethod
+    def setUpTestData(cls):
+        author, other, viewer = [
+            User.objects.create_user(
+                email=f'contract-{index}@example.com',
+                username=f'contract-{index}',
+                password='password',
+                first_name='Контракт',
+                last_name=f'User {index}'
+            )
+            for index in range(3)
+        ]
+        # An avatar whose URL needs quoting, and no stats row: the
+        # serializer renders the counters' defaults.
+        author.avatar = 'avatars/аватар 1.png'
+        author.save(update_fields=['avatar'])
+        UserStats.objects.filter(user=author).delete()
+
+        tags = [
+            Tag.objects.create(
+                name=f'contract {index}', slug=f'contract-{index}'
+            )
+            for index in range(3)
+        ]
+        ingredients = [
+            Ingredient.objects.create(
+                name=f'ингредиент {index}', measurement_unit='г'
+            )
+            for index in range(4)
+        ]
+        recipes = []
+        for index in range(6):
+            recipe = Recipe.objects.create(
+                author=(author, other)[index % 2],
+                name=f'Contract recipe {index}',
+                text='Line\u2028separator, «quotes» and "escapes" \\ ',
+                image=f'recipes/images/рецепт {index}.png',
+                cooking_time=index + 1
+            )
+            # Inserted out of id order; one recipe without tags and one
+            # without ingredients.
+            if index != 1:
+                recipe.tags.set(tags[::-1][:index % 3 + 1])
+            if index != 2:
+                RecipeIngredient.objects.bulk_create(
+                    RecipeIngredient(
+                        recipe=recipe, ingredient=ingredient, amount=amount
+                    )
+                    for amount, ingredient in enumerate(
+                        ingredients[::-1][:index % 4 + 1], 1
+                    )
+                )
+            recipes.append(recipe)
+
+        Subscription.objects.create(user=viewer, author=author)
+        Favorite.objects.bulk_create(
+            Favorite(user=viewer, recipe=recipe) for recipe in recipes[::2]
+        )
+        ShoppingCart.objects.bulk_create(
+            ShoppingCart(user=viewer, recipe=recipe) for recipe in recipes[1:3]
+        )
+        # Ids are assigned in insertion order, so this one is free.
+        missing = recipes[-1].pk + 1000
+        ids = [
+            recipes[3].pk, recipes[0].pk, missing, recipes[3].pk,
+            recipes[5].pk
+        ]
+        cls.fixture = {
+            'author': author.pk,
+            'ids': ','.join(map(str, ids)),
+            'tag': tags[0].slug,
+        }
+        cls.token = Token.objects.create(user=viewer).key
+
+    def assertSameResponse(self, client, path):
+        responses = []
+        for fast in (False, True):
+            with override_settings(
+                RECIPE_LIST_FAST_PATH=fast, RECIPE_FEED_CACHE_TTL=0
+            ):
+                response = client.get(path)
+            responses.append((response.status_code, response.content))
+        self.assertEqual(responses[1], responses[0])
+
+    def test_anonymous_list_matches_serializers(self):
+        client = APIClient()
+        for path in PATHS:
+            path = path.format(**self.fixture)
+            with self.subTest(path):
+                self.assertSameResponse(client, path)
+
+    def test_authenticated_list_matches_serializers(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Token {self.token}')
+        for path in PATHS:
+            path = path.format(**self.fixture)
+            with self.subTest(path):
+                self.assertSameResponse(client, path)
@@ -0,0 +1,122 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from api.shortlinks import (MAX_ID, decode_code, encode_id, live_recipes,
+                            short_link_path)
+from recipes.models import Recipe
+
+User = get_user_model()
+
+
+class DecodeCodeTests(TestCase):
+
+    def test_round_trip(self):
+        for value in (1, 12, 61, 62, 1_000_000, MAX_ID):
+            with self.subTest(value=value):
+                self.assertEqual(decode_code(encode_id(value)), value)
+
+    def test_codes_never_look_like_ids(self):
+        for value in (1, 12, 64, 1_000_000):
+            with self.subTest(value=value):
+                self.assertFalse(encode_id(value).isdigit())
+
+    def test_legacy_numeric_links(self):
+        self.assertEqual(decode_code('12'), 12)
+        self.assertEqual(decode_code(str(MAX_ID)), MAX_ID)
+
+    def test_rejects_malformed_codes(self):
+        for code in ('', '0', 'r', 'r0', 'x1', 'r1-', '²', '12a'):
+            with self.subTest(code=code):
+                self.assertIsNone(decode_code(code))
+
+    def test_rejects_ids_beyond_bigint(self):
+        for code in (
+            str(MAX_ID + 1), '9' * 20, '1' * 5000, 'rzzzzzzzzzzz',
+            'r' + 'z' * 100,
+        ):
+            with self.subTest(code=code[:20]):
+                self.assertIsNone(decode_code(code))
+
+
+class ShortLinkRedirectTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user(
+            email='author@example.com', username='author',
+            password='password', first_name='Author', last_name='Author'
+        )
+        cls.recipe = Recipe.objects.create(
+            author=author, name='Recipe', text='Text',
+            image='recipes/images/recipe.png', cooking_time=5
+        )
+
+    def test_code_redirects_to_recipe(self):
+        response = self.client.get(short_link_path(self.recipe.pk))
+
+        self.assertRedirects(
+            response, f'/recipes/{self.recipe.pk}/',
+            fetch_redirect_response=False
+        )
+        self.assertIn('max-age', response['Cache-Control'])
+
+    def test_legacy_numeric_link_opens_the_same_recipe(self):
+        response = self.client.get(f'/s/{self.recipe.pk}/')
+
+        self.assertRedirects(
+            response, f'/recipes/{self.recipe.pk}/',
+            fetch_redirect_response=False
+        )
+
+    def test_get_link_returns_code(self):
+        response = self.client.get(f'/api/recipes/{self.recipe.pk}/get-link/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()['short-link'].endswith(
+            short_link_path(self.recipe.pk)
+        ))
+
+    def test_unknown_and_out_of_range_ids_are_not_found(self):
+        for path in ('/s/999999/', f'/s/{MAX_ID + 1}/', '/s/rzzzzzzzzzzzz/'):
+            with self.subTest(path=path):
+                self.assertEqual(self.client.get(path).status_code, 404)
+
+
+class LiveRecipeIndexTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(
+            email='author@example.com', username='author',
+            password='password', first_name='Author', last_name='Author'
+        )
+
+    def setUp(self):
+        live_recipes._load()
+
+    def test_new_recipe_is_indexed_after_commit(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            recipe = Recipe.objects.create(
+                author=self.author, name='Recipe', text='Text',
+                image='recipes/images/recipe.png', cooking_time=5
+            )
+            self.assertFalse(live_recipes._test(recipe.pk))
+
+        for callback in callbacks:
+            callback()
+
+        self.assertTrue(live_recipes._test(recipe.pk))
+
+    def test_deleted_recipe_is_dropped(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            recipe = Recipe.objects.create(
+                author=self.author, name='Recipe', text='Text',
+                image='recipes/images/recipe.png', cooking_time=5
+            )
+
+        pk = recipe.pk
+        self.assertTrue(live_recipes._test(pk))
+
+        recipe.delete()
+
+        self.assertFalse(live_recipes._test(pk))
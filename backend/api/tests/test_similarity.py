@@ -0,0 +1,186 @@
+from io import StringIO
+
+import numpy as np
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
+
+from api import similarity
+from recipes.models import (
+    Ingredient, Recipe, RecipeIngredient, SimilarRecipe
+)
+
+User = get_user_model()
+
+NO_TAGS = np.zeros((0, 2), dtype=np.int64)
+RARE, SALT, PEPPER = 1, 2, 3
+# Recipe 1 shares the rare ingredient and salt with recipe 2, salt and
+# pepper with recipe 3; recipes 4-9 only use salt and pepper.
+INGREDIENTS = np.array([
+    (1, RARE), (1, SALT), (1, PEPPER),
+    (2, RARE), (2, SALT),
+    *((recipe, ingredient)
+      for recipe in range(3, 10) for ingredient in (SALT, PEPPER)),
+])
+
+
+class RecipeVectorsTests(SimpleTestCase):
+
+    def vectors(self, max_df=1.0):
+        return similarity.RecipeVectors(
+            np.arange(1, 10), INGREDIENTS, NO_TAGS, max_df
+        )
+
+    def neighbours(self, vectors, recipe_id, k=10):
+        sources, targets, scores = vectors.neighbours(
+            vectors.rows_of([recipe_id]), k
+        )
+        self.assertTrue((sources == recipe_id).all())
+        return dict(zip(targets.tolist(), scores.tolist()))
+
+    def test_shared_rare_ingredient_scores_higher(self):
+        scores = self.neighbours(self.vectors(), 1)
+
+        self.assertEqual(next(iter(scores)), 2)
+        self.assertGreater(scores[2], scores[3])
+        self.assertNotIn(1, scores)
+
+    def test_max_df_drops_common_candidates_but_keeps_weights(self):
+        full = self.neighbours(self.vectors(), 1)
+        informative = self.neighbours(self.vectors(max_df=0.5), 1)
+
+        # Salt and pepper no longer make recipe 3 a candidate, but they
+        # still count towards the score of recipe 2.
+        self.assertEqual(list(informative), [2])
+        self.assertAlmostEqual(informative[2], full[2], places=6)
+
+    def test_unknown_recipes_are_ignored(self):
+        vectors = self.vectors()
+
+        self.assertEqual(vectors.rows_of([0, 1, 10]).tolist(), [0])
+
+    def test_pool_task_uses_worker_vectors(self):
+        vectors = self.vectors()
+        similarity.init_worker(vectors)
+        self.addCleanup(similarity.init_worker, None)
+        rows = vectors.rows_of([1, 2])
+
+        for expected, actual in zip(
+            vectors.neighbours(rows, 2), similarity.neighbours(rows, 2)
+        ):
+            self.assertEqual(expected.tolist(), actual.tolist())
+
+
+class RecipeFixtureMixin:
+
+    def create_recipes(self):
+        author = User.objects.create_user(
+            email='cook@example.com', username='cook', password='password',
+            first_name='Cook', last_name='Cook'
+        )
+        flour, eggs, rice, beans = Ingredient.objects.bulk_create([
+            Ingredient(name='flour', measurement_unit='g'),
+            Ingredient(name='eggs', measurement_unit='pcs'),
+            Ingredient(name='rice', measurement_unit='g'),
+            Ingredient(name='beans', measurement_unit='g'),
+        ])
+        recipes = []
+        for name, ingredients in (
+            ('Pancakes', (flour, eggs)),
+            ('Crepes', (flour, eggs)),
+            ('Burrito', (rice, beans)),
+            ('Chili', (rice, beans)),
+        ):
+            recipe = Recipe.objects.create(
+                author=author, name=name, text='Mix and cook.',
+                image='recipes/images/test.png', cooking_time=20
+            )
+            RecipeIngredient.objects.bulk_create([
+                RecipeIngredient(
+                    recipe=recipe, ingredient=ingredient, amount=1
+                )
+                for ingredient in ingredients
+            ])
+            recipes.append(recipe)
+        return recipes
+
+    def similar(self, recipe):
+        return list(SimilarRecipe.objects.filter(
+            recipe=recipe
+        ).values_list('similar_id', flat=True))
+
+
+class SimilarStaleSignalTests(RecipeFixtureMixin, TestCase):
+
+    def setUp(self):
+        (self.pancakes, self.crepes,
+         self.burrito, self.chili) = self.create_recipes()
+        Recipe.objects.update(similar_stale=False)
+        SimilarRecipe.objects.create(
+            recipe=self.crepes, similar=self.pancakes, score=1
+        )
+
+    def stale(self):
+        return set(Recipe.objects.filter(
+            similar_stale=True
+        ).values_list('pk', flat=True))
+
+    def test_saved_recipe_is_stale(self):
+        self.pancakes.save()
+
+        self.assertEqual(self.stale(), {self.pancakes.pk})
+
+    def test_deleting_recipe_flags_recipes_listing_it(self):
+        self.pancakes.delete()
+
+        self.assertEqual(self.stale(), {self.crepes.pk})
+
+
+class BuildSimilarRecipesTests(RecipeFixtureMixin, TransactionTestCase):
+    # The command closes connections before forking its workers, which
+    # a TestCase transaction would not survive.
+
+    def build(self, *args):
+        call_command(
+            'build_similar_recipes', *args, '--processes=1', '--max-df=1',
+            stdout=StringIO()
+        )
+
+    def test_full_build(self):
+        pancakes, crepes, burrito, chili = self.create_recipes()
+
+        self.build()
+
+        self.assertEqual(self.similar(pancakes), [crepes.pk])
+        self.assertEqual(self.similar(burrito), [chili.pk])
+        self.assertFalse(Recipe.objects.filter(similar_stale=True).exists())
+
+    def test_stale_refreshes_flagged_recipes_and_their_listers(self):
+        pancakes, crepes, burrito, chili = self.create_recipes()
+        self.build()
+        before = dict(SimilarRecipe.objects.values_list('recipe_id', 'pk'))
+        pancakes.save()
+
+        self.build('--stale')
+
+        after = dict(SimilarRecipe.objects.values_list('recipe_id', 'pk'))
+        self.assertEqual(after.keys(), before.keys())
+        refreshed = {
+            recipe_id for recipe_id in after
+            if after[recipe_id] != before[recipe_id]
+        }
+        self.assertEqual(refreshed, {pancakes.pk, crepes.pk})
+        self.assertFalse(Recipe.objects.filter(similar_stale=True).exists())
+
+    def test_stale_without_changes_does_nothing(self):
+        self.create_recipes()
+        self.build()
+        before = set(SimilarRecipe.objects.values_list('pk', flat=True))
+        out = StringIO()
+
+        call_command('build_similar_recipes', '--stale', stdout=out)
+
+        self.assertEqual(out.getvalue().strip(), 'No stale recipes.')
+        self.assertEqual(
+            set(SimilarRecipe.objects.values_list('pk', flat=True)), before
+        )
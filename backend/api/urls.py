@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.urls import include, path
 
 from rest_framework.routers import DefaultRouter
@@ -18,3 +19,40 @@ urlpatterns = [
     path('auth/', include('djoser.urls.authtoken')),
     path('', include(router.urls)),
 ]
+
+if settings.ASYNC_VIEWS:
+    from api.events import StreamTicketView, event_stream
+    from api.recipes import async_views
+
+    urlpatterns = [
+        path('events/', event_stream, name='events'),
+        path(
+            'events/ticket/', StreamTicketView.as_view(),
+            name='events-ticket'
+        ),
+        path('recipes/', async_views.split_by_method(
+            async_views.recipe_list,
+            RecipeViewSet.as_view({'get': 'list', 'post': 'create'})
+        ), name='recipes-list'),
+        path('recipes/<int:pk>/', async_views.split_by_method(
+            async_views.recipe_detail,
+            RecipeViewSet.as_view({
+                'get': 'retrieve',
+                'put': 'update',
+                'patch': 'partial_update',
+                'delete': 'destroy',
+            })
+        ), name='recipes-detail'),
+        path('tags/', async_views.tag_list, name='tags-list'),
+        path(
+            'tags/<int:pk>/', async_views.tag_detail, name='tags-detail'
+        ),
+        path(
+            'ingredients/', async_views.ingredient_list,
+            name='ingredients-list'
+        ),
+        path(
+            'ingredients/<int:pk>/', async_views.ingredient_detail,
+            name='ingredients-detail'
+        ),
+    ] + urlpatterns
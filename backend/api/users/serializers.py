@@ -5,6 +5,7 @@ from djoser.serializers import UserSerializer as DjoserUserSerializer
 
 from rest_framework import serializers
 
+from api.fieldsets import SparseFieldsMixin
 from api.utils import Base64ImageField
 from recipes.models import Recipe
 from users.models import Subscription
@@ -33,19 +34,33 @@ class CustomUserCreateSerializer(UserCreateSerializer):
         )
 
 
-class CustomUserSerializer(DjoserUserSerializer):
+class CustomUserSerializer(SparseFieldsMixin, DjoserUserSerializer):
     """Serializer for the current user's profile."""
 
     is_subscribed = serializers.SerializerMethodField()
+    recipes_count = serializers.IntegerField(
+        source='stats.recipes_count', read_only=True, default=0
+    )
+    followers_count = serializers.IntegerField(
+        source='stats.followers_count', read_only=True, default=0
+    )
 
     class Meta(DjoserUserSerializer.Meta):
         model = User
         fields = (
             'id', 'email', 'username', 'first_name',
-            'last_name', 'is_subscribed', 'avatar'
+            'last_name', 'is_subscribed', 'avatar',
+            'recipes_count', 'followers_count'
         )
 
+    field_views = {
+        'summary': ('id', 'username', 'first_name', 'last_name', 'avatar')
+    }
+
     def get_is_subscribed(self, obj):
+        subscribed_ids = self.context.get('subscribed_ids')
+        if subscribed_ids is not None:
+            return obj.id in subscribed_ids
         user = self.context.get('request').user
         return user.is_authenticated and Subscription.objects.filter(
             user=user, author=obj
@@ -101,13 +116,22 @@ class SubscriptionDetailSerializer(serializers.ModelSerializer):
     is_subscribed = serializers.SerializerMethodField()
     avatar = serializers.SerializerMethodField()
     recipes = serializers.SerializerMethodField()
-    recipes_count = serializers.IntegerField()
+    recipes_count = serializers.IntegerField(
+        source='author.stats.recipes_count', read_only=True, default=0
+    )
+    followers_count = serializers.IntegerField(
+        source='author.stats.followers_count', read_only=True, default=0
+    )
+    last_recipe_at = serializers.DateTimeField(
+        source='author.stats.last_recipe_at', read_only=True, default=None
+    )
 
     class Meta:
         model = Subscription
         fields = [
             'id', 'username', 'first_name', 'last_name', 'email',
-            'is_subscribed', 'avatar', 'recipes', 'recipes_count'
+            'is_subscribed', 'avatar', 'recipes', 'recipes_count',
+            'followers_count', 'last_recipe_at'
         ]
 
     def get_is_subscribed(self, obj):
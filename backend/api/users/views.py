@@ -1,7 +1,7 @@
 from http import HTTPStatus
 
 from django.contrib.auth import get_user_model
-from django.db.models import Count
+from django.db.models import F
 from django.shortcuts import get_object_or_404
 
 from rest_framework.decorators import action
@@ -9,6 +9,8 @@ from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet
 
+from api.fieldsets import SparseFieldsViewMixin
+from api.multiget import in_request_order, multi_get_data, requested_ids
 from api.pagination import PageToLimitOffsetPagination
 from api.users.serializers import (
     AvatarSerializer,
@@ -24,12 +26,37 @@ from users.models import Subscription
 User = get_user_model()
 
 
-class UsersViewSet(ModelViewSet):
+# User columns rendered as is by CustomUserSerializer.
+USER_COLUMNS = {'email', 'username', 'first_name', 'last_name', 'avatar'}
+STATS_FIELDS = {'recipes_count', 'followers_count'}
+
+
+class UsersViewSet(SparseFieldsViewMixin, ModelViewSet):
     """ViewSet for managing users."""
 
-    queryset = User.objects.all()
+    queryset = User.objects.select_related('stats')
     serializer_class = CustomUserSerializer
     pagination_class = PageToLimitOffsetPagination
+    sparse_actions = ('list', 'retrieve', 'me')
+
+    def get_queryset(self):
+        fields = self.get_fieldset()
+        if fields is None:
+            return super().get_queryset()
+        if STATS_FIELDS & fields:
+            return User.objects.select_related('stats').only(
+                'id', 'stats', *(USER_COLUMNS & fields)
+            )
+        return User.objects.only('id', *(USER_COLUMNS & fields))
+
+    def list(self, request, *args, **kwargs):
+        ids = requested_ids(request.query_params)
+        if ids is None:
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        found, missing = in_request_order(ids, queryset.filter(pk__in=ids))
+        serializer = self.get_serializer(found, many=True)
+        return Response(multi_get_data(serializer.data, missing))
 
     def get_permissions(self):
         if self.action in ['create', 'list', 'retrieve']:
@@ -113,12 +140,18 @@ class UsersViewSet(ModelViewSet):
         permission_classes=[IsAuthenticated]
     )
     def subscriptions(self, request):
-        """Retrieve the list of subscriptions with detailed information."""
+        """Retrieve the list of subscriptions with detailed information.
+
+        Pass ``?ordering=activity`` to list authors by their latest recipe.
+        """
         subscriptions = Subscription.objects.filter(
             user=request.user
-        ).select_related('author').annotate(
-            recipes_count=Count('author__recipes')
-        )
+        ).select_related('author', 'author__stats')
+        if request.query_params.get('ordering') == 'activity':
+            subscriptions = subscriptions.order_by(
+                F('author__stats__last_recipe_at').desc(nulls_last=True),
+                '-id'
+            )
         paginated_subscriptions = self.paginate_queryset(subscriptions)
 
         serializer = SubscriptionDetailSerializer(
@@ -148,7 +181,7 @@ class UsersViewSet(ModelViewSet):
 
             subscription = Subscription.objects.filter(
                 user=request.user, author=author
-            ).annotate(recipes_count=Count('author__recipes')).first()
+            ).select_related('author', 'author__stats').first()
 
             return Response(
                 SubscriptionDetailSerializer(
@@ -1,10 +1,18 @@
 import base64
 import uuid
+from itertools import islice
 
+import numpy as np
 from django.core.files.base import ContentFile
 
 from rest_framework import serializers
 
+from foodgram_backend.metrics import IMAGE_UPLOAD_BYTES
+
+# Largest primary key a PostgreSQL bigint holds.
+MAX_ID = 2 ** 63 - 1
+MAX_ID_DIGITS = len(str(MAX_ID))
+
 
 class Base64ImageField(serializers.ImageField):
     """Field for decoding an image from Base64."""
@@ -13,8 +21,38 @@ class Base64ImageField(serializers.ImageField):
         if isinstance(data, str) and data.startswith('data:image'):
             format, imgstr = data.split(';base64,')
             ext = format.split('/')[-1]
-            data = (
-                ContentFile(base64.b64decode(imgstr),
-                            name=f'{uuid.uuid4()}.{ext}')
-            )
+            content = base64.b64decode(imgstr)
+            IMAGE_UPLOAD_BYTES.labels(self.field_name).observe(len(content))
+            data = ContentFile(content, name=f'{uuid.uuid4()}.{ext}')
         return super().to_internal_value(data)
+
+
+def int_array(values, chunk_size=1000000):
+    """Read an iterable of integers into an ``int64`` array.
+
+    Reading in chunks keeps numpy from repeatedly growing (and copying)
+    one huge array.
+    """
+    values = iter(values)
+    chunks = [np.zeros(0, dtype=np.int64)]
+    while True:
+        chunk = np.fromiter(islice(values, chunk_size), dtype=np.int64)
+        if not len(chunk):
+            break
+        chunks.append(chunk)
+    return np.concatenate(chunks)
+
+
+def parse_id(value):
+    """A primary key from its ASCII decimal form, or None.
+
+    ``str.isdigit`` also accepts characters such as ``'²'`` that ``int``
+    rejects; values outside ``1..MAX_ID`` are refused as well, since no
+    row can have them.
+    """
+    if not value.isascii() or not value.isdecimal():
+        return None
+    if len(value) > MAX_ID_DIGITS:
+        return None
+    number = int(value)
+    return number if 0 < number <= MAX_ID else None
@@ -0,0 +1,215 @@
+"""PostgreSQL backend with a bounded per-process connection pool.
+
+Select it with ``ENGINE = 'foodgram_backend.db'`` and a ``POOL`` entry in
+the database settings. Django still "closes" the connection at the end of
+each request (``CONN_MAX_AGE = 0``), but the socket is handed back to the
+pool instead of being torn down, so the next request skips the TCP,
+authentication and backend start-up round trips.
+"""
+import logging
+import os
+import threading
+import time
+
+import psycopg2
+from psycopg2 import extensions
+
+from django.db.backends.postgresql import base
+
+from foodgram_backend.metrics import (record_pool_checkout,
+                                      record_pool_connections,
+                                      record_pool_discard)
+
+logger = logging.getLogger(__name__)
+
+# Idle connections older than this are pinged before being reused.
+HEALTH_CHECK_AFTER = 30
+
+
+class ConnectionPool:
+    """Thread-safe LIFO pool with a hard cap on open connections.
+
+    Checkouts, waits, discards and the number of connections in use are
+    also exported as ``foodgram_db_pool_*`` metrics, labelled with
+    ``alias``.
+    """
+
+    def __init__(self, max_size, timeout, max_idle, alias='default'):
+        self.alias = alias
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.pid = os.getpid()
+        self._idle = []
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._lock = threading.Lock()
+        self.counters = {
+            'created': 0,
+            'reused': 0,
+            'discarded': 0,
+            'timeouts': 0,
+            'in_use': 0,
+            'wait_seconds': 0.0,
+        }
+
+    def _count(self, name, value=1):
+        with self._lock:
+            self.counters[name] += value
+
+    def _report(self):
+        with self._lock:
+            in_use, idle = self.counters['in_use'], len(self._idle)
+        record_pool_connections(self.alias, in_use, idle, self.max_size)
+
+    def stats(self):
+        with self._lock:
+            return dict(
+                self.counters,
+                wait_seconds=round(self.counters['wait_seconds'], 6),
+                idle=len(self._idle),
+                max_size=self.max_size
+            )
+
+    def checkout(self, connect):
+        """Return ``(connection, state)``, reusing an idle one if possible.
+
+        ``connect`` opens a new connection and returns the same pair.
+        """
+        started = time.monotonic()
+        if not self._slots.acquire(timeout=self.timeout):
+            self._count('timeouts')
+            record_pool_checkout(self.alias, 'timeout', self.timeout)
+            logger.warning('Database pool exhausted: %s', self.stats())
+            raise psycopg2.OperationalError(
+                f'No database connection available within {self.timeout}s.'
+            )
+        waited = time.monotonic() - started
+        self._count('wait_seconds', waited)
+        try:
+            entry = self._take_idle()
+            if entry is None:
+                entry = connect()
+                result = 'created'
+            else:
+                result = 'reused'
+        except BaseException:
+            self._slots.release()
+            raise
+        self._count(result)
+        self._count('in_use')
+        record_pool_checkout(self.alias, result, waited)
+        self._report()
+        return entry
+
+    def _take_idle(self):
+        while True:
+            with self._lock:
+                if not self._idle:
+                    return None
+                connection, state, returned_at = self._idle.pop()
+            if self._is_usable(connection, returned_at):
+                return connection, state
+            self._discard(connection)
+
+    def _is_usable(self, connection, returned_at):
+        if connection.closed:
+            return False
+        idle_for = time.monotonic() - returned_at
+        if idle_for > self.max_idle:
+            return False
+        if idle_for > HEALTH_CHECK_AFTER:
+            try:
+                with connection.cursor() as cursor:
+                    cursor.execute('SELECT 1')
+            except psycopg2.Error:
+                return False
+        return True
+
+    def checkin(self, connection, state):
+        """Give a connection back, rolling back any unfinished work."""
+        try:
+            status = connection.get_transaction_status()
+            if status in (
+                extensions.TRANSACTION_STATUS_INTRANS,
+                extensions.TRANSACTION_STATUS_INERROR,
+            ):
+                connection.rollback()
+                status = connection.get_transaction_status()
+            if connection.closed or status != (
+                extensions.TRANSACTION_STATUS_IDLE
+            ):
+                self._discard(connection)
+            else:
+                with self._lock:
+                    self._idle.append((connection, state, time.monotonic()))
+        except psycopg2.Error:
+            self._discard(connection)
+        finally:
+            self._count('in_use', -1)
+            self._slots.release()
+            self._report()
+
+    def _discard(self, connection):
+        self._count('discarded')
+        record_pool_discard(self.alias)
+        try:
+            connection.close()
+        except psycopg2.Error:
+            pass
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(alias, options):
+    """Return the pool for a database alias, recreating it after a fork."""
+    with _pools_lock:
+        pool = _pools.get(alias)
+        if pool is None or pool.pid != os.getpid():
+            pool = _pools[alias] = ConnectionPool(
+                max_size=options.get('MAX_SIZE', 10),
+                timeout=options.get('TIMEOUT', 5),
+                max_idle=options.get('MAX_IDLE', 300),
+                alias=alias,
+            )
+        return pool
+
+
+def pool_stats():
+    """Counters of every pool in this process, keyed by database alias."""
+    with _pools_lock:
+        pools = dict(_pools)
+    return {alias: pool.stats() for alias, pool in pools.items()}
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    @property
+    def connection_pool(self):
+        options = self.settings_dict.get('POOL')
+        if not options:
+            return None
+        return get_pool(self.alias, options)
+
+    def get_new_connection(self, conn_params):
+        pool = self.connection_pool
+        if pool is None:
+            return super().get_new_connection(conn_params)
+
+        def connect():
+            connection = super(DatabaseWrapper, self).get_new_connection(
+                conn_params
+            )
+            return connection, self.isolation_level
+
+        connection, self.isolation_level = pool.checkout(connect)
+        self._pooled_from = pool
+        return connection
+
+    def _close(self):
+        pool = getattr(self, '_pooled_from', None)
+        if pool is None or self.connection is None:
+            return super()._close()
+        self._pooled_from = None
+        pool.checkin(self.connection, self.isolation_level)
@@ -0,0 +1,170 @@
+"""Per-route request deadlines enforced as PostgreSQL statement timeouts.
+
+``RequestDeadlineMiddleware`` looks up the deadline of the resolved route in
+``REQUEST_DEADLINES`` (by view name, then URL namespace) and stores it in a
+context variable. Every database connection carries an execute wrapper that
+reads it: the first statement of each transaction runs
+``SET LOCAL statement_timeout`` with the time left, and statements outside a
+transaction share a session timeout set once per request. A query cancelled
+by the server, or one started after the deadline has passed, becomes a 503
+with ``Retry-After`` and is counted against the route.
+"""
+import logging
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import OperationalError, connections
+from django.db.backends.signals import connection_created
+from django.http import JsonResponse
+from django.utils.deprecation import MiddlewareMixin
+
+logger = logging.getLogger(__name__)
+
+# SQLSTATE of a statement cancelled by statement_timeout.
+QUERY_CANCELED = '57014'
+# ``connection.info.transaction_status`` before a transaction has begun.
+TRANSACTION_IDLE = 0
+# Session timeout of a pooled connection left over from its previous user.
+UNKNOWN = object()
+
+
+class DeadlineExceeded(Exception):
+    pass
+
+
+class Deadline:
+
+    def __init__(self, route, seconds):
+        self.route = route
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining_ms(self):
+        return int((self.expires_at - time.monotonic()) * 1000)
+
+
+current_deadline = ContextVar('current_deadline', default=None)
+
+_timeouts = Counter()
+_timeouts_lock = threading.Lock()
+
+
+def record_timeout(route):
+    with _timeouts_lock:
+        _timeouts[route] += 1
+
+
+def timeout_counts():
+    """Requests cut off by their deadline in this process, keyed by route."""
+    with _timeouts_lock:
+        return dict(_timeouts)
+
+
+def deadline_for(match):
+    """Seconds allowed for a resolved route, or None for no limit."""
+    for key in (match.view_name, *match.namespaces):
+        if key in settings.REQUEST_DEADLINES:
+            return settings.REQUEST_DEADLINES[key] or None
+    return settings.REQUEST_DEADLINE_SECONDS or None
+
+
+def route_name(match):
+    return match.view_name or match.route
+
+
+def set_statement_timeout(connection, statement):
+    # Not through the wrapped cursor: a server-side cursor only runs once.
+    with connection.wrap_database_errors:
+        with connection.connection.cursor() as cursor:
+            cursor.execute(statement)
+
+
+def enforce_deadline(execute, sql, params, many, context):
+    """Execute wrapper applying the current deadline to a statement."""
+    connection = context['connection']
+    deadline = current_deadline.get()
+    is_postgres = connection.vendor == 'postgresql'
+
+    if deadline is None:
+        if is_postgres and connection.deadline_session is not None:
+            set_statement_timeout(
+                connection, 'SET statement_timeout TO DEFAULT'
+            )
+            connection.deadline_session = None
+        return execute(sql, params, many, context)
+
+    remaining_ms = deadline.remaining_ms()
+    if remaining_ms <= 0:
+        raise DeadlineExceeded(deadline.route)
+    if not is_postgres:
+        return execute(sql, params, many, context)
+
+    if connection.in_atomic_block:
+        status = connection.connection.info.transaction_status
+        if status == TRANSACTION_IDLE:
+            set_statement_timeout(
+                connection, f'SET LOCAL statement_timeout = {remaining_ms}'
+            )
+    elif connection.deadline_session is not deadline:
+        set_statement_timeout(
+            connection, f'SET statement_timeout = {remaining_ms}'
+        )
+        connection.deadline_session = deadline
+    return execute(sql, params, many, context)
+
+
+def install_deadline_wrapper(sender, connection, **kwargs):
+    # A connection handed out by the pool may still carry the session
+    # timeout of the request that used it last.
+    connection.deadline_session = (
+        UNKNOWN if connection.settings_dict.get('POOL') else None
+    )
+    if enforce_deadline not in connection.execute_wrappers:
+        connection.execute_wrappers.append(enforce_deadline)
+
+
+connection_created.connect(install_deadline_wrapper)
+for _connection in connections.all(initialized_only=True):
+    if _connection.connection is not None:
+        install_deadline_wrapper(None, _connection)
+
+
+def is_timeout(exc):
+    if isinstance(exc, DeadlineExceeded):
+        return True
+    if not isinstance(exc, OperationalError):
+        return False
+    return getattr(exc.__cause__, 'pgcode', None) == QUERY_CANCELED
+
+
+class RequestDeadlineMiddleware(MiddlewareMixin):
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        match = request.resolver_match
+        seconds = deadline_for(match)
+        current_deadline.set(
+            Deadline(route_name(match), seconds) if seconds else None
+        )
+
+    def process_exception(self, request, exception):
+        deadline = current_deadline.get()
+        if deadline is None or not is_timeout(exception):
+            return None
+        record_timeout(deadline.route)
+        logger.warning(
+            'Request to %s exceeded its %ss deadline: %s',
+            deadline.route, deadline.seconds, request.get_full_path()
+        )
+        response = JsonResponse(
+            {'detail': 'The request took too long. Try again later.'},
+            status=503
+        )
+        response['Retry-After'] = settings.REQUEST_DEADLINE_RETRY_AFTER
+        return response
+
+    def process_response(self, request, response):
+        current_deadline.set(None)
+        return response
@@ -0,0 +1,158 @@
+"""Worker memory tracking and on-demand ``tracemalloc`` diffs.
+
+With ``MEMORY_TRACKING_ENABLED`` every request reads the worker's RSS
+before and after it runs. Growth is attributed to the route: it is added
+to ``foodgram_memory_growth_bytes_total`` and logged when a single request
+grows the worker by more than ``MEMORY_GROWTH_LOG_MB``. Current and peak
+RSS are exported as per-worker gauges.
+
+``kill -USR2 <worker pid>`` starts ``tracemalloc`` in that worker; each
+following USR2 writes the allocation sites that grew since the previous
+one to ``MEMORY_REPORT_DIR``. The work is done at the end of the next
+request rather than inside the signal handler.
+"""
+import logging
+import os
+import resource
+import signal
+import sys
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.utils.deprecation import MiddlewareMixin
+
+from foodgram_backend.metrics import MEMORY_GROWTH, WORKER_PEAK_RSS, WORKER_RSS
+
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = os.sysconf('SC_PAGE_SIZE')
+# ru_maxrss is in kilobytes on Linux and in bytes on macOS.
+MAXRSS_UNIT = 1 if sys.platform == 'darwin' else 1024
+TRACE_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+)
+
+
+def peak_rss():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * MAXRSS_UNIT
+
+
+def current_rss():
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * PAGE_SIZE
+    except OSError:
+        return peak_rss()
+
+
+def megabytes(value):
+    return round(value / 1024 ** 2, 2)
+
+
+class TracemallocReports:
+    """Snapshot diffs requested with SIGUSR2."""
+
+    def __init__(self):
+        self.requested = False
+        self.previous = None
+        self.reports = 0
+
+    def request(self, signum, frame):
+        self.requested = True
+
+    def install(self):
+        try:
+            signal.signal(signal.SIGUSR2, self.request)
+        except ValueError:
+            logger.warning(
+                'Memory tracking could not install its SIGUSR2 handler '
+                'outside the main thread.'
+            )
+
+    def snapshot(self):
+        return tracemalloc.take_snapshot().filter_traces(TRACE_FILTERS)
+
+    def run(self, growth_by_route):
+        self.requested = False
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(settings.MEMORY_TRACEMALLOC_FRAMES)
+            self.previous = self.snapshot()
+            logger.warning(
+                'tracemalloc started in worker %s; send SIGUSR2 again to '
+                'record allocation growth.', os.getpid()
+            )
+            return
+        snapshot = self.snapshot()
+        diff = snapshot.compare_to(self.previous, 'lineno')
+        self.previous = snapshot
+        self.reports += 1
+        path = self.write(diff, growth_by_route)
+        logger.warning('Wrote memory growth report %s', path)
+
+    def write(self, diff, growth_by_route):
+        directory = Path(settings.MEMORY_REPORT_DIR)
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / (
+            f'tracemalloc-{os.getpid()}-{self.reports}-'
+            f'{datetime.now():%Y%m%dT%H%M%S}.txt'
+        )
+        lines = [
+            f'Worker {os.getpid()}: RSS {megabytes(current_rss())} MB, '
+            f'peak {megabytes(peak_rss())} MB',
+            '',
+            'Growth by route since start (MB):',
+        ]
+        lines += [
+            f'  {megabytes(growth):>10}  {route}'
+            for route, growth in growth_by_route.most_common(20)
+        ]
+        lines += ['', 'Top allocation sites since the previous report:']
+        lines += [
+            f'  {stat}' for stat in diff[:settings.MEMORY_TRACEMALLOC_TOP]
+        ]
+        path.write_text('\n'.join(lines) + '\n')
+        return path
+
+
+class MemoryTrackingMiddleware(MiddlewareMixin):
+
+    def __init__(self, get_response):
+        if not settings.MEMORY_TRACKING_ENABLED:
+            raise MiddlewareNotUsed
+        self.growth_by_route = Counter()
+        self.reports = TracemallocReports()
+        self.reports.install()
+        super().__init__(get_response)
+
+    def process_request(self, request):
+        request.rss_before = current_rss()
+
+    def process_response(self, request, response):
+        before = getattr(request, 'rss_before', None)
+        if before is None:
+            return response
+        rss, peak = current_rss(), peak_rss()
+        WORKER_RSS.set(rss)
+        WORKER_PEAK_RSS.set(peak)
+        growth = rss - before
+        if growth > 0:
+            match = request.resolver_match
+            route = match.view_name if match else 'unmatched'
+            self.growth_by_route[route] += growth
+            MEMORY_GROWTH.labels(route).inc(growth)
+            if growth >= settings.MEMORY_GROWTH_LOG_MB * 1024 ** 2:
+                logger.warning(
+                    'Request to %s grew worker %s by %s MB '
+                    '(RSS %s MB, peak %s MB)',
+                    route, os.getpid(), megabytes(growth), megabytes(rss),
+                    megabytes(peak)
+                )
+        if self.reports.requested:
+            self.reports.run(self.growth_by_route)
+        return response
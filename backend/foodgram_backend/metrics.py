@@ -0,0 +1,229 @@
+"""Prometheus metrics served at ``/metrics``.
+
+Enabled with ``METRICS_ENABLED``. Under gunicorn every worker writes its
+samples to files in ``PROMETHEUS_MULTIPROC_DIR`` (set by
+``gunicorn.conf.py``) and the endpoint aggregates them, so a scrape sees
+the whole server whichever worker answers it. With metrics disabled the
+names below are no-op stand-ins and nothing touches that directory.
+"""
+import os
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import HttpResponse
+from django.utils.deprecation import MiddlewareMixin
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+METHODS = {'GET', 'HEAD', 'OPTIONS', 'POST', 'PUT', 'PATCH', 'DELETE'}
+
+
+class NullMetric:
+    """Accepts the calls of a metric and records nothing."""
+
+    def labels(self, *args, **kwargs):
+        return self
+
+    def inc(self, amount=1):
+        pass
+
+    def dec(self, amount=1):
+        pass
+
+    def set(self, value):
+        pass
+
+    def observe(self, amount):
+        pass
+
+
+NULL_METRIC = NullMetric()
+
+if settings.METRICS_ENABLED and os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+    # Samples are written there as soon as the first metric is built.
+    os.makedirs(os.environ['PROMETHEUS_MULTIPROC_DIR'], exist_ok=True)
+
+
+def metric(metric_class, *args, **kwargs):
+    """Build a metric, or a ``NullMetric`` when metrics are disabled."""
+    if not settings.METRICS_ENABLED:
+        return NULL_METRIC
+    return metric_class(*args, **kwargs)
+
+
+REQUEST_LATENCY = metric(
+    Histogram,
+    'foodgram_http_request_duration_seconds',
+    'Time spent handling a request.',
+    ['route', 'method', 'status'],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+REQUESTS_IN_FLIGHT = metric(
+    Gauge,
+    'foodgram_http_requests_in_flight',
+    'Requests currently being handled.',
+    multiprocess_mode='livesum',
+)
+DB_QUERIES = metric(
+    Histogram,
+    'foodgram_db_queries_per_request',
+    'Database queries issued while handling a request.',
+    ['route'],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100),
+)
+CACHE_LOOKUPS = metric(
+    Counter,
+    'foodgram_cache_lookups_total',
+    'Cache lookups by cache and result.',
+    ['cache', 'result'],
+)
+IMAGE_UPLOAD_BYTES = metric(
+    Histogram,
+    'foodgram_image_upload_bytes',
+    'Decoded size of Base64 image uploads.',
+    ['field'],
+    buckets=(
+        16 * 1024, 64 * 1024, 256 * 1024, 1024 ** 2, 4 * 1024 ** 2,
+        16 * 1024 ** 2,
+    ),
+)
+WORKER_RSS = metric(
+    Gauge,
+    'foodgram_worker_rss_bytes',
+    'Resident memory of the worker after its latest request.',
+    multiprocess_mode='liveall',
+)
+WORKER_PEAK_RSS = metric(
+    Gauge,
+    'foodgram_worker_peak_rss_bytes',
+    'Peak resident memory of the worker.',
+    multiprocess_mode='liveall',
+)
+MEMORY_GROWTH = metric(
+    Counter,
+    'foodgram_memory_growth_bytes',
+    'Worker RSS growth observed while handling requests, by route.',
+    ['route'],
+)
+DB_POOL_CHECKOUTS = metric(
+    Counter,
+    'foodgram_db_pool_checkouts_total',
+    'Connection requests to the pool by result: reused, created, timeout.',
+    ['alias', 'result'],
+)
+DB_POOL_WAIT = metric(
+    Histogram,
+    'foodgram_db_pool_wait_seconds',
+    'Time spent waiting for a free pool slot.',
+    ['alias'],
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+DB_POOL_DISCARDS = metric(
+    Counter,
+    'foodgram_db_pool_discards_total',
+    'Pooled connections closed instead of being reused.',
+    ['alias'],
+)
+DB_POOL_CONNECTIONS = metric(
+    Gauge,
+    'foodgram_db_pool_connections',
+    'Pooled connections by state (in_use, idle) and the cap (max_size).',
+    ['alias', 'state'],
+    multiprocess_mode='livesum',
+)
+
+query_count = ContextVar('query_count', default=None)
+
+
+def record_cache_lookup(cache, hit, stale=False):
+    """Count a lookup; ``stale`` hits served outdated data."""
+    result = 'miss' if not hit else 'stale' if stale else 'hit'
+    CACHE_LOOKUPS.labels(cache, result).inc()
+
+
+def record_pool_checkout(alias, result, wait_seconds):
+    DB_POOL_CHECKOUTS.labels(alias, result).inc()
+    DB_POOL_WAIT.labels(alias).observe(wait_seconds)
+
+
+def record_pool_discard(alias):
+    DB_POOL_DISCARDS.labels(alias).inc()
+
+
+def record_pool_connections(alias, in_use, idle, max_size):
+    for state, value in (
+        ('in_use', in_use), ('idle', idle), ('max_size', max_size)
+    ):
+        DB_POOL_CONNECTIONS.labels(alias, state).set(value)
+
+
+def count_query(execute, sql, params, many, context):
+    counter = query_count.get()
+    if counter is not None:
+        counter[0] += 1
+    return execute(sql, params, many, context)
+
+
+def install_query_counter(sender, connection, **kwargs):
+    if count_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(count_query)
+
+
+def route_label(request):
+    match = request.resolver_match
+    if match is None:
+        return 'unmatched'
+    return match.view_name or match.route
+
+
+class MetricsMiddleware(MiddlewareMixin):
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        connection_created.connect(install_query_counter)
+        for connection in connections.all(initialized_only=True):
+            install_query_counter(None, connection)
+        super().__init__(get_response)
+
+    def process_request(self, request):
+        REQUESTS_IN_FLIGHT.inc()
+        request.metrics_started = time.perf_counter()
+        query_count.set([0])
+
+    def process_response(self, request, response):
+        started = getattr(request, 'metrics_started', None)
+        if started is None:
+            return response
+        REQUESTS_IN_FLIGHT.dec()
+        route = route_label(request)
+        method = request.method if request.method in METHODS else 'other'
+        REQUEST_LATENCY.labels(route, method, response.status_code).observe(
+            time.perf_counter() - started
+        )
+        DB_QUERIES.labels(route).observe(query_count.get()[0])
+        query_count.set(None)
+        return response
+
+
+def metrics_view(request):
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return HttpResponse(
+        generate_latest(registry), content_type=CONTENT_TYPE_LATEST
+    )
@@ -0,0 +1,167 @@
+"""Opt-in cProfile capture of live requests.
+
+With ``PROFILING_ENABLED`` a request is profiled when it carries a valid
+``X-Profile`` header (see ``manage.py profiles token``), when a staff user
+adds ``?profile=1``, or at random with probability ``PROFILE_SAMPLE_RATE``.
+Results are written as pstats files to ``PROFILE_DIR``, which keeps only
+the newest ``PROFILE_MAX_FILES`` of them; the file name is returned in the
+``X-Profile-Id`` response header.
+
+Under ASGI the profiler sees the event loop thread only, so other requests
+handled concurrently show up in the profile and ``sync_to_async`` work
+does not.
+"""
+import cProfile
+import os
+import random
+import re
+import time
+from datetime import datetime
+from pathlib import Path
+
+from asgiref.sync import (
+    iscoroutinefunction,
+    markcoroutinefunction,
+    sync_to_async,
+)
+from django.conf import settings
+from django.core import signing
+from django.core.exceptions import MiddlewareNotUsed
+
+from rest_framework import exceptions
+
+from api.authentication import CachedTokenAuthentication
+
+HEADER = 'HTTP_X_PROFILE'
+SIGNING_SALT = 'foodgram.profiling'
+UNSAFE_CHARS = re.compile(r'[^A-Za-z0-9-]+')
+
+
+def make_token():
+    """Value of the ``X-Profile`` header accepted by this deployment."""
+    return signing.TimestampSigner(salt=SIGNING_SALT).sign('profile')
+
+
+def has_valid_token(request):
+    value = request.META.get(HEADER)
+    if not value:
+        return False
+    try:
+        signing.TimestampSigner(salt=SIGNING_SALT).unsign(
+            value, max_age=settings.PROFILE_TOKEN_MAX_AGE
+        )
+    except signing.BadSignature:
+        return False
+    return True
+
+
+def is_sampled(request):
+    if has_valid_token(request):
+        return True
+    return random.random() < settings.PROFILE_SAMPLE_RATE
+
+
+def asks_for_profile(request):
+    return request.GET.get('profile') == '1'
+
+
+def is_staff_request(request):
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        try:
+            result = CachedTokenAuthentication().authenticate(request)
+        except exceptions.AuthenticationFailed:
+            return False
+        user = result[0] if result else None
+    return bool(user and user.is_staff)
+
+
+def wants_profile(request):
+    if is_sampled(request):
+        return True
+    return asks_for_profile(request) and is_staff_request(request)
+
+
+def profile_path(request, elapsed):
+    match = request.resolver_match
+    route = match.view_name if match and match.view_name else 'unmatched'
+    name = '_'.join((
+        datetime.now().strftime('%Y%m%dT%H%M%S.%f'),
+        request.method,
+        UNSAFE_CHARS.sub('-', route),
+        f'{round(elapsed * 1000)}ms',
+        f'{os.getpid()}.prof',
+    ))
+    return Path(settings.PROFILE_DIR) / name
+
+
+def list_profiles():
+    """Stored profiles, newest first."""
+    directory = Path(settings.PROFILE_DIR)
+    if not directory.is_dir():
+        return []
+    return sorted(
+        directory.glob('*.prof'),
+        key=lambda path: path.stat().st_mtime,
+        reverse=True
+    )
+
+
+def rotate():
+    for path in list_profiles()[settings.PROFILE_MAX_FILES:]:
+        path.unlink(missing_ok=True)
+
+
+def save(profiler, request, response, elapsed):
+    path = profile_path(request, elapsed)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    profiler.dump_stats(path)
+    rotate()
+    response['X-Profile-Id'] = path.name
+    return response
+
+
+class ProfilingMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.PROFILING_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+        # Only one profiler can be attached to the event loop thread.
+        self.profiling_loop = False
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if not wants_profile(request):
+            return self.get_response(request)
+        profiler = cProfile.Profile()
+        started = time.perf_counter()
+        profiler.enable()
+        try:
+            response = self.get_response(request)
+        finally:
+            profiler.disable()
+        return save(profiler, request, response, time.perf_counter() - started)
+
+    async def __acall__(self, request):
+        profile = is_sampled(request)
+        if not profile and asks_for_profile(request):
+            profile = await sync_to_async(is_staff_request)(request)
+        if not profile or self.profiling_loop:
+            return await self.get_response(request)
+        profiler = cProfile.Profile()
+        started = time.perf_counter()
+        self.profiling_loop = True
+        profiler.enable()
+        try:
+            response = await self.get_response(request)
+        finally:
+            profiler.disable()
+            self.profiling_loop = False
+        return save(profiler, request, response, time.perf_counter() - started)
@@ -0,0 +1,118 @@
+"""Send safe-method reads to replicas and everything else to the primary.
+
+``ReplicaRoutingMiddleware`` picks the database for the whole request and
+stores it in a context variable, so queries issued from sync views, async
+views and ``sync_to_async`` threads all agree. Outside of a request (shell,
+management commands, signals fired by them) reads stay on the primary.
+"""
+import hashlib
+import random
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.decorators import sync_and_async_middleware
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+PIN_COOKIE = 'db_pin'
+
+read_alias = ContextVar('read_alias', default=None)
+
+
+def replica_aliases():
+    return [alias for alias in settings.DATABASES if alias != DEFAULT_DB_ALIAS]
+
+
+class PrimaryReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        return read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+def _pin_key(request):
+    authorization = request.META.get('HTTP_AUTHORIZATION')
+    if not authorization:
+        return None
+    digest = hashlib.sha256(authorization.encode()).hexdigest()
+    return f'db-pin:{digest}'
+
+
+def is_pinned(request):
+    """True if the client wrote recently and must read from the primary."""
+    if request.get_signed_cookie(
+        PIN_COOKIE, default=None, salt=PIN_COOKIE,
+        max_age=settings.DB_REPLICA_STICKY_SECONDS
+    ):
+        return True
+    key = _pin_key(request)
+    return bool(key and cache.get(key))
+
+
+def pin(request, response):
+    """Remember a write in a signed cookie and, for token clients, the cache.
+
+    The cookie's age is checked through its signature, so every worker
+    honours it. The cache entry covers clients that drop cookies, and only
+    reaches every worker with a shared cache (``REDIS_URL``).
+    """
+    window = settings.DB_REPLICA_STICKY_SECONDS
+    response.set_signed_cookie(
+        PIN_COOKIE,
+        '1',
+        salt=PIN_COOKIE,
+        max_age=window,
+        httponly=True,
+        samesite='Lax'
+    )
+    key = _pin_key(request)
+    if key:
+        cache.set(key, 1, window)
+
+
+def choose_read_alias(request):
+    replicas = replica_aliases()
+    if not replicas or request.method not in SAFE_METHODS:
+        return None
+    if is_pinned(request):
+        return None
+    return random.choice(replicas)
+
+
+def finish(request, response):
+    if request.method in SAFE_METHODS or response.status_code >= 400:
+        return response
+    if replica_aliases():
+        pin(request, response)
+    return response
+
+
+@sync_and_async_middleware
+def ReplicaRoutingMiddleware(get_response):
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            token = read_alias.set(choose_read_alias(request))
+            try:
+                response = await get_response(request)
+            finally:
+                read_alias.reset(token)
+            return finish(request, response)
+    else:
+        def middleware(request):
+            token = read_alias.set(choose_read_alias(request))
+            try:
+                response = get_response(request)
+            finally:
+                read_alias.reset(token)
+            return finish(request, response)
+    return middleware
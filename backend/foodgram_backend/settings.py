@@ -49,15 +49,20 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'foodgram_backend.metrics.MetricsMiddleware',
+    'foodgram_backend.memory.MemoryTrackingMiddleware',
+    'foodgram_backend.timing.RequestTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'foodgram_backend.routers.ReplicaRoutingMiddleware',
+    'foodgram_backend.deadlines.RequestDeadlineMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
+    'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'foodgram_backend.profiling.ProfilingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    'corsheaders.middleware.CorsMiddleware',
-    'django.middleware.common.CommonMiddleware',
 ]
 
 ROOT_URLCONF = 'foodgram_backend.urls'
@@ -80,17 +85,117 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'foodgram_backend.wsgi.application'
 
+ASGI_APPLICATION = 'foodgram_backend.asgi.application'
+
+ASYNC_VIEWS = os.getenv('ASYNC_VIEWS', 'False').lower() == 'true'
+
+# DB_POOL_SIZE > 0 hands connections back to a per-process pool at the end
+# of each request. Otherwise connections persist for DB_CONN_MAX_AGE seconds,
+# one per thread that used them: keep it at 0 under ASGI, where every
+# sync_to_async thread would hold its own.
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 0))
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
+        'ENGINE': (
+            'foodgram_backend.db' if DB_POOL_SIZE
+            else 'django.db.backends.postgresql'
+        ),
         'NAME': os.getenv('POSTGRES_DB', 'foodgram'),
         'USER': os.getenv('POSTGRES_USER', 'foodgram_user'),
         'PASSWORD': os.getenv('POSTGRES_PASSWORD', ''),
         'HOST': os.getenv('DB_HOST', ''),
         'PORT': os.getenv('DB_PORT', 5432),
+        'CONN_MAX_AGE': (
+            0 if DB_POOL_SIZE else int(os.getenv('DB_CONN_MAX_AGE', 0))
+        ),
+        'CONN_HEALTH_CHECKS': True,
+        'POOL': {
+            'MAX_SIZE': DB_POOL_SIZE,
+            'TIMEOUT': float(os.getenv('DB_POOL_TIMEOUT', 5)),
+            'MAX_IDLE': int(os.getenv('DB_POOL_MAX_IDLE', 300)),
+        } if DB_POOL_SIZE else None,
     }
 }
 
+# Read replicas share the primary's credentials; safe-method requests read
+# from them unless the client wrote within DB_REPLICA_STICKY_SECONDS.
+for index, replica_host in enumerate(
+    filter(None, os.getenv('DB_REPLICA_HOSTS', '').split(',')), start=1
+):
+    DATABASES[f'replica_{index}'] = dict(
+        DATABASES['default'],
+        HOST=replica_host,
+        TEST={'MIRROR': 'default'},
+    )
+
+# DB_SIMULATE_REPLICA=true replaces the databases above with two local SQLite
+# files, a primary and a replica that ``manage.py simulate_replication``
+# keeps a few seconds behind it, to try the routing without PostgreSQL.
+if os.getenv('DB_SIMULATE_REPLICA', 'False').lower() == 'true':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'db.sqlite3',
+        },
+        'replica_1': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'db-replica.sqlite3',
+            'TEST': {'MIRROR': 'default'},
+        },
+    }
+
+DATABASE_ROUTERS = ['foodgram_backend.routers.PrimaryReplicaRouter']
+
+DB_REPLICA_STICKY_SECONDS = int(os.getenv('DB_REPLICA_STICKY_SECONDS', 5))
+
+# Seconds a request may spend before its queries are cancelled with a 503.
+# REQUEST_DEADLINES is keyed by URL name or namespace; 0 means no deadline.
+REQUEST_DEADLINE_SECONDS = float(os.getenv('REQUEST_DEADLINE_SECONDS', 10))
+REQUEST_DEADLINE_LIST_SECONDS = float(
+    os.getenv('REQUEST_DEADLINE_LIST_SECONDS', 3)
+)
+REQUEST_DEADLINES = {
+    'recipes-list': REQUEST_DEADLINE_LIST_SECONDS,
+    'users-list': REQUEST_DEADLINE_LIST_SECONDS,
+    'users-subscriptions': REQUEST_DEADLINE_LIST_SECONDS,
+    'ingredients-list': REQUEST_DEADLINE_LIST_SECONDS,
+    'recipes-download-shopping-cart': float(
+        os.getenv('REQUEST_DEADLINE_EXPORT_SECONDS', 30)
+    ),
+    'admin': float(os.getenv('REQUEST_DEADLINE_ADMIN_SECONDS', 15)),
+}
+REQUEST_DEADLINE_RETRY_AFTER = int(
+    os.getenv('REQUEST_DEADLINE_RETRY_AFTER', 5)
+)
+
+# Server-Timing headers and the slow-request log (0 disables a threshold).
+SERVER_TIMING_ENABLED = (
+    os.getenv('SERVER_TIMING_ENABLED', 'False').lower() == 'true'
+)
+SLOW_REQUEST_MS = int(os.getenv('SLOW_REQUEST_MS', 0))
+SLOW_REQUEST_QUERIES = int(os.getenv('SLOW_REQUEST_QUERIES', 0))
+SLOW_REQUEST_TOP_QUERIES = int(os.getenv('SLOW_REQUEST_TOP_QUERIES', 5))
+
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'False').lower() == 'true'
+
+# Requests are profiled on a signed X-Profile header, on ?profile=1 from
+# staff, or at random with PROFILE_SAMPLE_RATE (0..1).
+PROFILING_ENABLED = os.getenv('PROFILING_ENABLED', 'False').lower() == 'true'
+PROFILE_SAMPLE_RATE = float(os.getenv('PROFILE_SAMPLE_RATE', 0))
+PROFILE_DIR = os.getenv('PROFILE_DIR', '/tmp/foodgram-profiles')
+PROFILE_MAX_FILES = int(os.getenv('PROFILE_MAX_FILES', 100))
+PROFILE_TOKEN_MAX_AGE = int(os.getenv('PROFILE_TOKEN_MAX_AGE', 3600))
+
+# Per-request RSS tracking; SIGUSR2 to a worker asks for tracemalloc reports.
+MEMORY_TRACKING_ENABLED = (
+    os.getenv('MEMORY_TRACKING_ENABLED', 'False').lower() == 'true'
+)
+MEMORY_GROWTH_LOG_MB = float(os.getenv('MEMORY_GROWTH_LOG_MB', 10))
+MEMORY_REPORT_DIR = os.getenv('MEMORY_REPORT_DIR', '/tmp/foodgram-memory')
+MEMORY_TRACEMALLOC_FRAMES = int(os.getenv('MEMORY_TRACEMALLOC_FRAMES', 1))
+MEMORY_TRACEMALLOC_TOP = int(os.getenv('MEMORY_TRACEMALLOC_TOP', 25))
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -114,11 +219,20 @@ STATIC_ROOT = BASE_DIR / 'collected_static'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'api.authentication.CachedTokenAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'api.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
     'DEFAULT_PAGINATION_CLASS': 'api.pagination.PageToLimitOffsetPagination',
     'PAGE_SIZE': 6,
     'DEFAULT_FILTER_BACKENDS': ['django_filters.rest_framework.DjangoFilterBackend'],
@@ -126,6 +240,53 @@ REST_FRAMEWORK = {
 
 DEFAULT_PAGINATION_LIMIT = 10
 
+# A cache shared by every worker. Without REDIS_URL each process keeps its
+# own, so invalidations only reach the process that made them.
+REDIS_URL = os.getenv('REDIS_URL', '')
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': REDIS_URL,
+    } if REDIS_URL else {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+# A local token cache learns about revoked tokens of other workers only
+# when its entries expire, hence the short default TTL.
+TOKEN_AUTH_CACHE_BACKEND = os.getenv(
+    'TOKEN_AUTH_CACHE_BACKEND', 'shared' if REDIS_URL else 'local'
+)
+TOKEN_AUTH_CACHE_TTL = int(os.getenv(
+    'TOKEN_AUTH_CACHE_TTL', 60 if TOKEN_AUTH_CACHE_BACKEND == 'shared' else 5
+))
+TOKEN_AUTH_CACHE_SIZE = int(os.getenv('TOKEN_AUTH_CACHE_SIZE', 10000))
+
+SHORT_LINK_INDEX_TTL = int(os.getenv('SHORT_LINK_INDEX_TTL', 300))
+SHORT_LINK_CACHE_SECONDS = int(os.getenv('SHORT_LINK_CACHE_SECONDS', 3600))
+
+PANTRY_INDEX_TTL = int(os.getenv('PANTRY_INDEX_TTL', 900))
+PANTRY_MAX_INGREDIENTS = int(os.getenv('PANTRY_MAX_INGREDIENTS', 100))
+
+RECIPE_FACETS_CACHE_TTL = int(os.getenv('RECIPE_FACETS_CACHE_TTL', 60))
+
+RECIPE_LIST_FAST_PATH = (
+    os.getenv('RECIPE_LIST_FAST_PATH', 'True').lower() == 'true'
+)
+
+RECIPE_FEED_CACHE_TTL = int(os.getenv('RECIPE_FEED_CACHE_TTL', 30))
+RECIPE_FEED_CACHE_STALE_TTL = int(os.getenv('RECIPE_FEED_CACHE_STALE_TTL', 300))
+
+RECIPE_STATUS_MAX_IDS = int(os.getenv('RECIPE_STATUS_MAX_IDS', 500))
+
+MULTI_GET_MAX_IDS = int(os.getenv('MULTI_GET_MAX_IDS', 100))
+
+EVENTS_MAX_CONNECTIONS = int(os.getenv('EVENTS_MAX_CONNECTIONS', 1000))
+EVENTS_QUEUE_SIZE = int(os.getenv('EVENTS_QUEUE_SIZE', 100))
+EVENTS_HEARTBEAT_SECONDS = int(os.getenv('EVENTS_HEARTBEAT_SECONDS', 15))
+EVENTS_MAX_STREAM_SECONDS = int(os.getenv('EVENTS_MAX_STREAM_SECONDS', 3600))
+EVENTS_TICKET_TTL = int(os.getenv('EVENTS_TICKET_TTL', 30))
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=10),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
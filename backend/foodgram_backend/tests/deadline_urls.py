@@ -0,0 +1,41 @@
+"""URLconf of views that outlive their request deadline."""
+import time
+
+from django.db import connection, transaction
+from django.http import HttpResponse
+from django.urls import path
+
+
+def slow_query(request):
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT pg_sleep(1)')
+    return HttpResponse()
+
+
+@transaction.atomic
+def slow_transaction(request):
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT 1')
+        cursor.execute('SELECT pg_sleep(1)')
+    return HttpResponse()
+
+
+def late_query(request):
+    time.sleep(0.2)
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT 1')
+    return HttpResponse()
+
+
+def quick_query(request):
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT 1')
+    return HttpResponse()
+
+
+urlpatterns = [
+    path('slow/', slow_query, name='slow-query'),
+    path('slow-transaction/', slow_transaction, name='slow-transaction'),
+    path('late/', late_query, name='late-query'),
+    path('quick/', quick_query, name='quick-query'),
+]
@@ -0,0 +1,148 @@
+import threading
+import time
+import unittest
+from unittest import mock
+
+import psycopg2
+from django.db import connection
+from django.test import SimpleTestCase
+
+from foodgram_backend.db import base
+from foodgram_backend.db.base import ConnectionPool
+
+
+@unittest.skipUnless(
+    connection.vendor == 'postgresql', 'The pool wraps psycopg2.'
+)
+class ConnectionPoolTests(SimpleTestCase):
+
+    def pool(self, max_size=2, timeout=5, max_idle=300):
+        pool = ConnectionPool(max_size, timeout, max_idle, alias='test')
+        self.addCleanup(self.close_idle, pool)
+        return pool
+
+    def close_idle(self, pool):
+        for idle, _, _ in pool._idle:
+            idle.close()
+
+    def connect(self):
+        opened = psycopg2.connect(**connection.get_connection_params())
+        self.addCleanup(opened.close)
+        return opened, 'state'
+
+    def backend_pid(self, conn):
+        with conn.cursor() as cursor:
+            cursor.execute('SELECT pg_backend_pid()')
+            return cursor.fetchone()[0]
+
+    def test_idle_connection_is_reused(self):
+        pool = self.pool()
+        conn, state = pool.checkout(self.connect)
+        pool.checkin(conn, state)
+
+        self.assertEqual(pool.checkout(self.connect), (conn, 'state'))
+        self.assertEqual(pool.stats()['created'], 1)
+        self.assertEqual(pool.stats()['reused'], 1)
+
+    def test_checkin_rolls_back_open_transaction(self):
+        pool = self.pool()
+        conn, state = pool.checkout(self.connect)
+        with conn.cursor() as cursor:
+            cursor.execute('CREATE TEMPORARY TABLE unfinished (id int)')
+
+        pool.checkin(conn, state)
+
+        self.assertEqual(
+            conn.get_transaction_status(),
+            psycopg2.extensions.TRANSACTION_STATUS_IDLE
+        )
+        reused, _ = pool.checkout(self.connect)
+        self.assertIs(reused, conn)
+        with reused.cursor() as cursor:
+            cursor.execute("SELECT to_regclass('pg_temp.unfinished')")
+            self.assertIsNone(cursor.fetchone()[0])
+
+    def test_checkin_rolls_back_failed_transaction(self):
+        pool = self.pool()
+        conn, state = pool.checkout(self.connect)
+        with self.assertRaises(psycopg2.Error):
+            with conn.cursor() as cursor:
+                cursor.execute('SELECT * FROM missing_table')
+
+        pool.checkin(conn, state)
+
+        self.assertIs(pool.checkout(self.connect)[0], conn)
+        self.assertEqual(pool.stats()['discarded'], 0)
+
+    def test_broken_connection_fails_health_check_and_is_replaced(self):
+        pool = self.pool()
+        conn, state = pool.checkout(self.connect)
+        pid = self.backend_pid(conn)
+        conn.rollback()
+        pool.checkin(conn, state)
+        killer, _ = self.connect()
+        with killer.cursor() as cursor:
+            cursor.execute('SELECT pg_terminate_backend(%s)', [pid])
+        self.assertFalse(conn.closed)
+
+        with mock.patch.object(base, 'HEALTH_CHECK_AFTER', 0):
+            replacement, _ = pool.checkout(self.connect)
+
+        self.assertIsNot(replacement, conn)
+        self.assertNotEqual(self.backend_pid(replacement), pid)
+        self.assertTrue(conn.closed)
+        self.assertEqual(pool.stats()['discarded'], 1)
+        self.assertEqual(pool.stats()['created'], 2)
+
+    def test_expired_idle_connection_is_replaced(self):
+        pool = self.pool(max_idle=0)
+        conn, state = pool.checkout(self.connect)
+        pool.checkin(conn, state)
+
+        self.assertIsNot(pool.checkout(self.connect)[0], conn)
+        self.assertTrue(conn.closed)
+        self.assertEqual(pool.stats()['discarded'], 1)
+
+    def test_checkout_times_out_at_max_size(self):
+        pool = self.pool(max_size=2, timeout=0.1)
+        pool.checkout(self.connect)
+        pool.checkout(self.connect)
+
+        started = time.monotonic()
+        with self.assertRaises(psycopg2.OperationalError), self.assertLogs(
+            'foodgram_backend.db.base', 'WARNING'
+        ):
+            pool.checkout(self.connect)
+
+        self.assertGreaterEqual(time.monotonic() - started, 0.1)
+        self.assertEqual(pool.stats()['timeouts'], 1)
+        self.assertEqual(pool.stats()['created'], 2)
+        self.assertEqual(pool.stats()['in_use'], 2)
+
+    def test_checkout_waits_for_checkin_at_max_size(self):
+        pool = self.pool(max_size=1)
+        conn, state = pool.checkout(self.connect)
+        checked_out = []
+        waiter = threading.Thread(
+            target=lambda: checked_out.append(pool.checkout(self.connect))
+        )
+
+        waiter.start()
+        waiter.join(0.2)
+        self.assertTrue(waiter.is_alive())
+        pool.checkin(conn, state)
+        waiter.join(5)
+
+        self.assertEqual(checked_out, [(conn, 'state')])
+        self.assertEqual(pool.stats()['created'], 1)
+
+    def test_failed_connect_frees_its_slot(self):
+        pool = self.pool(max_size=1, timeout=0.1)
+
+        def refuse():
+            raise psycopg2.OperationalError('refused')
+
+        with self.assertRaises(psycopg2.OperationalError):
+            pool.checkout(refuse)
+
+        self.assertEqual(pool.checkout(self.connect)[1], 'state')
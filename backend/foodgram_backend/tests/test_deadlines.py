@@ -0,0 +1,74 @@
+import unittest
+
+from django.db import connection
+from django.test import TransactionTestCase, override_settings
+
+from foodgram_backend.deadlines import timeout_counts
+
+requires_postgres = unittest.skipUnless(
+    connection.vendor == 'postgresql', 'Deadlines use statement_timeout.'
+)
+
+
+@override_settings(
+    ROOT_URLCONF='foodgram_backend.tests.deadline_urls',
+    REQUEST_DEADLINE_SECONDS=10,
+    REQUEST_DEADLINES={
+        'slow-query': 0.1, 'slow-transaction': 0.1, 'late-query': 0.1,
+    },
+    REQUEST_DEADLINE_RETRY_AFTER=7,
+)
+class RequestDeadlineTests(TransactionTestCase):
+    # Outside of a TestCase transaction, so that requests use the
+    # session timeout like they do in production.
+
+    def assertTimedOut(self, path, route):
+        before = timeout_counts().get(route, 0)
+
+        with self.assertLogs('foodgram_backend.deadlines', 'WARNING'):
+            response = self.client.get(path)
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '7')
+        self.assertEqual(timeout_counts().get(route, 0), before + 1)
+
+    def session_timeout(self):
+        # Not through Django's cursor, which would reset the timeout.
+        with connection.connection.cursor() as cursor:
+            cursor.execute('SHOW statement_timeout')
+            return cursor.fetchone()[0]
+
+    @requires_postgres
+    def test_cancelled_statement_returns_503(self):
+        self.assertTimedOut('/slow/', 'slow-query')
+
+    @requires_postgres
+    def test_cancelled_statement_in_transaction_returns_503(self):
+        self.assertTimedOut('/slow-transaction/', 'slow-transaction')
+
+    def test_statement_after_deadline_returns_503(self):
+        self.assertTimedOut('/late/', 'late-query')
+
+    def test_other_routes_are_not_counted(self):
+        before = timeout_counts()
+
+        response = self.client.get('/quick/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(timeout_counts(), before)
+
+    @requires_postgres
+    def test_session_timeout_is_reset_after_request(self):
+        self.assertEqual(self.client.get('/quick/').status_code, 200)
+        self.assertNotEqual(self.session_timeout(), '0')
+
+        with connection.cursor() as cursor:
+            cursor.execute('SHOW statement_timeout')
+            self.assertEqual(cursor.fetchone()[0], '0')
+        self.assertEqual(self.session_timeout(), '0')
+
+    @requires_postgres
+    def test_transaction_timeout_ends_with_transaction(self):
+        self.assertTimedOut('/slow-transaction/', 'slow-transaction')
+
+        self.assertEqual(self.session_timeout(), '0')
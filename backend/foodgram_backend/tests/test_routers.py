@@ -0,0 +1,126 @@
+import time
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import router
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from foodgram_backend import routers
+from foodgram_backend.routers import PIN_COOKIE, ReplicaRoutingMiddleware
+from recipes.models import Recipe
+
+
+def read_database(request):
+    """View answering with the database a read would use."""
+    return HttpResponse(router.db_for_read(Recipe))
+
+
+@override_settings(DB_REPLICA_STICKY_SECONDS=5)
+class ReplicaRoutingTests(SimpleTestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+        patcher = mock.patch.object(
+            routers, 'replica_aliases', return_value=['replica']
+        )
+        self.replicas = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def request(self, method='get', status=200, cookies=None, **extra):
+        request = getattr(self.factory, method)('/api/recipes/', **extra)
+        request.COOKIES.update(cookies or {})
+
+        def view(request):
+            response = read_database(request)
+            response.status_code = status
+            return response
+
+        return ReplicaRoutingMiddleware(view)(request)
+
+    def read_from(self, **kwargs):
+        return self.request(**kwargs).content.decode()
+
+    def pin_cookie(self, **kwargs):
+        response = self.request(method='post', **kwargs)
+        return {PIN_COOKIE: response.cookies[PIN_COOKIE].value}
+
+    def test_safe_methods_read_from_replica(self):
+        for method in ('get', 'head', 'options'):
+            with self.subTest(method=method):
+                response = self.request(method=method)
+                self.assertNotIn(PIN_COOKIE, response.cookies)
+                if method != 'head':
+                    self.assertEqual(response.content, b'replica')
+
+    def test_writes_use_primary(self):
+        for method in ('post', 'put', 'patch', 'delete'):
+            with self.subTest(method=method):
+                self.assertEqual(self.read_from(method=method), 'default')
+
+    def test_reads_use_primary_outside_requests(self):
+        self.assertEqual(router.db_for_read(Recipe), 'default')
+
+    def test_write_sets_signed_pin_cookie(self):
+        response = self.request(method='post')
+
+        cookie = response.cookies[PIN_COOKIE]
+        self.assertNotEqual(cookie.value, '1')
+        self.assertEqual(cookie['max-age'], 5)
+        self.assertTrue(cookie['httponly'])
+        self.assertEqual(cookie['samesite'], 'Lax')
+
+    def test_failed_write_does_not_pin(self):
+        response = self.request(method='post', status=400)
+
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+
+    def test_pinned_client_reads_from_primary(self):
+        cookies = self.pin_cookie()
+
+        self.assertEqual(self.read_from(cookies=cookies), 'default')
+
+    def test_tampered_pin_is_ignored(self):
+        value = self.pin_cookie()[PIN_COOKIE]
+        for tampered in ('1', 'x' + value, value[:-2]):
+            with self.subTest(cookie=tampered):
+                self.assertEqual(
+                    self.read_from(cookies={PIN_COOKIE: tampered}),
+                    'replica'
+                )
+
+    def test_pin_expires(self):
+        cookies = self.pin_cookie()
+        later = time.time() + 6
+
+        with mock.patch('django.core.signing.time.time', return_value=later):
+            self.assertEqual(self.read_from(cookies=cookies), 'replica')
+
+    def test_token_client_is_pinned_without_cookies(self):
+        self.request(method='post', HTTP_AUTHORIZATION='Token first')
+
+        self.assertEqual(
+            self.read_from(HTTP_AUTHORIZATION='Token first'), 'default'
+        )
+        self.assertEqual(
+            self.read_from(HTTP_AUTHORIZATION='Token second'), 'replica'
+        )
+
+    def test_without_replicas_nothing_is_pinned(self):
+        self.replicas.return_value = []
+
+        self.assertEqual(self.read_from(), 'default')
+        self.assertNotIn(
+            PIN_COOKIE, self.request(method='post').cookies
+        )
+
+    async def test_async_requests_are_routed(self):
+        async def view(request):
+            return read_database(request)
+
+        response = await ReplicaRoutingMiddleware(view)(
+            self.factory.get('/api/recipes/')
+        )
+
+        self.assertEqual(response.content, b'replica')
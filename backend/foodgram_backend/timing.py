@@ -0,0 +1,200 @@
+"""Per-request database, serializer and render timings.
+
+``RequestTimingMiddleware`` is removed from the stack at start-up unless
+``SERVER_TIMING_ENABLED`` is set or a ``SLOW_REQUEST_*`` threshold is
+positive, so it costs nothing when switched off. When active it records,
+for every request:
+
+* ``db``: number of queries and time spent executing them;
+* ``serialize``: time spent producing the top-level ``serializer.data``
+  (lazy querysets evaluated there are included);
+* ``render``: time spent rendering the DRF response;
+* ``app``: total time spent below this middleware.
+
+The numbers are sent as a ``Server-Timing`` header, and requests over the
+slow thresholds are logged as JSON with their most expensive SQL.
+"""
+import json
+import logging
+import re
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.utils.deprecation import MiddlewareMixin
+
+from rest_framework import serializers
+
+logger = logging.getLogger(__name__)
+
+current_timing = ContextVar('current_timing', default=None)
+
+PLACEHOLDER_LIST = re.compile(r'\((?:\s*%s\s*,)+\s*%s\s*\)')
+LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+\b")
+WHITESPACE = re.compile(r'\s+')
+
+
+def fingerprint(sql):
+    """Collapse literals and ``IN`` lists so similar queries group together."""
+    sql = PLACEHOLDER_LIST.sub('(...)', sql)
+    sql = LITERALS.sub('?', sql)
+    return WHITESPACE.sub(' ', sql).strip()
+
+
+class RequestTiming:
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db = 0.0
+        self.serialize = 0.0
+        self.render = 0.0
+        self.serializer_depth = 0
+        self.render_started = None
+        self.statements = {}
+
+    def add_query(self, sql, duration):
+        self.queries += 1
+        self.db += duration
+        entry = self.statements.get(sql)
+        if entry is None:
+            self.statements[sql] = [1, duration]
+        else:
+            entry[0] += 1
+            entry[1] += duration
+
+    def top_statements(self, limit):
+        grouped = {}
+        for sql, (count, duration) in self.statements.items():
+            entry = grouped.setdefault(fingerprint(sql), [0, 0.0])
+            entry[0] += count
+            entry[1] += duration
+        ranked = sorted(grouped.items(), key=lambda item: -item[1][1])
+        return [
+            {'sql': sql, 'count': count, 'ms': round(duration * 1000, 2)}
+            for sql, (count, duration) in ranked[:limit]
+        ]
+
+
+def record_query(execute, sql, params, many, context):
+    timing = current_timing.get()
+    if timing is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timing.add_query(sql, time.perf_counter() - started)
+
+
+def install_query_recorder(sender, connection, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+def timed_data(data_property):
+    """Wrap ``BaseSerializer.data`` to time top-level serialization."""
+    def data(self):
+        timing = current_timing.get()
+        if timing is None:
+            return data_property.fget(self)
+        timing.serializer_depth += 1
+        started = time.perf_counter()
+        try:
+            return data_property.fget(self)
+        finally:
+            timing.serializer_depth -= 1
+            if not timing.serializer_depth:
+                timing.serialize += time.perf_counter() - started
+
+    data.timed = True
+    return property(data)
+
+
+def instrument():
+    connection_created.connect(install_query_recorder)
+    for connection in connections.all(initialized_only=True):
+        install_query_recorder(None, connection)
+    data = serializers.BaseSerializer.data
+    if not getattr(data.fget, 'timed', False):
+        serializers.BaseSerializer.data = timed_data(data)
+
+
+def milliseconds(seconds):
+    return round(seconds * 1000, 2)
+
+
+class RequestTimingMiddleware(MiddlewareMixin):
+
+    def __init__(self, get_response):
+        if not any((
+            settings.SERVER_TIMING_ENABLED,
+            settings.SLOW_REQUEST_MS,
+            settings.SLOW_REQUEST_QUERIES,
+        )):
+            raise MiddlewareNotUsed
+        instrument()
+        super().__init__(get_response)
+
+    def process_request(self, request):
+        current_timing.set(RequestTiming())
+
+    def process_template_response(self, request, response):
+        timing = current_timing.get()
+        if timing is not None:
+            timing.render_started = time.perf_counter()
+            response.add_post_render_callback(
+                lambda rendered: self.finish_render(timing)
+            )
+        return response
+
+    @staticmethod
+    def finish_render(timing):
+        timing.render += time.perf_counter() - timing.render_started
+
+    def process_response(self, request, response):
+        timing = current_timing.get()
+        if timing is None:
+            return response
+        current_timing.set(None)
+        total = time.perf_counter() - timing.started
+        if settings.SERVER_TIMING_ENABLED:
+            response['Server-Timing'] = (
+                f'db;dur={milliseconds(timing.db)};'
+                f'desc="{timing.queries} queries", '
+                f'serialize;dur={milliseconds(timing.serialize)}, '
+                f'render;dur={milliseconds(timing.render)}, '
+                f'app;dur={milliseconds(total)}'
+            )
+        if self.is_slow(total, timing):
+            self.log_slow_request(request, response, total, timing)
+        return response
+
+    @staticmethod
+    def is_slow(total, timing):
+        max_ms = settings.SLOW_REQUEST_MS
+        if max_ms and total * 1000 >= max_ms:
+            return True
+        max_queries = settings.SLOW_REQUEST_QUERIES
+        return bool(max_queries) and timing.queries >= max_queries
+
+    @staticmethod
+    def log_slow_request(request, response, total, timing):
+        match = request.resolver_match
+        logger.warning('Slow request %s', json.dumps({
+            'method': request.method,
+            'path': request.get_full_path(),
+            'route': match.view_name if match else None,
+            'status': response.status_code,
+            'ms': milliseconds(total),
+            'db_ms': milliseconds(timing.db),
+            'queries': timing.queries,
+            'serialize_ms': milliseconds(timing.serialize),
+            'render_ms': milliseconds(timing.render),
+            'top_queries': timing.top_statements(
+                settings.SLOW_REQUEST_TOP_QUERIES
+            ),
+        }, ensure_ascii=False))
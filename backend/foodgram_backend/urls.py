@@ -10,7 +10,7 @@ urlpatterns = [
     path('api/', include('api.urls')),
     path('admin/', admin.site.urls),
     re_path(
-        r'^s/(?P<pk>\d+)/$',
+        r'^s/(?P<code>[0-9A-Za-z]+)/$',
         ShortLinkRedirectView.as_view(),
         name='short-link-redirect'
     ),
@@ -21,6 +21,20 @@ urlpatterns = [
     ),
 ]
 
+if settings.METRICS_ENABLED:
+    from foodgram_backend.metrics import metrics_view
+
+    urlpatterns.append(path('metrics', metrics_view, name='metrics'))
+
+if settings.ASYNC_VIEWS:
+    from api.recipes.async_views import short_link_redirect
+
+    urlpatterns.insert(0, re_path(
+        r'^s/(?P<code>[0-9A-Za-z]+)/$',
+        short_link_redirect,
+        name='short-link-redirect'
+    ))
+
 if settings.DEBUG:
     urlpatterns += static(
         settings.MEDIA_URL, document_root=settings.MEDIA_ROOT
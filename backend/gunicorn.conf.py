@@ -0,0 +1,32 @@
+import os
+import shutil
+
+# SERVER_MODE=asgi runs uvicorn workers with the async read views enabled.
+SERVER_MODE = os.getenv('SERVER_MODE', 'wsgi').lower()
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.getenv('GUNICORN_WORKERS', 1))
+
+if SERVER_MODE == 'asgi':
+    worker_class = 'uvicorn.workers.UvicornWorker'
+    wsgi_app = 'foodgram_backend.asgi:application'
+else:
+    wsgi_app = 'foodgram_backend.wsgi:application'
+
+# Workers share their metrics through files so /metrics covers all of them.
+if os.getenv('METRICS_ENABLED', 'False').lower() == 'true':
+    os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', '/tmp/foodgram-metrics')
+
+
+def on_starting(server):
+    path = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+    if path:
+        shutil.rmtree(path, ignore_errors=True)
+        os.makedirs(path)
+
+
+def child_exit(server, worker):
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
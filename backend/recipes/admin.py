@@ -1,9 +1,11 @@
 from django.contrib import admin
-from django.db.models import Count
+from django.db import connections
+from django.db.models import Count, Q
 from admin_auto_filters.filters import AutocompleteFilter
 
 from .models import (Favorite, Ingredient, Recipe, RecipeIngredient,
                      ShoppingCart, Tag)
+from .search import matching
 
 
 class AuthorFilter(AutocompleteFilter):
@@ -35,7 +37,7 @@ class RecipeAdmin(admin.ModelAdmin):
         'created_at',
         'updated_at'
     )
-    search_fields = ('name', 'author__username', 'author__email')
+    search_fields = ('author__username', 'author__email')
     list_filter = (TagFilter, AuthorFilter)
     inlines = [RecipeIngredientInline]
 
@@ -50,6 +52,18 @@ class RecipeAdmin(admin.ModelAdmin):
             'favorited_by')
         )
 
+    def get_search_results(self, request, queryset, search_term):
+        """Full-text search on name and text, partial match on the author."""
+        if not search_term.split():
+            return queryset, False
+        by_text = matching(connections[queryset.db].vendor, search_term)
+        by_author, _ = super().get_search_results(
+            request, self.model.objects.all(), search_term
+        )
+        return queryset.filter(
+            by_text | Q(pk__in=by_author.values('pk'))
+        ), False
+
     def get_favorites_count(self, obj):
         """Display the number of times the recipe was added to favorites."""
         return getattr(obj, 'favorites_count', 0)
@@ -0,0 +1,8 @@
+from django.db import models
+
+
+class RecipeManager(models.Manager):
+    """Leaves the search vector out of ordinary recipe queries."""
+
+    def get_queryset(self):
+        return super().get_queryset().defer('search_vector')
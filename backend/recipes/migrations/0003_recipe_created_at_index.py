@@ -0,0 +1,17 @@
+# Generated by Django 5.1.4 on 2026-10-19 09:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(fields=['-created_at'], name='recipe_created_at_idx'),
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.1.4 on 2026-10-19 10:04
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0004_recipe_search_vector'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SimilarRecipe',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField(verbose_name='score')),
+            ],
+            options={
+                'verbose_name': 'similar recipe',
+                'verbose_name_plural': 'similar recipes',
+            },
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='similar_stale',
+            field=models.BooleanField(default=True, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(condition=models.Q(('similar_stale', True)), fields=['id'], name='recipe_similar_stale_idx'),
+        ),
+        migrations.AddField(
+            model_name='similarrecipe',
+            name='recipe',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='similar_recipes', to='recipes.recipe', verbose_name='recipe'),
+        ),
+        migrations.AddField(
+            model_name='similarrecipe',
+            name='similar',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='recipes.recipe', verbose_name='similar recipe'),
+        ),
+        migrations.AddIndex(
+            model_name='similarrecipe',
+            index=models.Index(fields=['recipe', '-score'], name='similar_recipe_score_idx'),
+        ),
+    ]
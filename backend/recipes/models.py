@@ -1,8 +1,12 @@
 from django.contrib.auth import get_user_model
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 
+from recipes.managers import RecipeManager
+
 User = get_user_model()
 
 
@@ -62,11 +66,25 @@ class Recipe(models.Model):
                                       verbose_name=_('created at'))
     updated_at = models.DateTimeField(auto_now=True,
                                       verbose_name=_('updated at'))
+    search_vector = SearchVectorField(null=True, editable=False)
+    # Set on every save; cleared once similar recipes are recomputed.
+    similar_stale = models.BooleanField(default=True, editable=False)
+
+    objects = RecipeManager()
 
     class Meta:
         verbose_name = _('recipe')
         verbose_name_plural = _('recipes')
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at'], name='recipe_created_at_idx'),
+            GinIndex(fields=['search_vector'], name='recipe_search_idx'),
+            models.Index(
+                fields=['id'],
+                condition=models.Q(similar_stale=True),
+                name='recipe_similar_stale_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.name
@@ -145,3 +163,35 @@ class ShoppingCart(models.Model):
 
     def __str__(self):
         return f"{self.user.email} - {self.recipe.name}"
+
+
+class SimilarRecipe(models.Model):
+    """A precomputed nearest neighbour of a recipe."""
+
+    recipe = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name='similar_recipes',
+        verbose_name=_('recipe'),
+        # Covered by similar_recipe_score_idx.
+        db_index=False
+    )
+    similar = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name=_('similar recipe')
+    )
+    score = models.FloatField(_('score'))
+
+    class Meta:
+        verbose_name = _('similar recipe')
+        verbose_name_plural = _('similar recipes')
+        indexes = [
+            models.Index(
+                fields=['recipe', '-score'], name='similar_recipe_score_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.recipe_id} ~ {self.similar_id} ({self.score:.3f})'
@@ -0,0 +1,78 @@
+"""Ranked full-text search over recipe names and descriptions.
+
+On PostgreSQL every recipe stores a weighted ``tsvector`` (name ``A``,
+description ``B``) in ``search_vector``. It is refreshed on save and
+served by a GIN index, and queries use ``websearch_to_tsquery`` syntax
+(quoted phrases, ``or``, ``-word``). Other databases fall back to
+``icontains`` matching of every word, ranking name hits above
+description hits.
+"""
+from functools import reduce
+from operator import and_
+
+from django.contrib.postgres.search import (SearchQuery, SearchRank,
+                                            SearchVector)
+from django.db import connections
+from django.db.models import Case, F, IntegerField, Q, Value, When
+
+# The russian configuration stems Latin words with the english stemmer.
+SEARCH_CONFIG = 'russian'
+# Fallback ranking only looks at this many words of the query.
+FALLBACK_MAX_TERMS = 8
+
+
+def search_vector():
+    name = SearchVector('name', weight='A', config=SEARCH_CONFIG)
+    text = SearchVector('text', weight='B', config=SEARCH_CONFIG)
+    return name + text
+
+
+def update_search_vectors(queryset):
+    """Recompute stored vectors, e.g. after ``bulk_create`` or ``COPY``."""
+    if connections[queryset.db].vendor == 'postgresql':
+        queryset.update(search_vector=search_vector())
+
+
+def search_query(text):
+    return SearchQuery(text, search_type='websearch', config=SEARCH_CONFIG)
+
+
+def fallback_terms(text):
+    return text.split()[:FALLBACK_MAX_TERMS]
+
+
+def matching(vendor, text):
+    """A filter selecting recipes that match ``text``."""
+    if vendor == 'postgresql':
+        return Q(search_vector=search_query(text))
+    return reduce(and_, (
+        Q(name__icontains=term) | Q(text__icontains=term)
+        for term in fallback_terms(text)
+    ))
+
+
+def rank(vendor, text):
+    if vendor == 'postgresql':
+        return SearchRank(F('search_vector'), search_query(text))
+    return sum(
+        (
+            Case(
+                When(name__icontains=term, then=Value(2)),
+                When(text__icontains=term, then=Value(1)),
+                default=Value(0),
+                output_field=IntegerField()
+            )
+            for term in fallback_terms(text)
+        ),
+        Value(0)
+    )
+
+
+def search(queryset, text):
+    """Filter ``queryset`` by ``text``, best matches first."""
+    if not text.split():
+        return queryset
+    vendor = connections[queryset.db].vendor
+    return queryset.filter(matching(vendor, text)).annotate(
+        search_rank=rank(vendor, text)
+    ).order_by('-search_rank', '-created_at')
@@ -0,0 +1,28 @@
+from django.db.models.signals import post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from recipes.models import Recipe
+from recipes.search import update_search_vectors
+
+SEARCHED_FIELDS = {'name', 'text'}
+
+
+@receiver(pre_save, sender=Recipe)
+def recipe_saving(sender, instance, **kwargs):
+    # Ingredients and tags are written along with the recipe row, so any
+    # save may change its neighbours.
+    instance.similar_stale = True
+
+
+@receiver(post_save, sender=Recipe)
+def recipe_saved(sender, instance, update_fields, **kwargs):
+    if update_fields is None or SEARCHED_FIELDS & set(update_fields):
+        update_search_vectors(Recipe.objects.filter(pk=instance.pk))
+
+
+@receiver(pre_delete, sender=Recipe)
+def recipe_deleting(sender, instance, **kwargs):
+    """Recipes listing a deleted one as similar need a new neighbour."""
+    Recipe.objects.filter(
+        similar_recipes__similar_id=instance.pk
+    ).update(similar_stale=True)
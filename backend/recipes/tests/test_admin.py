@@ -0,0 +1,51 @@
+from django.contrib.admin.sites import site
+from django.contrib.auth import get_user_model
+from django.test import RequestFactory, TestCase
+
+from recipes.models import Recipe
+
+User = get_user_model()
+
+
+class RecipeAdminSearchTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(
+            email='chef.anna@example.com', username='chef_anna',
+            password='password', first_name='Anna', last_name='Chef'
+        )
+        other = User.objects.create_user(
+            email='baker@example.com', username='baker',
+            password='password', first_name='Bob', last_name='Baker'
+        )
+        cls.by_author = Recipe.objects.create(
+            author=cls.author, name='Plain porridge', text='Oats and milk.',
+            image='recipes/images/porridge.png', cooking_time=10
+        )
+        cls.by_text = Recipe.objects.create(
+            author=other, name='Tomato soup', text='Ripe tomatoes.',
+            image='recipes/images/soup.png', cooking_time=30
+        )
+
+    def setUp(self):
+        self.admin = site._registry[Recipe]
+        self.request = RequestFactory().get('/admin/recipes/recipe/')
+
+    def search(self, term):
+        queryset, _ = self.admin.get_search_results(
+            self.request, self.admin.get_queryset(self.request), term
+        )
+        return set(queryset)
+
+    def test_partial_author_username(self):
+        self.assertEqual(self.search('chef'), {self.by_author})
+
+    def test_partial_author_email(self):
+        self.assertEqual(self.search('anna@exam'), {self.by_author})
+
+    def test_full_text_search(self):
+        self.assertEqual(self.search('soup'), {self.by_text})
+
+    def test_blank_term_returns_everything(self):
+        self.assertEqual(self.search('  '), {self.by_author, self.by_text})
@@ -1,7 +1,7 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 
-from .models import Subscription, User
+from .models import Subscription, User, UserStats
 
 
 @admin.register(Subscription)
@@ -18,6 +18,20 @@ class SubscriptionAdmin(admin.ModelAdmin):
     list_filter = ('user', 'author')
 
 
+@admin.register(UserStats)
+class UserStatsAdmin(admin.ModelAdmin):
+    """Read-only view of denormalized user stats."""
+
+    list_display = (
+        'user',
+        'recipes_count',
+        'followers_count',
+        'last_recipe_at'
+    )
+    search_fields = ('user__username', 'user__email')
+    readonly_fields = list_display
+
+
 @admin.register(User)
 class UserAdmin(BaseUserAdmin):
     """Admin panel for managing user profiles."""
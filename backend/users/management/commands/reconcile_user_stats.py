@@ -0,0 +1,77 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from recipes.models import Recipe
+from users.models import Subscription, UserStats
+from users.stats import expected_stats
+
+User = get_user_model()
+
+STATS_FIELDS = ('recipes_count', 'followers_count', 'last_recipe_at')
+
+
+class Command(BaseCommand):
+    help = 'Recalculate denormalized user stats and repair drifted rows.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of users processed per transaction.'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report drifted rows without writing them.'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        dry_run = options['dry_run']
+        last_id = 0
+        checked = repaired = 0
+
+        while True:
+            user_ids = list(
+                User.objects.filter(pk__gt=last_id)
+                .order_by('pk')
+                .values_list('pk', flat=True)[:batch_size]
+            )
+            if not user_ids:
+                break
+            last_id = user_ids[-1]
+            checked += len(user_ids)
+            repaired += self.reconcile_batch(user_ids, dry_run)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Checked {checked} users, '
+            f'{"found" if dry_run else "repaired"} {repaired} stats rows.'
+        ))
+
+    def reconcile_batch(self, user_ids, dry_run):
+        """Compare stored stats with aggregates for one batch of users."""
+        expected_by_user = expected_stats(user_ids, Recipe, Subscription)
+
+        with transaction.atomic():
+            existing = UserStats.objects.select_for_update().in_bulk(user_ids)
+            to_create, to_update = [], []
+            for user_id in user_ids:
+                expected = expected_by_user[user_id]
+                stats = existing.get(user_id)
+                if stats is None:
+                    to_create.append(UserStats(user_id=user_id, **expected))
+                elif any(
+                    getattr(stats, field) != value
+                    for field, value in expected.items()
+                ):
+                    for field, value in expected.items():
+                        setattr(stats, field, value)
+                    to_update.append(stats)
+
+            if not dry_run:
+                UserStats.objects.bulk_create(to_create)
+                UserStats.objects.bulk_update(to_update, STATS_FIELDS)
+
+        return len(to_create) + len(to_update)
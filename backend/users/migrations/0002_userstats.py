@@ -0,0 +1,28 @@
+# Generated by Django 5.1.4 on 2026-10-19 08:51
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='user')),
+                ('recipes_count', models.PositiveIntegerField(default=0, verbose_name='recipes count')),
+                ('followers_count', models.PositiveIntegerField(default=0, verbose_name='followers count')),
+                ('last_recipe_at', models.DateTimeField(blank=True, db_index=True, null=True, verbose_name='last recipe at')),
+            ],
+            options={
+                'verbose_name': 'user stats',
+                'verbose_name_plural': 'user stats',
+            },
+        ),
+    ]
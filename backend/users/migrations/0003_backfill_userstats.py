@@ -0,0 +1,58 @@
+from django.db import migrations
+
+from users.stats import expected_stats
+
+BATCH_SIZE = 1000
+STATS_FIELDS = ('recipes_count', 'followers_count', 'last_recipe_at')
+
+
+def backfill_user_stats(apps, schema_editor):
+    """Fill the counters of users that existed before the signals did.
+
+    Rows already written by the signals are recalculated as well, the
+    same way ``reconcile_user_stats`` does.
+    """
+    alias = schema_editor.connection.alias
+    User = apps.get_model('users', 'User')
+    UserStats = apps.get_model('users', 'UserStats')
+    Subscription = apps.get_model('users', 'Subscription')
+    Recipe = apps.get_model('recipes', 'Recipe')
+
+    last_id = 0
+    while True:
+        user_ids = list(
+            User.objects.using(alias).filter(pk__gt=last_id)
+            .order_by('pk')
+            .values_list('pk', flat=True)[:BATCH_SIZE]
+        )
+        if not user_ids:
+            break
+        last_id = user_ids[-1]
+        expected_by_user = expected_stats(
+            user_ids, Recipe, Subscription, using=alias
+        )
+        existing = UserStats.objects.using(alias).in_bulk(user_ids)
+        to_create, to_update = [], []
+        for user_id in user_ids:
+            expected = expected_by_user[user_id]
+            stats = existing.get(user_id)
+            if stats is None:
+                to_create.append(UserStats(user_id=user_id, **expected))
+            else:
+                for field, value in expected.items():
+                    setattr(stats, field, value)
+                to_update.append(stats)
+        UserStats.objects.using(alias).bulk_create(to_create)
+        UserStats.objects.using(alias).bulk_update(to_update, STATS_FIELDS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_userstats'),
+        ('recipes', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_user_stats, migrations.RunPython.noop),
+    ]
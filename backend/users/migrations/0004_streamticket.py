@@ -0,0 +1,27 @@
+# Generated by Django 5.1.4 on 2026-10-19 12:02
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_backfill_userstats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StreamTicket',
+            fields=[
+                ('key', models.CharField(max_length=40, primary_key=True, serialize=False, verbose_name='key')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='created at')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stream_tickets', to=settings.AUTH_USER_MODEL, verbose_name='user')),
+            ],
+            options={
+                'verbose_name': 'stream ticket',
+                'verbose_name_plural': 'stream tickets',
+            },
+        ),
+    ]
@@ -93,3 +93,64 @@ class Subscription(models.Model):
 
     def __str__(self):
         return f"{self.user.username} follows {self.author.username}"
+
+
+class UserStats(models.Model):
+    """Denormalized per-user counters maintained by signals."""
+
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+        verbose_name=_('user')
+    )
+    recipes_count = models.PositiveIntegerField(
+        _('recipes count'),
+        default=0
+    )
+    followers_count = models.PositiveIntegerField(
+        _('followers count'),
+        default=0
+    )
+    last_recipe_at = models.DateTimeField(
+        _('last recipe at'),
+        null=True,
+        blank=True,
+        db_index=True
+    )
+
+    class Meta:
+        verbose_name = _('user stats')
+        verbose_name_plural = _('user stats')
+
+    def __str__(self):
+        return f"{self.user_id}: {self.recipes_count} recipes"
+
+
+class StreamTicket(models.Model):
+    """Single-use credential for opening the event stream.
+
+    ``EventSource`` cannot send headers, so browsers put a ticket in the
+    URL instead of their token, which would end up in access logs.
+    """
+
+    key = models.CharField(_('key'), max_length=40, primary_key=True)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='stream_tickets',
+        verbose_name=_('user')
+    )
+    created_at = models.DateTimeField(
+        _('created at'),
+        auto_now_add=True,
+        db_index=True
+    )
+
+    class Meta:
+        verbose_name = _('stream ticket')
+        verbose_name_plural = _('stream tickets')
+
+    def __str__(self):
+        return f"{self.user_id}: {self.created_at}"
@@ -0,0 +1,56 @@
+from django.db import transaction
+from django.db.models import F, Max
+from django.db.models.functions import Greatest
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from users.models import Subscription, UserStats
+
+
+def _increment(user_id, field, **extra):
+    """Increment a counter, creating the stats row on first use."""
+    with transaction.atomic():
+        UserStats.objects.get_or_create(user_id=user_id)
+        UserStats.objects.filter(user_id=user_id).update(
+            **{field: F(field) + 1}, **extra
+        )
+
+
+def _decrement(user_id, field, **extra):
+    """Decrement a counter without recreating rows of deleted users."""
+    UserStats.objects.filter(user_id=user_id).update(
+        **{field: Greatest(F(field) - 1, 0)}, **extra
+    )
+
+
+@receiver(post_save, sender='recipes.Recipe')
+def recipe_created(sender, instance, created, **kwargs):
+    if created:
+        _increment(
+            instance.author_id,
+            'recipes_count',
+            last_recipe_at=instance.created_at
+        )
+
+
+@receiver(post_delete, sender='recipes.Recipe')
+def recipe_deleted(sender, instance, **kwargs):
+    last_recipe_at = sender.objects.filter(
+        author_id=instance.author_id
+    ).aggregate(last=Max('created_at'))['last']
+    _decrement(
+        instance.author_id,
+        'recipes_count',
+        last_recipe_at=last_recipe_at
+    )
+
+
+@receiver(post_save, sender=Subscription)
+def subscription_created(sender, instance, created, **kwargs):
+    if created:
+        _increment(instance.author_id, 'followers_count')
+
+
+@receiver(post_delete, sender=Subscription)
+def subscription_deleted(sender, instance, **kwargs):
+    _decrement(instance.author_id, 'followers_count')
@@ -0,0 +1,36 @@
+"""Recalculation of the denormalized ``UserStats`` counters.
+
+Shared by the ``reconcile_user_stats`` command and the backfill
+migration, which passes its historical models, so keep it free of
+imports of the current models.
+"""
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import Count, Max
+
+
+def expected_stats(user_ids, recipe_model, subscription_model,
+                   using=DEFAULT_DB_ALIAS):
+    """Counters each of ``user_ids`` should have, by user id."""
+    recipes = {
+        row['author_id']: row for row in
+        recipe_model.objects.using(using).filter(author_id__in=user_ids)
+        .order_by()
+        .values('author_id')
+        .annotate(count=Count('id'), last=Max('created_at'))
+    }
+    followers = dict(
+        subscription_model.objects.using(using)
+        .filter(author_id__in=user_ids)
+        .order_by()
+        .values('author_id')
+        .annotate(count=Count('id'))
+        .values_list('author_id', 'count')
+    )
+    return {
+        user_id: {
+            'recipes_count': recipes.get(user_id, {}).get('count', 0),
+            'followers_count': followers.get(user_id, 0),
+            'last_recipe_at': recipes.get(user_id, {}).get('last'),
+        }
+        for user_id in user_ids
+    }
@@ -0,0 +1,185 @@
+from datetime import timedelta
+from importlib import import_module
+from io import StringIO
+from types import SimpleNamespace
+
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+
+from recipes.models import Favorite, Recipe
+from users.models import Subscription, UserStats
+
+User = get_user_model()
+
+backfill = import_module('users.migrations.0003_backfill_userstats')
+
+
+def create_user(name):
+    return User.objects.create_user(
+        email=f'{name}@example.com', username=name, password='password',
+        first_name=name, last_name=name
+    )
+
+
+def create_recipe(author, name):
+    return Recipe.objects.create(
+        author=author, name=name, text='Text',
+        image='recipes/images/recipe.png', cooking_time=5
+    )
+
+
+class UserStatsSignalTests(TestCase):
+
+    def setUp(self):
+        self.author = create_user('author')
+        self.reader = create_user('reader')
+
+    def stats(self):
+        return UserStats.objects.get(user=self.author)
+
+    def test_recipes_update_count_and_last_recipe(self):
+        first = create_recipe(self.author, 'First')
+        second = create_recipe(self.author, 'Second')
+        self.assertEqual(self.stats().recipes_count, 2)
+        self.assertEqual(self.stats().last_recipe_at, second.created_at)
+
+        second.delete()
+        self.assertEqual(self.stats().recipes_count, 1)
+        self.assertEqual(self.stats().last_recipe_at, first.created_at)
+
+        first.delete()
+        self.assertEqual(self.stats().recipes_count, 0)
+        self.assertIsNone(self.stats().last_recipe_at)
+
+    def test_subscriptions_update_followers(self):
+        other = create_user('other')
+        subscriptions = [
+            Subscription.objects.create(user=user, author=self.author)
+            for user in (self.reader, other)
+        ]
+        self.assertEqual(self.stats().followers_count, 2)
+
+        subscriptions[0].delete()
+        self.assertEqual(self.stats().followers_count, 1)
+
+    def test_favorites_leave_counters_alone(self):
+        recipe = create_recipe(self.author, 'Favorite')
+        favorite = Favorite.objects.create(user=self.reader, recipe=recipe)
+        favorite.delete()
+
+        stats = self.stats()
+        self.assertEqual(stats.recipes_count, 1)
+        self.assertEqual(stats.followers_count, 0)
+
+    def test_counters_do_not_go_below_zero(self):
+        subscription = Subscription.objects.create(
+            user=self.reader, author=self.author
+        )
+        recipe = create_recipe(self.author, 'Drifted')
+        UserStats.objects.filter(user=self.author).update(
+            recipes_count=0, followers_count=0
+        )
+
+        subscription.delete()
+        recipe.delete()
+
+        stats = self.stats()
+        self.assertEqual(stats.recipes_count, 0)
+        self.assertEqual(stats.followers_count, 0)
+
+
+class ReconcileUserStatsTests(TestCase):
+
+    def setUp(self):
+        self.author = create_user('author')
+        self.reader = create_user('reader')
+        self.recipe = create_recipe(self.author, 'Recipe')
+        Subscription.objects.create(user=self.reader, author=self.author)
+
+    def reconcile(self, *args):
+        out = StringIO()
+        call_command('reconcile_user_stats', *args, stdout=out)
+        return out.getvalue()
+
+    def test_repairs_drifted_and_missing_rows(self):
+        UserStats.objects.filter(user=self.author).update(
+            recipes_count=5, followers_count=3,
+            last_recipe_at=timezone.now() - timedelta(days=1)
+        )
+        UserStats.objects.filter(user=self.reader).delete()
+
+        output = self.reconcile('--batch-size', '1')
+
+        self.assertIn('repaired 2 stats rows', output)
+        stats = UserStats.objects.get(user=self.author)
+        self.assertEqual(stats.recipes_count, 1)
+        self.assertEqual(stats.followers_count, 1)
+        self.assertEqual(stats.last_recipe_at, self.recipe.created_at)
+        self.assertEqual(
+            UserStats.objects.get(user=self.reader).recipes_count, 0
+        )
+
+    def test_dry_run_reports_without_writing(self):
+        self.reconcile()
+        UserStats.objects.filter(user=self.author).update(recipes_count=5)
+
+        output = self.reconcile('--dry-run')
+
+        self.assertIn('found 1 stats rows', output)
+        self.assertEqual(
+            UserStats.objects.get(user=self.author).recipes_count, 5
+        )
+
+    def test_consistent_rows_are_left_alone(self):
+        # Users without recipes or followers have no row until then.
+        self.assertIn('repaired 1 stats rows', self.reconcile())
+
+        self.assertIn('repaired 0 stats rows', self.reconcile())
+
+
+class BackfillUserStatsTests(TestCase):
+
+    def setUp(self):
+        self.author = create_user('author')
+        self.reader = create_user('reader')
+        self.recipes = [
+            Recipe.objects.create(
+                author=self.author, name=f'Recipe {index}', text='Text',
+                image='recipes/images/recipe.png', cooking_time=5
+            )
+            for index in range(2)
+        ]
+        Subscription.objects.create(user=self.reader, author=self.author)
+
+    def run_backfill(self):
+        backfill.backfill_user_stats(
+            apps, SimpleNamespace(connection=connection)
+        )
+
+    def test_fills_missing_rows(self):
+        UserStats.objects.all().delete()
+
+        self.run_backfill()
+
+        stats = UserStats.objects.get(user=self.author)
+        self.assertEqual(stats.recipes_count, 2)
+        self.assertEqual(stats.followers_count, 1)
+        self.assertEqual(stats.last_recipe_at, self.recipes[-1].created_at)
+        reader_stats = UserStats.objects.get(user=self.reader)
+        self.assertEqual(reader_stats.recipes_count, 0)
+        self.assertIsNone(reader_stats.last_recipe_at)
+
+    def test_repairs_drifted_rows(self):
+        UserStats.objects.filter(user=self.author).update(
+            recipes_count=7, followers_count=0
+        )
+
+        self.run_backfill()
+
+        stats = UserStats.objects.get(user=self.author)
+        self.assertEqual(stats.recipes_count, 2)
+        self.assertEqual(stats.followers_count, 1)